@@ -6,7 +6,7 @@ import pickle
 
 import numpy as np
 
-from maro.rl import AbsAgent, ColumnBasedStore
+from maro.rl import AbsAgent, AbsStore
 
 
 class DQNAgent(AbsAgent):
@@ -25,7 +25,7 @@ class DQNAgent(AbsAgent):
         self,
         name: str,
         algorithm,
-        experience_pool: ColumnBasedStore,
+        experience_pool: AbsStore,
         min_experiences_to_train,
         num_batches,
         batch_size
@@ -5,7 +5,7 @@ import torch.nn as nn
 from torch.optim import RMSprop
 
 from maro.rl import (
-    ColumnBasedStore, DQN, DQNConfig, FullyConnectedBlock, LearningModel, NNStack, OptimizerOptions,
+    ArrayBasedStore, DQN, DQNConfig, FullyConnectedBlock, LearningModel, NNStack, OptimizerOptions,
     SimpleAgentManager
 )
 from maro.utils import set_seeds
@@ -37,7 +37,7 @@ def create_dqn_agents(agent_id_list, config):
             DQNConfig(**config.algorithm.hyper_params, loss_cls=nn.SmoothL1Loss)
         )
         agent_dict[agent_id] = DQNAgent(
-            agent_id, algorithm, ColumnBasedStore(**config.experience_pool),
+            agent_id, algorithm, ArrayBasedStore(**config.experience_pool),
             **config.training_loop_parameters
         )
 
@@ -38,6 +38,20 @@ cdef dict attribute_accessors = {
     AttributeType.Double: AttributeDoubleAccessor,
 }
 
+# Numpy data type of attributes, used for the result of bulk accessing.
+cdef dict attribute_numpy_types = {
+    AttributeType.Byte: np.int8,
+    AttributeType.UByte: np.uint8,
+    AttributeType.Short: np.int16,
+    AttributeType.UShort: np.uint16,
+    AttributeType.Int: np.int32,
+    AttributeType.UInt: np.uint32,
+    AttributeType.Long: np.int64,
+    AttributeType.ULong: np.uint64,
+    AttributeType.Float: np.float32,
+    AttributeType.Double: np.float64,
+}
+
 cdef map[string, AttrDataType] attr_type_mapping
 
 attr_type_mapping[AttributeType.Byte] = ACHAR
@@ -58,9 +72,15 @@ cdef class AttributeAccessor:
         ATTR_TYPE _attr_type
         RawBackend _backend
 
-    cdef void setup(self, RawBackend backend, ATTR_TYPE attr_type):
+        # Slot number and numpy data type, used for bulk accessing.
+        SLOT_INDEX _slot_number
+        object _numpy_type
+
+    cdef void setup(self, RawBackend backend, ATTR_TYPE attr_type, SLOT_INDEX slot_number, object numpy_type):
         self._backend = backend
         self._attr_type = attr_type
+        self._slot_number = slot_number
+        self._numpy_type = numpy_type
 
     cdef void set_value(self, NODE_INDEX node_index, SLOT_INDEX slot_index, object value) except +:
         pass
@@ -74,6 +94,12 @@ cdef class AttributeAccessor:
     cdef void insert_value(self, NODE_INDEX node_index, SLOT_INDEX slot_index, object value) except +:
         pass
 
+    cdef void get_values(self, NODE_INDEX[:] node_indices, object result) except +:
+        pass
+
+    cdef void set_values(self, NODE_INDEX[:] node_indices, object values) except +:
+        pass
+
     def __dealloc__(self):
         self._backend = None
 
@@ -106,7 +132,7 @@ cdef class RawBackend(BackendAbc):
         # Initial an access wrapper to this attribute.
         cdef AttributeAccessor acc = attribute_accessors[dtype]()
 
-        acc.setup(self, attr_type)
+        acc.setup(self, attr_type, slot_num, attribute_numpy_types[dtype])
 
         self._attr_type_dict[attr_type] = acc
 
@@ -144,6 +170,22 @@ cdef class RawBackend(BackendAbc):
 
         return result
 
+    cdef object get_node_attr_values(self, ATTR_TYPE attr_type, NODE_INDEX[:] node_indices) except +:
+        cdef AttributeAccessor acc = self._attr_type_dict[attr_type]
+
+        result = np.empty((len(node_indices), acc._slot_number), dtype=acc._numpy_type)
+
+        acc.get_values(node_indices, result)
+
+        return result
+
+    cdef void set_node_attr_values(self, ATTR_TYPE attr_type, NODE_INDEX[:] node_indices, object values) except +:
+        cdef AttributeAccessor acc = self._attr_type_dict[attr_type]
+
+        values = np.asarray(values, dtype=acc._numpy_type).reshape(len(node_indices), acc._slot_number)
+
+        acc.set_values(node_indices, values)
+
     cdef void append_node(self, NODE_TYPE node_type, NODE_INDEX number) except +:
         self._frame.append_node(node_type, number)
 
@@ -280,7 +322,9 @@ cdef class RawSnapshotList(SnapshotListAbc):
         return list(result)
 
     # Enable history, history will dump backend into files each time take_snapshot called
-    cdef void enable_history(self, str history_folder) except +:
+    cdef void enable_history(
+        self, str history_folder, int capacity=0, int flush_interval=0, bool background_flush=False
+    ) except +:
         pass
 
     # Reset internal states
@@ -59,7 +59,12 @@ cdef class SnapshotListAbc:
     cdef NODE_INDEX get_node_number(self, NODE_TYPE node_type) except +
 
     # Enable history, history will dump backend into files each time take_snapshot called
-    cdef void enable_history(self, str history_folder) except +
+    cdef void enable_history(
+        self, str history_folder, int capacity=*, int flush_interval=*, bool background_flush=*
+    ) except +
+
+    # Flush and close history files.
+    cdef void close_history(self) except +
 
     # Reset internal states.
     cdef void reset(self) except +
@@ -97,6 +102,12 @@ cdef class BackendAbc:
     # Get values of specified slots.
     cdef list get_attr_values(self, NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX[:] slot_indices) except +
 
+    # Get values of all slots of specified attribute for nodes, result is a numpy array with shape (node number, slot number).
+    cdef object get_node_attr_values(self, ATTR_TYPE attr_type, NODE_INDEX[:] node_indices) except +
+
+    # Set values of all slots of specified attribute for nodes, values is a numpy array with shape (node number, slot number).
+    cdef void set_node_attr_values(self, ATTR_TYPE attr_type, NODE_INDEX[:] node_indices, object values) except +
+
     # Get node definition of backend.
     cdef dict get_node_info(self) except +
 
@@ -132,3 +143,6 @@ cdef class BackendAbc:
 
     # Dump Snapshot into target folder (without filename).
     cdef void dump(self, str folder) except +
+
+    # Copy backend with current states and snapshots, used to copy frame.
+    cdef BackendAbc copy(self) except +
@@ -33,7 +33,12 @@ cdef class SnapshotListAbc:
     cdef NODE_INDEX get_node_number(self, NODE_TYPE node_type) except +:
         return 0
 
-    cdef void enable_history(self, str history_folder) except +:
+    cdef void enable_history(
+        self, str history_folder, int capacity=0, int flush_interval=0, bool background_flush=False
+    ) except +:
+        pass
+
+    cdef void close_history(self) except +:
         pass
 
     cdef void reset(self) except +:
@@ -68,6 +73,12 @@ cdef class BackendAbc:
     cdef list get_attr_values(self, NODE_INDEX node_index, ATTR_TYPE attr_id, SLOT_INDEX[:] slot_indices) except +:
         pass
 
+    cdef object get_node_attr_values(self, ATTR_TYPE attr_type, NODE_INDEX[:] node_indices) except +:
+        pass
+
+    cdef void set_node_attr_values(self, ATTR_TYPE attr_type, NODE_INDEX[:] node_indices, object values) except +:
+        pass
+
     cdef void reset(self) except +:
         pass
 
@@ -105,3 +116,6 @@ cdef class BackendAbc:
 
     cdef void dump(self, str folder) except +:
         pass
+
+    cdef BackendAbc copy(self) except +:
+        raise NotImplementedError("Current backend does not support copying.")
@@ -149,7 +149,9 @@ cdef class FrameBase:
 
     cpdef void take_snapshot(self, INT tick) except *
 
-    cpdef void enable_history(self, str path) except *
+    cpdef void enable_history(self, str path, int capacity=*, int flush_interval=*, bool background_flush=*) except *
+
+    cpdef void close_history(self) except *
 
     cpdef void append_node(self, str node_name, NODE_INDEX number) except +
 
@@ -157,6 +159,10 @@ cdef class FrameBase:
 
     cpdef void resume_node(self, NodeBase node) except +
 
+    cdef object _get_first_node_attribute_accessor(self, str node_name, str attr_name)
+
+    cdef object _get_node_indices(self, str node_name, object node_indices)
+
     cdef void _setup_backend(self, bool enable_snapshot, USHORT total_snapshot, dict options) except *
 
 
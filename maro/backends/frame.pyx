@@ -6,6 +6,7 @@
 #distutils: define_macros=NPY_NO_DEPRECATED_API=NPY_1_7_API_VERSION
 
 import os
+from copy import deepcopy
 
 cimport cython
 
@@ -399,6 +400,10 @@ cdef class NodeBase:
         else:
             __dict__[attr_name] = value
 
+    def __deepcopy__(self, memo: dict):
+        """Node can only be copied with its frame, see FrameBase.__deepcopy__."""
+        raise TypeError("Node instance can only be copied with its frame, copy the frame first.")
+
     def __getattribute__(self, name):
         """Provide easy way to get attribute with 1 slot."""
         cdef dict __dict__ = self.__dict__
@@ -504,18 +509,40 @@ cdef class FrameBase:
         if self._backend.snapshots is not None:
             self._backend.snapshots.take_snapshot(tick)
 
-    cpdef void enable_history(self, str path) except *:
+    cpdef void enable_history(
+        self, str path, int capacity=0, int flush_interval=0, bool background_flush=False
+    ) except *:
         """Enable snapshot history, history will be dumped into files under specified folder,
         history of nodes will be dump seperately, named as node name.
 
         Different with take snapshot, history will not over-write oldest or snapshot at same point,
         it will keep all the changes after ``take_snapshot`` method is called.
 
+        NOTE:
+            Only static (numpy) backend supports history, use ``maro.backends.np_backend.NPHistoryReader``
+            to read the history files.
+
         Args:
             path (str): Folder path to save history files.
+            capacity (int): Number of snapshots to allocate in history files at beginning, usually the number of
+                snapshots in an episode, files will be extended if it is not enough. 0 means using default number.
+            flush_interval (int): Flush history into disk every specified number of snapshots, recorded snapshots
+                are readable before flushing, flushing only makes them durable. 0 means only flush when extending
+                files or resetting snapshot list. Defaults to 0.
+            background_flush (bool): Flush in a background thread, so taking snapshot will not wait for disk.
+                Defaults to False.
+        """
+        if self._backend.snapshots is not None:
+            self._backend.snapshots.enable_history(path, capacity, flush_interval, background_flush)
+
+    cpdef void close_history(self) except *:
+        """Flush and close snapshot history files, history is disabled after closing.
+
+        NOTE:
+            History files are kept open while recording, close them before removing or moving the files.
         """
         if self._backend.snapshots is not None:
-            self._backend.snapshots.enable_history(path)
+            self._backend.snapshots.close_history()
 
     cpdef void append_node(self, str node_name, NODE_INDEX number) except +:
         """Append specified number of node instance to node type.
@@ -571,6 +598,115 @@ cdef class FrameBase:
 
             node._is_deleted = False
 
+    def get_node_attribute_values(self, str node_name, str attr_name, node_indices = None) -> np.ndarray:
+        """Get values of an attribute for all the nodes of a type, or specified nodes, with one backend call.
+
+        This is much faster than accessing attribute of each node instance, as there is no python loop over nodes.
+
+        .. code-block:: python
+
+            # Values of all the ports.
+            empty = frame.get_node_attribute_values("ports", "empty")
+
+            # Values of 1st and 3rd vessels, with shape (2, slot number).
+            future_stops = frame.get_node_attribute_values("vessels", "future_stop_list", [0, 2])
+
+        Args:
+            node_name (str): Name of the node type, same as the one in ``@node`` decorator.
+            attr_name (str): Name of the attribute, list attribute is not supported.
+            node_indices (Union[list, np.ndarray]): Indices of nodes to get, None means all the nodes
+                that not deleted. Defaults to None.
+
+        Returns:
+            np.ndarray: Copy of values with data type of attribute, shape is (node number, ) if slot number
+                of attribute is 1, or (node number, slot number).
+        """
+        cdef _NodeAttributeAccessor attr_acc = self._get_first_node_attribute_accessor(node_name, attr_name)
+        cdef NODE_INDEX[:] indices = self._get_node_indices(node_name, node_indices)
+
+        values = self._backend.get_node_attr_values(attr_acc._attr_type, indices)
+
+        return values.reshape(len(indices)) if attr_acc._slot_number == 1 else values
+
+    def set_node_attribute_values(self, str node_name, str attr_name, values, node_indices = None):
+        """Set values of an attribute for all the nodes of a type, or specified nodes, with one backend call.
+
+        If value changed callback (``_on_<attribute name>_changed``) is defined in node class, it will be invoked
+        for each node after all the values are set.
+
+        .. code-block:: python
+
+            # Set values of all the ports.
+            frame.set_node_attribute_values("ports", "empty", np.zeros(len(frame.ports)))
+
+            # Set all slots of 1st and 3rd vessels to 0.
+            frame.set_node_attribute_values("vessels", "future_stop_list", 0, [0, 2])
+
+        Args:
+            node_name (str): Name of the node type, same as the one in ``@node`` decorator.
+            attr_name (str): Name of the attribute, list attribute is not supported.
+            values (Union[object, list, np.ndarray]): Values to set, it will be broadcast to shape (node number, )
+                if slot number of attribute is 1, or (node number, slot number).
+            node_indices (Union[list, np.ndarray]): Indices of nodes to set, None means all the nodes
+                that not deleted. Defaults to None.
+        """
+        cdef _NodeAttributeAccessor attr_acc = self._get_first_node_attribute_accessor(node_name, attr_name)
+        cdef NODE_INDEX[:] indices = self._get_node_indices(node_name, node_indices)
+        cdef SLOT_INDEX slot_number = attr_acc._slot_number
+        cdef list node_list
+        cdef NodeBase node
+        cdef tuple shape = (len(indices), )
+        cdef int i
+
+        if slot_number > 1:
+            shape = (len(indices), slot_number)
+
+        values = np.broadcast_to(values, shape)
+
+        self._backend.set_node_attr_values(attr_acc._attr_type, indices, values)
+
+        # Invoke value changed callbacks in batch, after all the values are set.
+        if "_cb" in attr_acc.__dict__:
+            node_list = self.__dict__[self._node_name2attrname_dict[node_name]]
+            value_list = values.tolist()
+
+            for i in range(len(indices)):
+                node = node_list[indices[i]]
+
+                node.__dict__[attr_name]._cb(value_list[i])
+
+    cdef object _get_first_node_attribute_accessor(self, str node_name, str attr_name):
+        """Get attribute accessor of first node, used to get attribute type and slot number for bulk accessing."""
+        if node_name not in self._node_name2attrname_dict:
+            raise BackendsInvalidNodeException()
+
+        cdef list node_list = self.__dict__[self._node_name2attrname_dict[node_name]]
+
+        if len(node_list) == 0:
+            raise BackendsInvalidNodeException()
+
+        attr_acc = node_list[0].__dict__.get(attr_name, None)
+
+        if not isinstance(attr_acc, _NodeAttributeAccessor) or attr_acc._is_list:
+            raise BackendsInvalidAttributeException()
+
+        return attr_acc
+
+    cdef object _get_node_indices(self, str node_name, object node_indices):
+        """Get node indices for bulk accessing, None means all the nodes that not deleted."""
+        cdef list node_list
+        cdef NodeBase node
+
+        if node_indices is not None:
+            return np.ascontiguousarray(node_indices, dtype=NP_NODE_INDEX).reshape(-1)
+
+        node_list = self.__dict__[self._node_name2attrname_dict[node_name]]
+
+        if self._backend.is_support_dynamic_features():
+            return np.array([node._index for node in node_list if not node._is_deleted], dtype=NP_NODE_INDEX)
+
+        return np.arange(len(node_list), dtype=NP_NODE_INDEX)
+
     def dump(self, folder: str):
         """Dump data of current frame into specified folder.
 
@@ -580,6 +716,74 @@ cdef class FrameBase:
         if os.path.exists(folder):
             self._backend.dump(folder)
 
+    def __deepcopy__(self, memo: dict):
+        """Copy frame with current states and snapshots, used to copy environment.
+
+        Node instances and their attribute accessors are recorded in memo, so objects that reference nodes
+        will reference the nodes of copied frame after copying with the same memo.
+
+        NOTE:
+            Currently only static (numpy) backend supports copying, snapshot history is not copied.
+        """
+        cdef FrameBase frame = type(self).__new__(type(self))
+        cdef NodeBase node
+        cdef NodeBase new_node
+        cdef list node_list
+        cdef list new_node_list
+        cdef dict node_type_dict = {}
+        cdef dict node_attr_type_dict = {}
+
+        memo[id(self)] = frame
+
+        frame._backend_name = self._backend_name
+        frame._backend = self._backend.copy()
+        frame._node_cls_dict = dict(self._node_cls_dict)
+        frame._node_origin_number_dict = dict(self._node_origin_number_dict)
+        frame._node_name2attrname_dict = dict(self._node_name2attrname_dict)
+
+        # Create node instances for copied backend first, as nodes may reference each other.
+        for node_name, frame_attr_name in self._node_name2attrname_dict.items():
+            node_list = self.__dict__[frame_attr_name]
+            new_node_list = []
+
+            for node in node_list:
+                new_node = self._node_cls_dict[node_name]()
+                new_node.setup(frame._backend, node._index, node._type, node._attributes)
+                new_node._is_deleted = node._is_deleted
+
+                memo[id(node)] = new_node
+
+                for name, attr_acc in node.__dict__.items():
+                    if isinstance(attr_acc, _NodeAttributeAccessor):
+                        memo[id(attr_acc)] = new_node.__dict__[name]
+
+                new_node_list.append(new_node)
+
+            memo[id(node_list)] = new_node_list
+            frame.__dict__[frame_attr_name] = new_node_list
+
+            node = node_list[0]
+            node_type_dict[node_name] = node._type
+            node_attr_type_dict[node_name] = node._attributes
+
+        # Then copy the python states of nodes.
+        for frame_attr_name in self._node_name2attrname_dict.values():
+            for node, new_node in zip(self.__dict__[frame_attr_name], frame.__dict__[frame_attr_name]):
+                for name, value in node.__dict__.items():
+                    if not isinstance(value, _NodeAttributeAccessor):
+                        new_node.__dict__[name] = deepcopy(value, memo)
+
+        if self._snapshot_list is not None:
+            frame._snapshot_list = SnapshotList(node_type_dict, node_attr_type_dict, frame._backend.snapshots)
+
+            memo[id(self._snapshot_list)] = frame._snapshot_list
+
+        for name, value in self.__dict__.items():
+            if name not in frame.__dict__:
+                frame.__dict__[name] = deepcopy(value, memo)
+
+        return frame
+
     cdef void _setup_backend(self, bool enable_snapshot, USHORT total_snapshots, dict options) except *:
         """Setup Frame for further using."""
         cdef str frame_attr_name
@@ -36,27 +36,47 @@ cdef class NumpyBackend(BackendAbc):
 
 
 cdef class NPBufferedMmap:
-    """Used to dump snapshot history using memory mapping with a fixed size in-memory buffer"""
+    """Used to dump snapshot history into a pre-allocated file using memory mapping"""
     cdef:
         str _path
 
+        # data type of each record, including tick and states of all node instances
         np.dtype _dtype
 
-        # used to define the shape, as we do not exactly know the number we need to save
-        int _buffer_size
+        int _node_number
 
-        # current offset, used to specified the offset in dumped file, to avoid reach the mmap limitation
-        int _offset
+        # number of records the file can hold, file will be extended if full
+        int _capacity
 
-        # current record item number,
-        int _current_record_number
+        # number of recorded items
+        int _record_number
 
-        int _node_number
+        # flush mapped memory every specified number of records, 0 means flush when extending or closing only
+        int _flush_interval
+
+        object _file
+
+        # memory mapping of whole file
+        np.ndarray _mmap
+
+        # views of mapped memory, for number of valid records in header, ticks and states of records
+        np.ndarray _record_number_arr
+        np.ndarray _ticks_arr
+        np.ndarray _states_arr
+
+        # used to flush in background, None if disabled
+        object _executor
+
+        # result of last flushing in background
+        object _flush_future
 
-        # memory mapping np array
-        np.ndarray _data_arr
+    cdef void _remap(self) except +
 
-    cdef void reload(self) except +
+    cdef void _unmap(self) except +
+
+    cdef void _extend(self) except +
+
+    cdef void _wait_flushing(self) except +
 
 
 cdef class NPSnapshotList(SnapshotListAbc):
@@ -83,4 +103,16 @@ cdef class NPSnapshotList(SnapshotListAbc):
         # key: node name, value: history buffer
         dict _history_dict
 
-    cdef void enable_history(self, str history_folder) except +
+        # Is query result keep the data type of attributes, and return a read-only view if no copy needed.
+        # Or the result will be float.
+        bool _is_native_dtype_query
+
+    cdef void enable_history(
+        self, str history_folder, int capacity=*, int flush_interval=*, bool background_flush=*
+    ) except +
+
+    cdef void close_history(self) except +
+
+    cdef object _query_view(self, np.ndarray data_arr, np.ndarray rows, np.ndarray node_indices, list attrs)
+
+    cdef NPSnapshotList copy(self, NumpyBackend backend)
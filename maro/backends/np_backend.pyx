@@ -5,7 +5,9 @@
 #distutils: language = c++
 #distutils: define_macros=NPY_NO_DEPRECATED_API=NPY_1_7_API_VERSION
 
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 cimport numpy as np
@@ -33,7 +35,7 @@ attribute_type_mapping = {
 
 IF NODES_MEMORY_LAYOUT == "ONE_BLOCK":
     # with this flag, we will allocate a big enough memory for all node types, then use this block construct numpy array
-    from libc.string cimport memset
+    from libc.string cimport memcpy, memset
 
     from cpython cimport PyObject, Py_INCREF, PyTypeObject
     from cpython.mem cimport PyMem_Malloc, PyMem_Free
@@ -51,40 +53,214 @@ IF NODES_MEMORY_LAYOUT == "ONE_BLOCK":
 
 
 
-cdef int MMAP_BUFFER_SIZE = 100
+# Size of header in history file, it contains the magic, number of valid records and json of other information.
+cdef int HISTORY_HEADER_SIZE = 4096
+
+# Offset of number of valid records (int64) in header.
+cdef int HISTORY_RECORD_NUMBER_OFFSET = 8
+
+# Offset of json information in header.
+cdef int HISTORY_INFO_OFFSET = 16
+
+HISTORY_MAGIC = b"MAROHIST"
+
+# Default number of records to allocate if capacity not specified.
+cdef int DEFAULT_HISTORY_CAPACITY = 1024
+
+
+def _flush_mapping(np.ndarray mapping, int fileno):
+    """Write dirty pages of mapping (msync/FlushViewOfFile), then the file itself into disk"""
+    mapping.flush()
+    os.fsync(fileno)
+
+
+def _get_history_record_dtype(np.dtype dtype, int node_number):
+    """Data type of a record in history file, tick and states of all node instances"""
+    return np.dtype([("tick", np.int64), ("states", dtype, (node_number, ))])
 
 
-# TODO:
-# 1. add dtype in header, to make it easy to read
-# 2. add tick for each snapshot
 cdef class NPBufferedMmap:
-    """Buffered memmap of numpy array, as it have size limitation around 2G"""
-    def __cinit__(self, str path, np.dtype dtype, int node_number):
-        self._node_number = node_number
-        self._offset = 0
-        self._current_record_number = 0
+    """Memory mapped history file of a node type, each record holds a tick and states of all node instances.
+
+    The file is allocated with capacity at beginning and mapped only once, recording is a memory copy.
+    If the file is full, it will be extended with double capacity and re-mapped.
+    Number of valid records is kept in the mapped header, use NPHistoryReader to read the file.
+
+    Args:
+        path (str): Path of history file, it will be over-written.
+        dtype (np.dtype): Data type of each node instance.
+        node_number (int): Number of node instances.
+        capacity (int): Number of records to allocate at beginning, usually the number of snapshots of an episode.
+            0 means using a default number.
+        flush_interval (int): Flush mapped memory into disk every specified number of records,
+            0 means only flush when extending or closing.
+        background_flush (bool): Flush in a background thread, so recording do not need to wait for disk.
+    """
+    def __cinit__(
+        self, str path, np.dtype dtype, int node_number, int capacity = 0, int flush_interval = 0,
+        bool background_flush = False
+    ):
         self._path = path
-        self._dtype = dtype
-        self._buffer_size = MMAP_BUFFER_SIZE
+        self._dtype = _get_history_record_dtype(dtype, node_number)
+        self._node_number = node_number
+        self._capacity = capacity if capacity > 0 else DEFAULT_HISTORY_CAPACITY
+        self._record_number = 0
+        self._flush_interval = flush_interval
+        self._executor = ThreadPoolExecutor(max_workers=1) if background_flush else None
+        self._flush_future = None
+
+        cdef bytes info = json.dumps({
+            "dtype": np.lib.format.dtype_to_descr(dtype),
+            "node_number": node_number
+        }).encode()
+
+        if HISTORY_INFO_OFFSET + len(info) > HISTORY_HEADER_SIZE:
+            raise ValueError("Too many attributes to save in history file header.")
+
+        self._file = open(path, "w+b")
+        self._file.write(HISTORY_MAGIC.ljust(HISTORY_INFO_OFFSET, b"\0") + info)
+        self._file.truncate(HISTORY_HEADER_SIZE + self._dtype.itemsize * self._capacity)
+
+        self._remap()
+
+    def record(self, np.ndarray arr, INT tick = 0):
+        """Record states of all node instances at specified tick"""
+        if self._record_number >= self._capacity:
+            self._extend()
+
+        self._ticks_arr[self._record_number] = tick
+        self._states_arr[self._record_number] = arr
+
+        self._record_number += 1
+        self._record_number_arr[0] = self._record_number
+
+        if self._flush_interval > 0 and self._record_number % self._flush_interval == 0:
+            self.flush()
+
+    def flush(self):
+        """Flush mapped memory into disk, in background thread if enabled"""
+        self._wait_flushing()
+
+        if self._executor is None:
+            _flush_mapping(self._mmap, self._file.fileno())
+        else:
+            self._flush_future = self._executor.submit(_flush_mapping, self._mmap, self._file.fileno())
+
+    def close(self):
+        """Flush and close the file, recording is not available after closing"""
+        if self._file is None:
+            return
+
+        self._wait_flushing()
+
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+        self._unmap()
+
+        self._file.close()
+        self._file = None
+
+    def __len__(self):
+        return self._record_number
+
+    cdef void _remap(self) except +:
+        """Map whole file, and prepare views to write"""
+        self._mmap = np.memmap(self._file, np.uint8, "r+")
+
+        self._record_number_arr = self._mmap[HISTORY_RECORD_NUMBER_OFFSET:HISTORY_INFO_OFFSET].view(np.int64)
+
+        cdef np.ndarray records = self._mmap[HISTORY_HEADER_SIZE:].view(self._dtype)
+
+        self._ticks_arr = records["tick"]
+        self._states_arr = records["states"]
+
+    cdef void _unmap(self) except +:
+        """Flush and release the mapping and its views"""
+        _flush_mapping(self._mmap, self._file.fileno())
+
+        cdef object mapping = self._mmap._mmap
+
+        self._mmap = None
+        self._record_number_arr = None
+        self._ticks_arr = None
+        self._states_arr = None
+
+        # File cannot be resized or removed on Windows while it is mapped, so close the mapping explicitly.
+        mapping.close()
+
+    cdef void _extend(self) except +:
+        """Double the capacity of file, and map it again"""
+        self._wait_flushing()
+        self._unmap()
+
+        self._capacity *= 2
+        self._file.truncate(HISTORY_HEADER_SIZE + self._dtype.itemsize * self._capacity)
+
+        self._remap()
+
+    cdef void _wait_flushing(self) except +:
+        if self._flush_future is not None:
+            self._flush_future.result()
+
+            self._flush_future = None
+
 
-        # first time, we will write from start
-        self.reload()
+class NPHistoryReader:
+    """Reader of the history file dumped by numpy backend, the file is mapped for random-access querying.
 
-    def record(self, np.ndarray arr):
-        """Record specified array into file"""
-        self._data_arr[self._current_record_number] = arr
+    .. code-block:: python
 
-        self._current_record_number += 1
+        reader = NPHistoryReader("history/ports.bin")
 
-        # reload the file with offset if reach the max size
-        if self._current_record_number >= self._buffer_size:
-            self.reload()
+        # Ticks of all records.
+        reader.ticks
 
-    cdef void reload(self) except +:
-        """Reload the file with offset to avoid memmap size limitation"""
-        self._data_arr = np.memmap(self._path, self._dtype, "w+", offset=self._offset, shape=(self._buffer_size, self._node_number))
+        # States of all port instances at tick 10, fields are attribute names.
+        reader[10]["empty"]
 
-        self._offset += self._dtype.itemsize * self._buffer_size * self._node_number
+        # Attribute of all records, shape is (record number, node number) or (record number, node number, slots).
+        reader.get_attribute("empty")
+
+    Args:
+        path (str): Path of history file.
+    """
+    def __init__(self, path: str):
+        with open(path, "rb") as fp:
+            header = fp.read(HISTORY_HEADER_SIZE)
+
+        if not header.startswith(HISTORY_MAGIC):
+            raise ValueError(f"Invalid history file: {path}.")
+
+        record_number = int(np.frombuffer(header[HISTORY_RECORD_NUMBER_OFFSET:HISTORY_INFO_OFFSET], np.int64)[0])
+        info = json.loads(header[HISTORY_INFO_OFFSET:].rstrip(b"\0"))
+
+        self.node_number = info["node_number"]
+        self.dtype = np.lib.format.descr_to_dtype([tuple(field) for field in info["dtype"]])
+
+        record_dtype = _get_history_record_dtype(self.dtype, self.node_number)
+
+        if record_number > 0:
+            self._records = np.memmap(path, record_dtype, "r", HISTORY_HEADER_SIZE, (record_number, ))
+        else:
+            self._records = np.zeros(0, record_dtype)
+
+        self.ticks = self._records["tick"]
+
+        # Same tick may be recorded for several times, use the latest one.
+        self._tick2index = {tick: index for index, tick in enumerate(self.ticks.tolist())}
+
+    def __len__(self):
+        return len(self._records)
+
+    def __getitem__(self, tick: int) -> np.ndarray:
+        """Get states of all node instances at specified tick, latest one if there are several records."""
+        return self._records["states"][self._tick2index[tick]]
+
+    def get_attribute(self, attr_name: str) -> np.ndarray:
+        """Get values of specified attribute in all records."""
+        return self._records["states"][attr_name]
 
 
 cdef class NodeInfo:
@@ -222,6 +398,22 @@ cdef class NumpyBackend(BackendAbc):
         else:
             return attr_array[0][node_index, slot_indices].tolist()
 
+    cdef object get_node_attr_values(self, ATTR_TYPE attr_type, NODE_INDEX[:] node_indices) except +:
+        cdef AttrInfo attr = self._attrs_list[attr_type]
+        cdef np.ndarray attr_array = self._node_data_dict[attr.node_type][attr.name]
+
+        # Fancy indexing returns a copy, so result will not change with frame.
+        return attr_array[0][np.asarray(node_indices)].reshape(len(node_indices), attr.slot_number)
+
+    cdef void set_node_attr_values(self, ATTR_TYPE attr_type, NODE_INDEX[:] node_indices, object values) except +:
+        cdef AttrInfo attr = self._attrs_list[attr_type]
+        cdef np.ndarray attr_array = self._node_data_dict[attr.node_type][attr.name]
+
+        if attr.slot_number == 1:
+            attr_array[0][np.asarray(node_indices)] = np.reshape(values, len(node_indices))
+        else:
+            attr_array[0][np.asarray(node_indices)] = values
+
     cdef void setup(self, bool enable_snapshot, USHORT total_snapshot, dict options) except +:
         """Set up the numpy backend"""
         self._is_snapshot_enabled = enable_snapshot
@@ -302,7 +494,8 @@ cdef class NumpyBackend(BackendAbc):
                 Py_INCREF(data_type)
 
         if enable_snapshot:
-            self.snapshots = NPSnapshotList(self, snapshot_number + 1)
+            # Option "query_native_dtype" used to keep data type of attributes in query result, instead of float.
+            self.snapshots = NPSnapshotList(self, snapshot_number + 1, options.get("query_native_dtype", False))
 
     def __dealloc__(self):
         """Clear resources before deleted"""
@@ -359,6 +552,43 @@ cdef class NumpyBackend(BackendAbc):
                 f.write(",".join([ai.name for ai in self._node_attr_dict[node_type]]) + "\n")
                 f.write(",".join([str(ai.slot_number) for ai in self._node_attr_dict[node_type]]))
 
+    cdef BackendAbc copy(self) except +:
+        """Copy backend with current frame and snapshots, node and attribute definitions are shared."""
+        cdef NumpyBackend backend = NumpyBackend()
+        cdef NODE_TYPE node_type
+        cdef np.ndarray data_arr
+
+        backend._nodes_list = self._nodes_list
+        backend._attrs_list = self._attrs_list
+        backend._node_attr_dict = self._node_attr_dict
+        backend._is_snapshot_enabled = self._is_snapshot_enabled
+
+        IF NODES_MEMORY_LAYOUT == "ONE_BLOCK":
+            cdef np.npy_intp np_dims[2]
+
+            # copy the whole memory block, then construct numpy arrays at same offsets
+            backend._data_size = self._data_size
+            backend._data = <char*>PyMem_Malloc(self._data_size)
+
+            memcpy(backend._data, self._data, self._data_size)
+
+            for node_type, data_arr in self._node_data_dict.items():
+                np_dims[0] = data_arr.shape[0]
+                np_dims[1] = data_arr.shape[1]
+
+                backend._node_data_dict[node_type] = PyArray_NewFromDescr(&PyArray_Type, data_arr.dtype, 2, np_dims, NULL, &backend._data[<char*>np.PyArray_DATA(data_arr) - self._data], np.NPY_ARRAY_C_CONTIGUOUS | np.NPY_ARRAY_WRITEABLE, None)
+
+                # NOTE: same as setup, reference of data type will be stolen by the new array
+                Py_INCREF(data_arr.dtype)
+        ELSE:
+            for node_type, data_arr in self._node_data_dict.items():
+                backend._node_data_dict[node_type] = data_arr.copy()
+
+        if self.snapshots is not None:
+            backend.snapshots = (<NPSnapshotList>self.snapshots).copy(backend)
+
+        return backend
+
 # TODO:
 # 1. dump as csv
 # 2. take_snapshot(self, bool overwrite_last)
@@ -366,7 +596,7 @@ cdef class NumpyBackend(BackendAbc):
 # if enable overwrite flat, then last one will be overwrite with latest states, but internal index not change
 cdef class NPSnapshotList(SnapshotListAbc):
     """Snapshot list implemented with numpy"""
-    def __cinit__(self, NumpyBackend backend, int max_size):
+    def __cinit__(self, NumpyBackend backend, int max_size, bool is_native_dtype_query = False):
         self._backend = backend
 
         self._tick2index_dict = {}
@@ -376,6 +606,7 @@ cdef class NPSnapshotList(SnapshotListAbc):
         self._max_size = max_size
         self._is_history_enabled = False
         self._history_dict = {}
+        self._is_native_dtype_query = is_native_dtype_query
 
         for node in backend._nodes_list:
             self._node_name2type_dict[node.name] = node.type
@@ -421,44 +652,106 @@ cdef class NPSnapshotList(SnapshotListAbc):
             data_arr[target_index] = data_arr[0]
 
             if self._is_history_enabled:
-                self._history_dict[ni.name].record(data_arr[0])
+                self._history_dict[ni.name].record(data_arr[0], tick)
 
         self._index2tick_dict[target_index] = tick
 
         self._tick2index_dict[tick] = target_index
 
     cdef query(self, NODE_TYPE node_type, list ticks, list node_index_list, list attr_list) except +:
-        cdef UINT tick
-        cdef NODE_INDEX node_index
+        cdef INT tick
         cdef ATTR_TYPE attr_type
         cdef AttrInfo attr
+        cdef NodeInfo ni = self._backend._nodes_list[node_type]
         cdef np.ndarray data_arr = self._backend._node_data_dict[node_type]
-
-        # TODO: how about use a pre-allocate np array instead concat?
-        cdef list retq = []
+        cdef np.ndarray rows
+        cdef np.ndarray is_valid_row
+        cdef np.ndarray node_indices
+        cdef np.ndarray records
+        cdef np.ndarray result
+        cdef list attrs = [self._backend._attrs_list[attr_type] for attr_type in attr_list]
+        cdef list slot_offsets = []
+        cdef UINT slot_offset = 0
+        cdef UINT offset
+        cdef UINT node_number
 
         if len(ticks) == 0:
             ticks = [t for t in self._tick2index_dict.keys()][-(self._max_size-1):]
 
+        # Resolve ticks to rows of snapshot ring once, -1 means the tick does not exist (padding).
+        rows = np.fromiter((self._tick2index_dict.get(tick, -1) for tick in ticks), dtype=np.int64, count=len(ticks))
+        is_valid_row = rows >= 0
+
         if len(node_index_list) == 0:
-            node_index_list = [i for i in range(self._backend._nodes_list[node_type].number)]
+            node_number = ni.number
+            node_indices = None
+        else:
+            node_number = len(node_index_list)
+            node_indices = np.array(node_index_list, dtype=np.int64)
 
-        # querying by tick attribute
-        for tick in ticks:
-            for node_index in node_index_list:
-                for attr_type in attr_list:
-                    attr = self._backend._attrs_list[attr_type]
+        for attr in attrs:
+            slot_offsets.append(slot_offset)
+            slot_offset += attr.slot_number
 
-                    # since we have a clear tick to index mapping, do not need additional checking here
-                    if tick in self._tick2index_dict:
-                        retq.append(data_arr[attr.name][self._tick2index_dict[tick], node_index].astype("f").flatten())
-                    else:
-                        # padding for tick which not exist
-                        retq.append(np.zeros(attr.slot_number, dtype='f'))
+        if self._is_native_dtype_query:
+            result = self._query_view(data_arr, rows, node_indices, attrs)
 
-        return np.concatenate(retq)
+            if result is not None:
+                return result
 
-    cdef void enable_history(self, str history_folder) except +:
+            result_dtype = np.result_type(*[data_arr.dtype.fields[attr.name][0].base for attr in attrs])
+        else:
+            result_dtype = np.dtype("f")
+
+        # Result layout: tick -> node -> attribute -> slot, ticks not exist will be padding with 0.
+        result = np.zeros((len(ticks), node_number, slot_offset), dtype=result_dtype)
+
+        if is_valid_row.any():
+            # Gather all the records we need with one fancy indexing.
+            if node_indices is None:
+                records = data_arr[rows[is_valid_row]]
+            else:
+                records = data_arr[np.ix_(rows[is_valid_row], node_indices)]
+
+            for attr, offset in zip(attrs, slot_offsets):
+                result[is_valid_row, :, offset: offset + attr.slot_number] = \
+                    records[attr.name].reshape(len(records), node_number, attr.slot_number)
+
+        return result.reshape(-1)
+
+    cdef object _query_view(self, np.ndarray data_arr, np.ndarray rows, np.ndarray node_indices, list attrs):
+        """Try to get a read-only view of snapshot for 1 tick and 1 attribute with continuous node indices.
+
+        Returns:
+            np.ndarray: A flat view if no copy is needed, or None.
+        """
+        cdef AttrInfo attr
+        cdef np.ndarray view
+
+        if len(rows) != 1 or rows[0] < 0 or len(attrs) != 1:
+            return None
+
+        attr = attrs[0]
+        view = data_arr[attr.name][rows[0]]
+
+        if node_indices is not None:
+            if len(node_indices) > 1 and not (np.diff(node_indices) == 1).all():
+                return None
+
+            view = view[node_indices[0]: node_indices[-1] + 1]
+
+        # Reshape will copy if the field cannot be flatten in place, we only return real views here.
+        if attr.slot_number > 1 and not view.flags.c_contiguous:
+            return None
+
+        view = view.reshape(-1)
+        view.flags.writeable = False
+
+        return view
+
+    cdef void enable_history(
+        self, str history_folder, int capacity=0, int flush_interval=0, bool background_flush=False
+    ) except +:
         """Enable history recording, used to save all the snapshots into file"""
         if self._is_history_enabled:
             return
@@ -474,14 +767,31 @@ cdef class NPSnapshotList(SnapshotListAbc):
             ni = self._backend._nodes_list[node_type]
             dump_path = os.path.join(history_folder, f"{ni.name}.bin")
 
-            self._history_dict[ni.name] = NPBufferedMmap(dump_path, data_arr.dtype, ni.number)
+            self._history_dict[ni.name] = NPBufferedMmap(
+                dump_path, data_arr.dtype, ni.number, capacity, flush_interval, background_flush
+            )
+
+    cdef void close_history(self) except +:
+        """Flush and close history files, history is disabled after closing"""
+        cdef NPBufferedMmap history
+
+        for history in self._history_dict.values():
+            history.close()
+
+        self._history_dict.clear()
+        self._is_history_enabled = False
 
     cdef void reset(self) except +:
         """Reset snapshot list"""
         self._cur_index = 0
         self._tick2index_dict.clear()
         self._index2tick_dict.clear()
-        self._history_dict.clear()
+
+        cdef NPBufferedMmap history
+
+        # History keeps recording after reset, flush it at the end of episode.
+        for history in self._history_dict.values():
+            history.flush()
 
         cdef NODE_TYPE node_type
         cdef AttrInfo attr_info
@@ -495,5 +805,15 @@ cdef class NPSnapshotList(SnapshotListAbc):
 
         # NOTE: we do not reset the history file here, so the file will keep increasing
 
+    cdef NPSnapshotList copy(self, NumpyBackend backend):
+        """Copy snapshot list states for a copied backend, history is not copied."""
+        cdef NPSnapshotList snapshots = NPSnapshotList(backend, self._max_size, self._is_native_dtype_query)
+
+        snapshots._tick2index_dict = dict(self._tick2index_dict)
+        snapshots._index2tick_dict = dict(self._index2tick_dict)
+        snapshots._cur_index = self._cur_index
+
+        return snapshots
+
     def __len__(self):
         return len(self._index2tick_dict)
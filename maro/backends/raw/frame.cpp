@@ -208,9 +208,7 @@ namespace maro
 
         auto& node = get_node(node_type);
 
-        auto& target_attr = node.get_attr(node_index, attr_type, slot_index);
-
-        target_attr = T(value);
+        node.set_attr<T>(node_index, attr_type, slot_index, value);
       }
 
 #define ATTRIBUTE_SETTER(type) \
@@ -20,6 +20,11 @@ namespace maro
         return node_index * node_size + attr_offset + slot;
       }
 
+      inline size_t get_block_number(size_t attr_number)
+      {
+        return (attr_number + ATTRIBUTE_BLOCK_SIZE - 1) / ATTRIBUTE_BLOCK_SIZE;
+      }
+
       AttributeDef::AttributeDef(string name, AttrDataType data_type, SLOT_INDEX slot_number,
         size_t offset, bool is_list, bool is_const, ATTR_TYPE attr_type) :
         name(name),
@@ -80,6 +85,9 @@ namespace maro
         // Copy masks.
         _node_instance_masks = node._node_instance_masks;
 
+        _dirty_blocks = node._dirty_blocks;
+        _is_list_store_dirty = node._is_list_store_dirty;
+
         // Copy others for deep-copy.
         if (is_deep_copy)
         {
@@ -117,6 +125,17 @@ namespace maro
         }
       }
 
+      inline void Node::mark_dirty(size_t attr_offset)
+      {
+        _dirty_blocks.set(attr_offset / ATTRIBUTE_BLOCK_SIZE, true);
+      }
+
+      inline void Node::mark_all_dirty() noexcept
+      {
+        _dirty_blocks.reset(true);
+        _is_list_store_dirty = true;
+      }
+
       Node::Node()
       {
       }
@@ -232,6 +251,10 @@ namespace maro
         _node_instance_masks.resize(_defined_node_number);
         _node_instance_masks.reset(true);
 
+        // All blocks are new for snapshot list.
+        _dirty_blocks.resize(get_block_number(_dynamic_block.size()));
+        mark_all_dirty();
+
         // Prepare memory for list attributes.
         for (auto& attr_def : _attribute_definitions)
         {
@@ -274,6 +297,8 @@ namespace maro
         // Reset bitset masks.
         _node_instance_masks.resize(_defined_node_number);
         _node_instance_masks.reset(true);
+
+        mark_all_dirty();
       }
 
       void Node::append_nodes(NODE_INDEX node_number)
@@ -285,6 +310,8 @@ namespace maro
           return;
         }
 
+        auto prev_dynamic_size = _max_node_number * _dynamic_size_per_node;
+
         _max_node_number += node_number;
         _alive_node_number += node_number;
 
@@ -302,6 +329,19 @@ namespace maro
         if (extend_size > _dynamic_block.size())
         {
           _dynamic_block.resize(extend_size);
+
+          _dirty_blocks.resize(get_block_number(_dynamic_block.size()));
+        }
+
+        // Mark blocks of new node instances as dirty, including the block shared with previous node instance.
+        for (auto attr_offset = prev_dynamic_size; attr_offset < extend_size; attr_offset += ATTRIBUTE_BLOCK_SIZE)
+        {
+          mark_dirty(attr_offset);
+        }
+
+        if (extend_size > 0)
+        {
+          mark_dirty(extend_size - 1);
         }
 
         // Prepare memory for new list attributes.
@@ -320,6 +360,8 @@ namespace maro
 
               _list_store.emplace_back();
             }
+
+            _is_list_store_dirty = true;
           }
         }
 
@@ -445,6 +487,40 @@ namespace maro
         return (*target_block)[attr_offset];
       }
 
+      template<typename T>
+      void Node::set_attr(NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index, T value)
+      {
+        auto& target_attr = get_attr(node_index, attr_type, slot_index);
+
+        target_attr = value;
+
+        // Const attributes are not in snapshots.
+        auto& attr_def = _attribute_definitions[extract_attr_index(attr_type)];
+
+        if (attr_def.is_list)
+        {
+          _is_list_store_dirty = true;
+        }
+        else if (!attr_def.is_const)
+        {
+          mark_dirty(compose_attr_offset_in_node(node_index, _dynamic_size_per_node, attr_def.offset, slot_index));
+        }
+      }
+
+#define SET_ATTR(type) \
+  template void Node::set_attr(NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index, type value);
+
+      SET_ATTR(ATTR_CHAR)
+      SET_ATTR(ATTR_UCHAR)
+      SET_ATTR(ATTR_SHORT)
+      SET_ATTR(ATTR_USHORT)
+      SET_ATTR(ATTR_INT)
+      SET_ATTR(ATTR_UINT)
+      SET_ATTR(ATTR_LONG)
+      SET_ATTR(ATTR_ULONG)
+      SET_ATTR(ATTR_FLOAT)
+      SET_ATTR(ATTR_DOUBLE)
+
       inline Attribute& Node::get_list_attribute(NODE_INDEX node_index, ATTR_TYPE attr_type)
       {
         ensure_setup();
@@ -460,6 +536,10 @@ namespace maro
         auto attr_offset = compose_attr_offset_in_node(node_index, _dynamic_size_per_node, attr_def.offset);
         auto& target_attr = _dynamic_block[attr_offset];
 
+        // This function is used by list operations only, they will change the list and its size.
+        mark_dirty(attr_offset);
+        _is_list_store_dirty = true;
+
         return target_attr;
       }
 
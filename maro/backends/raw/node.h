@@ -36,6 +36,19 @@ namespace maro
       /// <returns>Attribute offset in memory block.</returns>
       inline size_t compose_attr_offset_in_node(NODE_INDEX node_index, size_t node_size, size_t attr_offset, SLOT_INDEX slot = 0);
 
+      /// <summary>
+      /// Number of attributes in each block of dynamic attributes, changes are tracked by block,
+      /// and unchanged blocks are shared between snapshots.
+      /// </summary>
+      const size_t ATTRIBUTE_BLOCK_SIZE = 256;
+
+      /// <summary>
+      /// Get number of blocks that can hold specified number of attributes.
+      /// </summary>
+      /// <param name="attr_number">Number of attributes.</param>
+      /// <returns>Number of blocks.</returns>
+      inline size_t get_block_number(size_t attr_number);
+
       /// <summary>
       /// Definition of attribute.
       /// </summary>
@@ -112,6 +125,18 @@ namespace maro
         // Is this node been setup.
         bool _is_setup = false;
 
+        // Blocks of dynamic attributes that changed since last snapshot, used by snapshot list to copy changed blocks only.
+        Bitset _dirty_blocks;
+
+        // Is any list of list attributes changed since last snapshot.
+        bool _is_list_store_dirty = true;
+
+        // Mark the block that contains specified dynamic attribute as dirty.
+        inline void mark_dirty(size_t attr_offset);
+
+        // Mark all blocks and lists as dirty.
+        inline void mark_all_dirty() noexcept;
+
         // Copy content from source node, for taking snapshot.
         void copy_from(const Node& node, bool is_deep_copy = false);
 
@@ -253,6 +278,16 @@ namespace maro
         /// <returns>Specified attribute instance.</returns>
         Attribute& get_attr(NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index);
 
+        /// <summary>
+        /// Set value of specified attribute, and mark it as changed for snapshot list.
+        /// </summary>
+        /// <param name="node_index">Index of node instance.</param>
+        /// <param name="attr_type">Type of attribute.</param>
+        /// <param name="slot_index">Slot index of attribute.</param>
+        /// <param name="value">Value to set.</param>
+        template<typename T>
+        void set_attr(NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index, T value);
+
         /// <summary>
         /// Append a value to list attribute.
         /// </summary>
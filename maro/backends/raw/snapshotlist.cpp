@@ -30,6 +30,11 @@ namespace maro
         _max_size = max_size;
 
         ensure_max_size();
+
+        // Slots of snapshots are allocated once.
+        reset();
+
+        _snapshots.resize(_max_size);
       }
 
       void SnapshotList::setup(Frame* frame)
@@ -44,22 +49,100 @@ namespace maro
         ensure_max_size();
         ensure_cur_frame();
 
-        // Try to remove exist tick.
-        _snapshots.erase(tick);
+        auto& nodes = _cur_frame->_nodes;
+
+        _latest_snapshot.nodes.resize(nodes.size());
+
+        for (size_t node_type = 0; node_type < nodes.size(); node_type++)
+        {
+          update_latest_node_snapshot(nodes[node_type], _latest_snapshot.nodes[node_type]);
+        }
+
+        USHORT index = 0;
+        auto target_tick_pair = _tick2index.find(tick);
+
+        if (target_tick_pair != _tick2index.end())
+        {
+          // Override exist tick.
+          index = target_tick_pair->second;
+        }
+        else
+        {
+          if (_tick2index.size() >= _max_size)
+          {
+            // Reuse slot of the oldest one if we reach the max size limitation.
+            auto oldest_tick_pair = _tick2index.begin();
+
+            index = oldest_tick_pair->second;
+
+            _tick2index.erase(oldest_tick_pair);
+          }
+          else
+          {
+            // Slots are used in order before reaching the max size.
+            index = USHORT(_tick2index.size());
+          }
+
+          _tick2index[tick] = index;
+        }
+
+        // Share blocks with latest snapshot, only the pointers are copied.
+        _snapshots[index] = _latest_snapshot;
+      }
+
+      void SnapshotList::update_latest_node_snapshot(Node& node, NodeSnapshot& node_snapshot)
+      {
+        node_snapshot.max_node_number = node._max_node_number;
+        node_snapshot.dynamic_size_per_node = node._dynamic_size_per_node;
+        node_snapshot.node_instance_masks = node._node_instance_masks;
+
+        // Copy according to max_node number, as memory block may larger than it (after reset).
+        auto valid_dynamic_size = node._dynamic_size_per_node * node._max_node_number;
+        auto block_number = get_block_number(valid_dynamic_size);
+        auto& blocks = node_snapshot.dynamic_blocks;
+
+        blocks.resize(block_number);
+
+        for (size_t block_index = 0; block_index < block_number; block_index++)
+        {
+          auto block_start = block_index * ATTRIBUTE_BLOCK_SIZE;
+          auto block_size = min(ATTRIBUTE_BLOCK_SIZE, valid_dynamic_size - block_start);
+          auto& block = blocks[block_index];
+
+          // Size of last block changes with node number.
+          if (block == nullptr || block->size() != block_size || node._dirty_blocks.get(block_index))
+          {
+            auto* block_data = &node._dynamic_block[block_start];
+
+            block = make_shared<const vector<Attribute>>(block_data, block_data + block_size);
+          }
+        }
 
-        // Remove oldest one if we reach the max size limitation.
-        if (_snapshots.size() > 0 && _snapshots.size() >= _max_size)
+        node._dirty_blocks.reset(false);
+
+        if (node_snapshot.list_store == nullptr || node._is_list_store_dirty)
         {
-          _snapshots.erase(_snapshots.begin());
+          node_snapshot.list_store = make_shared<const vector<vector<Attribute>>>(node._list_store);
+
+          node._is_list_store_dirty = false;
         }
+      }
 
-        // Copy current frame.
-        _snapshots[tick] = *_cur_frame;
+      const SnapshotList::Snapshot* SnapshotList::get_snapshot(int tick) const noexcept
+      {
+        auto target_tick_pair = _tick2index.find(tick);
+
+        if (target_tick_pair == _tick2index.end())
+        {
+          return nullptr;
+        }
+
+        return &_snapshots[target_tick_pair->second];
       }
 
       UINT SnapshotList::size() const noexcept
       {
-        return _snapshots.size();
+        return _tick2index.size();
       }
 
       UINT SnapshotList::max_size() const noexcept
@@ -76,7 +159,15 @@ namespace maro
 
       void SnapshotList::reset()
       {
-        _snapshots.clear();
+        _tick2index.clear();
+
+        // Release blocks, slots are kept.
+        for (auto& snapshot : _snapshots)
+        {
+          snapshot.nodes.clear();
+        }
+
+        _latest_snapshot.nodes.clear();
       }
 
       void SnapshotList::get_ticks(int* result) const
@@ -87,7 +178,7 @@ namespace maro
         }
 
         auto i = 0;
-        for (auto& iter : _snapshots)
+        for (auto& iter : _tick2index)
         {
           result[i] = iter.first;
 
@@ -113,7 +204,7 @@ namespace maro
         _query_parameters.is_list = attr_definition.is_list;
 
         shape.max_node_number = node_indices == nullptr ? cur_node.get_max_number() : node_length;
-        shape.tick_number = ticks == nullptr ? _snapshots.size() : tick_length;
+        shape.tick_number = ticks == nullptr ? _tick2index.size() : tick_length;
 
         if (!_query_parameters.is_list)
         {
@@ -140,7 +231,7 @@ namespace maro
           // we only support query 1 list attribute (1st one) for 1 node at 1 tick each time to reduce too much padding.
 
           // Make sure we have at least one tick.
-          if (_snapshots.size() == 0)
+          if (_tick2index.size() == 0)
           {
             throw SnapshotQueryNoSnapshotsError();
           }
@@ -157,19 +248,18 @@ namespace maro
           shape.max_node_number = 1;
 
           // Use first tick in parameter, or latest tick in snapshot.
-          int tick = ticks == nullptr ? _snapshots.rbegin()->first : ticks[0];
+          int tick = ticks == nullptr ? _tick2index.rbegin()->first : ticks[0];
           auto target_node_index = node_indices[0];
 
           // Check if tick exist.
-          auto target_tick_pair = _snapshots.find(tick);
+          auto* snapshot = get_snapshot(tick);
 
-          if (target_tick_pair == _snapshots.end())
+          if (snapshot == nullptr)
           {
             throw SnapshotQueryNoSnapshotsError();
           }
 
-          auto& snapshot = target_tick_pair->second;
-          auto& history_node = snapshot.get_node(node_type);
+          auto& history_node = snapshot->nodes[node_type];
 
           // Check if the node index exist.
           if (!history_node.is_node_alive(target_node_index))
@@ -177,7 +267,7 @@ namespace maro
             throw SnapshotListQueryNoNodeIndexError();
           }
 
-          shape.max_slot_number = history_node.get_slot_number(target_node_index, first_attr_type);
+          shape.max_slot_number = history_node.get_slot_number(target_node_index, attr_definition);
         }
 
         _query_parameters.ticks = ticks;
@@ -221,7 +311,7 @@ namespace maro
       {
         auto* ticks = _query_parameters.ticks;
         auto max_slot_number = _query_parameters.max_slot_number;
-        auto tick = ticks == nullptr ? _snapshots.rbegin()->first : ticks[0];
+        auto tick = ticks == nullptr ? _tick2index.rbegin()->first : ticks[0];
         auto node_index = _query_parameters.node_indices[0];
         auto attr_type = _query_parameters.attributes[0];
 
@@ -258,9 +348,9 @@ namespace maro
         // Prepare ticks if no one provided.
         if (_query_parameters.ticks == nullptr)
         {
-          tick_length = _snapshots.size();
+          tick_length = _tick2index.size();
 
-          for (auto& iter : _snapshots)
+          for (auto& iter : _tick2index)
           {
             _ticks.push_back(iter.first);
           }
@@ -320,7 +410,7 @@ namespace maro
         _query_parameters.reset();
       }
 
-      Attribute& SnapshotList::get_attr(int tick, NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index) noexcept
+      const Attribute& SnapshotList::get_attr(int tick, NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index) noexcept
       {
         NODE_TYPE node_type = extract_node_type(attr_type);
 
@@ -346,31 +436,29 @@ namespace maro
           return cur_node.get_attr(node_index, attr_type, slot_index);
         }
 
-        auto target_tick_pair = _snapshots.find(tick);
+        auto* snapshot = get_snapshot(tick);
 
         // Check if tick valid.
-        if (target_tick_pair == _snapshots.end())
+        if (snapshot == nullptr)
         {
           return _nan_attr;
         }
 
-        auto& snapshot = target_tick_pair->second;
-        auto& history_node = snapshot.get_node(node_type);
+        auto& history_node = snapshot->nodes[node_type];
 
         // Check if node index valid.
-        if (node_index >= history_node._max_node_number || !history_node.is_node_alive(node_index))
+        if (!history_node.is_node_alive(node_index))
         {
           return _nan_attr;
         }
 
         if (attr_def.is_list)
         {
-          auto attr_offset = compose_attr_offset_in_node(node_index, history_node._dynamic_size_per_node, attr_def.offset);
-          auto& target_attr = history_node._dynamic_block[attr_offset];
+          auto& target_attr = history_node.get_dynamic_attr(node_index, attr_def.offset);
 
           const auto list_index = target_attr.get_value<ATTR_UINT>();
 
-          auto& target_list = history_node._list_store[list_index];
+          auto& target_list = (*history_node.list_store)[list_index];
 
           // Check slot for list attribute.
           if (slot_index >= target_list.size())
@@ -381,9 +469,31 @@ namespace maro
           return target_list[slot_index];
         }
 
-        auto attr_offset = compose_attr_offset_in_node(node_index, history_node._dynamic_size_per_node, attr_def.offset, slot_index);
+        return history_node.get_dynamic_attr(node_index, attr_def.offset, slot_index);
+      }
+
+      bool SnapshotList::NodeSnapshot::is_node_alive(NODE_INDEX node_index) const noexcept
+      {
+        return node_index < max_node_number && node_instance_masks.get(node_index);
+      }
+
+      const Attribute& SnapshotList::NodeSnapshot::get_dynamic_attr(NODE_INDEX node_index, size_t attr_offset,
+        SLOT_INDEX slot_index) const noexcept
+      {
+        auto offset = compose_attr_offset_in_node(node_index, dynamic_size_per_node, attr_offset, slot_index);
+
+        return (*dynamic_blocks[offset / ATTRIBUTE_BLOCK_SIZE])[offset % ATTRIBUTE_BLOCK_SIZE];
+      }
+
+      SLOT_INDEX SnapshotList::NodeSnapshot::get_slot_number(NODE_INDEX node_index, const AttributeDef& attr_def) const noexcept
+      {
+        // Actual list size for list attribute.
+        if (attr_def.is_list)
+        {
+          return get_dynamic_attr(node_index, attr_def.offset).slot_number;
+        }
 
-        return history_node._dynamic_block[attr_offset];
+        return attr_def.slot_number;
       }
 
       void SnapshotList::SnapshotQueryParameters::reset()
@@ -434,11 +544,11 @@ namespace maro
           file << "\n";
 
           // Rows.
-          for(auto& snapshot_iter : _snapshots)
+          for(auto& tick_iter : _tick2index)
           {
-            auto tick = snapshot_iter.first;
-            auto& snapshot = snapshot_iter.second;
-            auto& history_node = snapshot.get_node(node._type);
+            auto tick = tick_iter.first;
+            auto& snapshot = _snapshots[tick_iter.second];
+            auto& history_node = snapshot.nodes[node._type];
 
             for (NODE_INDEX node_index = 0; node_index < node._max_node_number; node_index++)
             {
@@ -462,7 +572,7 @@ namespace maro
                 {
                   file << ",\"[";
 
-                  auto slot_number = history_node.get_slot_number(node_index, attr_def.attr_type);
+                  auto slot_number = history_node.get_slot_number(node_index, attr_def);
 
                   for(SLOT_INDEX slot_index = 0; slot_index < slot_number; slot_index++)
                   {
@@ -6,6 +6,7 @@
 
 
 #include <map>
+#include <memory>
 #include <vector>
 #include <string>
 #include <iostream>
@@ -84,10 +85,63 @@ namespace maro
           void reset();
         };
 
+        /// <summary>
+        /// States of a node type at a tick.
+        /// NOTE: blocks and list store are shared with other snapshots if they not changed, so they must not be
+        /// changed after taking snapshot.
+        /// </summary>
+        struct NodeSnapshot
+        {
+          // Max number of node instance at this tick.
+          NODE_INDEX max_node_number = 0;
+
+          // Size of each node instance in dynamic block.
+          size_t dynamic_size_per_node = 0;
+
+          // Masks of alive node instances.
+          Bitset node_instance_masks;
+
+          // Blocks of dynamic attributes, each block holds ATTRIBUTE_BLOCK_SIZE attributes except the last one.
+          vector<shared_ptr<const vector<Attribute>>> dynamic_blocks;
+
+          // Lists of list attributes.
+          shared_ptr<const vector<vector<Attribute>>> list_store;
+
+          /// <summary>
+          /// Is specified node instance alive at this tick.
+          /// </summary>
+          bool is_node_alive(NODE_INDEX node_index) const noexcept;
+
+          /// <summary>
+          /// Get dynamic attribute of a node instance, node index and slot index must be valid.
+          /// </summary>
+          const Attribute& get_dynamic_attr(NODE_INDEX node_index, size_t attr_offset, SLOT_INDEX slot_index = 0) const noexcept;
+
+          /// <summary>
+          /// Get slot number of attribute of a node instance, it is the list size at this tick for list attribute.
+          /// </summary>
+          SLOT_INDEX get_slot_number(NODE_INDEX node_index, const AttributeDef& attr_def) const noexcept;
+        };
+
+        /// <summary>
+        /// Snapshot of all node types at a tick.
+        /// </summary>
+        struct Snapshot
+        {
+          // Node type -> its states.
+          vector<NodeSnapshot> nodes;
+        };
+
 
       private:
-        // Tick and its snapshot frame, we will keep a copy of frame.
-        map<int, Frame> _snapshots;
+        // Snapshot slots, allocated with max size, slot of the oldest snapshot will be reused for new one.
+        vector<Snapshot> _snapshots;
+
+        // Tick and index of its snapshot slot.
+        map<int, USHORT> _tick2index;
+
+        // States of latest snapshot, changed blocks since it will be copied for next snapshot, others are shared.
+        Snapshot _latest_snapshot;
 
         // Max size of snapshot is memory.
         USHORT _max_size = 0;
@@ -114,7 +168,13 @@ namespace maro
 
         // Get attribute from specified tick, this function will not throw exception, it will return a NAN attribute
         // if invalid.
-        Attribute& get_attr(int tick, NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index) noexcept;
+        const Attribute& get_attr(int tick, NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index) noexcept;
+
+        // Get snapshot of specified tick, nullptr if not exist.
+        const Snapshot* get_snapshot(int tick) const noexcept;
+
+        // Update states of node in latest snapshot from current frame, copy changed blocks only.
+        void update_latest_node_snapshot(Node& node, NodeSnapshot& node_snapshot);
 
         // Make sure currect frame not null.
         inline void ensure_cur_frame();
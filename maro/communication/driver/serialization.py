@@ -0,0 +1,129 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+# native lib
+import io
+import pickle
+import sys
+from typing import List
+
+# third party package
+import numpy as np
+
+from ..message import Message
+
+# The first frame of a zero-copy message, used to tell it from a message pickled as a whole.
+ZERO_COPY_MARKER = b"MARO_ZERO_COPY"
+
+
+class _ZeroCopyPickler(pickle.Pickler):
+    """Pickler that takes the data of large numpy arrays and tensors out of the pickled bytes.
+
+    The data buffers are collected in ``buffers``, the pickled bytes only keep their dtype and shape.
+    """
+
+    def __init__(self, file, min_zero_copy_bytes: int):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._min_zero_copy_bytes = min_zero_copy_bytes
+        self.buffers = []
+
+    def persistent_id(self, obj):
+        obj_type = type(obj)
+
+        if obj_type is np.ndarray:
+            return self._add_buffer("ndarray", obj)
+
+        # Torch is an optional dependency, there is no tensor to send if it is not imported.
+        torch = sys.modules.get("torch", None)
+
+        if (
+            torch is not None and obj_type is torch.Tensor and obj.device.type == "cpu"
+            and obj.layout == torch.strided and not obj.requires_grad
+        ):
+            try:
+                array = obj.numpy()
+            except TypeError:
+                # Dtype not supported by numpy, like bfloat16.
+                return None
+
+            return self._add_buffer("tensor", array)
+
+        return None
+
+    def _add_buffer(self, kind: str, array: np.ndarray):
+        if array.dtype.hasobject or array.nbytes == 0 or array.nbytes < self._min_zero_copy_bytes:
+            return None
+
+        self.buffers.append(np.ascontiguousarray(array))
+
+        return kind, len(self.buffers) - 1, array.dtype.str, array.shape
+
+
+class _ZeroCopyUnpickler(pickle.Unpickler):
+    """Unpickler that restores numpy arrays and tensors from the data frames."""
+
+    def __init__(self, file, frames: list):
+        super().__init__(file)
+        self._frames = frames
+
+    def persistent_load(self, pid):
+        kind, index, dtype, shape = pid
+
+        array = np.frombuffer(_get_buffer(self._frames[index]), dtype=dtype).reshape(shape)
+
+        if kind == "tensor":
+            import torch
+
+            return torch.from_numpy(array.copy())
+
+        # NOTE: array shares the memory with the received frame, which may be bytes or a writable zmq.Frame,
+        # make it read-only in both cases.
+        array.flags.writeable = False
+
+        return array
+
+
+def _get_buffer(frame):
+    """Get the buffer of a received frame, it may be a zmq.Frame if received without copy."""
+    return getattr(frame, "buffer", frame)
+
+
+def serialize_message(message: Message, min_zero_copy_bytes: int = 0) -> list:
+    """Serialize a message into multipart frames.
+
+    The frames are a marker, the pickled message without array data, then the data of each array or tensor.
+    So the arrays can be sent with ``send_multipart(frames, copy=False)`` without extra copies.
+
+    Args:
+        message (Message): Message to serialize.
+        min_zero_copy_bytes (int): Arrays smaller than this are pickled with message, as each frame has its own
+            overhead. Defaults to 0.
+
+    Returns:
+        list: Frames of the message.
+    """
+    file = io.BytesIO()
+    pickler = _ZeroCopyPickler(file, min_zero_copy_bytes)
+    pickler.dump(message)
+
+    return [ZERO_COPY_MARKER, file.getbuffer()] + pickler.buffers
+
+
+def deserialize_message(frames: List) -> Message:
+    """Deserialize a message from received frames.
+
+    Both the frames from ``serialize_message`` and the single frame message sent by ``send_pyobj`` are supported,
+    so peers with different serialization settings can talk to each other.
+
+    Args:
+        frames (List): Received frames, bytes or zmq.Frame.
+
+    Returns:
+        Message: Deserialized message.
+    """
+    if len(frames) > 1 and bytes(_get_buffer(frames[0])) == ZERO_COPY_MARKER:
+        unpickler = _ZeroCopyUnpickler(io.BytesIO(_get_buffer(frames[1])), frames[2:])
+
+        return unpickler.load()
+
+    return pickle.loads(_get_buffer(frames[0]))
@@ -20,10 +20,13 @@ from maro.utils.exit_code import NON_RESTART_EXIT_CODE
 from ..message import Message
 from ..utils import default_parameters
 from .abs_driver import AbsDriver
+from .serialization import deserialize_message, serialize_message
 
 PROTOCOL = default_parameters.driver.zmq.protocol
 SEND_TIMEOUT = default_parameters.driver.zmq.send_timeout
 RECEIVE_TIMEOUT = default_parameters.driver.zmq.receive_timeout
+ZERO_COPY = default_parameters.driver.zmq.zero_copy
+MIN_ZERO_COPY_BYTES = default_parameters.driver.zmq.min_zero_copy_bytes
 
 
 class ZmqDriver(AbsDriver):
@@ -36,6 +39,15 @@ class ZmqDriver(AbsDriver):
             Defaults to -1.
         receive_timeout (int): The timeout in milliseconds for receiving message. If -1, no timeout (infinite).
             Defaults to -1.
+        zero_copy (bool): If True, numpy arrays and tensors in message will be sent as separate frames without
+            pickling and copying, other objects are still pickled. Messages of both ways can always be received,
+            so it can be set for each proxy independently. As frames refer to the memory of arrays and tensors
+            (``Tensor.numpy()`` shares the storage), sending waits until ZMQ released all the frames, the send
+            timeout applies to this waiting too, so the payload can be modified safely once sending returned.
+            Received arrays are read-only views of the received frames, unlike the writable ones of plain pickle,
+            received tensors are copied so they are writable. Defaults to False.
+        min_zero_copy_bytes (int): Arrays and tensors smaller than this are pickled with message even if zero copy
+            enabled. Defaults to 65536.
         logger: The logger instance or DummyLogger. Defaults to DummyLogger().
     """
 
@@ -45,12 +57,16 @@ class ZmqDriver(AbsDriver):
         protocol: str = PROTOCOL,
         send_timeout: int = SEND_TIMEOUT,
         receive_timeout: int = RECEIVE_TIMEOUT,
+        zero_copy: bool = ZERO_COPY,
+        min_zero_copy_bytes: int = MIN_ZERO_COPY_BYTES,
         logger=DummyLogger()
     ):
         self._component_type = component_type
         self._protocol = protocol
         self._send_timeout = send_timeout
         self._receive_timeout = receive_timeout
+        self._zero_copy = zero_copy
+        self._min_zero_copy_bytes = min_zero_copy_bytes
         self._ip_address = socket.gethostbyname(socket.gethostname())
         self._zmq_context = zmq.Context()
         self._disconnected_peer_name_list = []
@@ -176,11 +192,10 @@ class ZmqDriver(AbsDriver):
                 raise DriverReceiveError(f"Driver cannot receive message as {e}")
 
             if self._unicast_receiver in sockets:
-                recv_message = self._unicast_receiver.recv_pyobj()
+                recv_message = deserialize_message(self._unicast_receiver.recv_multipart(copy=False))
                 self._logger.debug(f"Receive a message from {recv_message.source} through unicast receiver.")
             else:
-                _, recv_message = self._broadcast_receiver.recv_multipart()
-                recv_message = pickle.loads(recv_message)
+                recv_message = deserialize_message(self._broadcast_receiver.recv_multipart(copy=False)[1:])
                 self._logger.debug(f"Receive a message from {recv_message.source} through broadcast receiver.")
 
             yield recv_message
@@ -195,7 +210,13 @@ class ZmqDriver(AbsDriver):
             message (class): Message to be sent.
         """
         try:
-            self._unicast_sender_dict[message.destination].send_pyobj(message)
+            if self._zero_copy:
+                self._send_zero_copy(
+                    self._unicast_sender_dict[message.destination],
+                    serialize_message(message, self._min_zero_copy_bytes)
+                )
+            else:
+                self._unicast_sender_dict[message.destination].send_pyobj(message)
             self._logger.debug(f"Send a {message.tag} message to {message.destination}.")
             return message.session_id
         except KeyError as key_error:
@@ -215,11 +236,29 @@ class ZmqDriver(AbsDriver):
             message(class): Message to be sent.
         """
         try:
-            self._broadcast_sender.send_multipart([topic.encode(), pickle.dumps(message)])
+            if self._zero_copy:
+                self._send_zero_copy(
+                    self._broadcast_sender, [topic.encode()] + serialize_message(message, self._min_zero_copy_bytes)
+                )
+            else:
+                self._broadcast_sender.send_multipart([topic.encode(), pickle.dumps(message)])
             self._logger.debug(f"Broadcast a {message.tag} message to all {topic}.")
         except Exception as e:
             raise DriverSendError(f"Failure to broadcast message caused by: {e}")
 
+    def _send_zero_copy(self, sender: zmq.Socket, frames: list):
+        """Send frames without copying, and wait until ZMQ does not refer to the memory of them any more.
+
+        Args:
+            sender (zmq.Socket): Socket to send frames.
+            frames (list): Frames of message, items can be any object that provides the buffer interface.
+        """
+        frames = [zmq.Frame(frame, track=True) for frame in frames]
+        sender.send_multipart(frames, copy=False)
+
+        # Raise zmq.NotDone if timeout, as the payload may be still referred.
+        zmq.MessageTracker(*frames).wait(-1 if self._send_timeout < 0 else self._send_timeout / 1000)
+
     def close(self):
         """Close ZMQ context and sockets."""
         # Avoid hanging infinitely
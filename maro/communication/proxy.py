@@ -53,7 +53,8 @@ class Proxy:
             E.g. Dict['learner': 1, 'actor': 2]
         driver_type (Enum): A type of communication driver class uses to communicate with other components.
             Defaults to ``DriverType.ZMQ``.
-        driver_parameters (Dict): The arguments for communication driver class initial. Defaults to None.
+        driver_parameters (Dict): The arguments for communication driver class initial, e.g. ``{"zero_copy": True}``
+            to send numpy arrays and tensors without pickling for this proxy. Defaults to None.
         redis_address (Tuple): Hostname and port of the Redis server. Defaults to ("localhost", 6379).
         max_retries (int): Maximum number of retries before raising an exception. Defaults to 5.
         retry_interval_base_value (float): The time interval between attempts. Defaults to 0.1.
@@ -28,6 +28,8 @@ driver = convert_dottable({
     "zmq": {
         "protocol": "tcp",
         "send_timeout": -1,
-        "receive_timeout": -1
+        "receive_timeout": -1,
+        "zero_copy": False,
+        "min_zero_copy_bytes": 65536
     }
 })
@@ -2,6 +2,6 @@
 # Licensed under the MIT license.
 
 from .binary_converter import BinaryConverter
-from .binary_reader import BinaryReader, ItemTickPicker
+from .binary_reader import BinaryReader, ItemTickBlockPicker, ItemTickPicker
 
-__all__ = ["BinaryReader", "BinaryConverter", "ItemTickPicker"]
+__all__ = ["BinaryReader", "BinaryConverter", "ItemTickPicker", "ItemTickBlockPicker"]
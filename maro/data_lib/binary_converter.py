@@ -2,8 +2,17 @@
 # Licensed under the MIT license.
 
 import calendar
+import io
+import os
 import warnings
-from csv import DictReader
+from collections import namedtuple
+from csv import DictReader, reader as csv_reader
+from datetime import datetime
+from itertools import islice
+from multiprocessing import Pool
+from typing import Iterable
+
+import numpy as np
 
 from dateutil.parser import parse as parse_dt
 from dateutil.tz import UTC, gettz
@@ -65,6 +74,168 @@ def convert_val(val: str, dtype: str, tzone):
     return result
 
 
+# Datetime formats that can be parsed without dateutil, the result is same as dateutil parser.
+datetime_formats = [
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y"
+]
+
+# Number of rows to convert in a batch for single process converting.
+ROWS_PER_BATCH = 10000
+
+# Result of converting a batch of rows.
+ConvertedItems = namedtuple(
+    "ConvertedItems", ["data", "item_count", "starttime", "endtime", "first_time", "last_time", "is_sorted"]
+)
+
+
+class ItemsConverter:
+    """Convert csv rows into item bytes with specified meta.
+
+    It is same as calling convert_val for each value, but parses datetime with known formats first,
+    and remember the last matched format of each field, as all values of a column usually have same format.
+
+    Args:
+        meta (BinaryMeta): Meta of items.
+    """
+    def __init__(self, meta: BinaryMeta):
+        self._meta = meta
+        self._tzone = UTC if meta.time_zone is None else gettz(meta.time_zone)
+        # field -> (column name, data type, convert function)
+        self._fields = [
+            (field, meta.columns[field], dtype, dtype_convert_map[dtype]) for field, dtype in meta.items().items()
+        ]
+        # field -> index of last matched datetime format
+        self._datetime_format_index = {}
+
+    def convert(self, rows: Iterable[dict]) -> ConvertedItems:
+        """Convert rows into item bytes, rows contain invalid value will be skipped.
+
+        Args:
+            rows (Iterable[dict]): Rows from csv.DictReader.
+
+        Returns:
+            ConvertedItems: Item bytes, item count, and timestamp statistics of items.
+        """
+        buffer = memoryview(bytearray(self._meta.item_size))
+        data = bytearray()
+        item_count = 0
+        starttime = endtime = first_time = last_time = None
+        is_sorted = True
+        values = [0] * len(self._fields)
+
+        for row in rows:
+            is_valid = True
+            timestamp = None
+
+            for field_index, (field, column_name, dtype, convert_func) in enumerate(self._fields):
+                # NOTE: we allow field not exist in csv file, the value will be zero
+                if column_name not in row:
+                    values[field_index] = 0
+                    continue
+
+                val = self._convert_val(field, row[column_name], dtype, convert_func)
+
+                if val is None:
+                    is_valid = False
+                    break
+
+                values[field_index] = val
+
+                if field == "timestamp":
+                    timestamp = val
+
+            if not is_valid:
+                continue
+
+            self._meta.item_to_bytes(values, buffer)
+            data += buffer
+            item_count += 1
+
+            # keep the start and end tick
+            if timestamp is not None:
+                if first_time is None:
+                    first_time = starttime = endtime = timestamp
+                else:
+                    if timestamp < last_time:
+                        is_sorted = False
+
+                    starttime = min(starttime, timestamp)
+                    endtime = max(endtime, timestamp)
+
+                last_time = timestamp
+
+        return ConvertedItems(data, item_count, starttime, endtime, first_time, last_time, is_sorted)
+
+    def _convert_val(self, field: str, val: str, dtype: str, convert_func):
+        try:
+            # convert to float first, to avoid int("1.111") error
+            return convert_func(float(val))
+        except ValueError:
+            pass
+
+        dt = self._parse_datetime(field, val.strip("\"\'").strip())
+
+        if dt is None:
+            # fallback to general parser
+            return convert_val(val, dtype, self._meta.time_zone)
+
+        return calendar.timegm(dt.replace(tzinfo=self._tzone).astimezone(UTC).timetuple())
+
+    def _parse_datetime(self, field: str, val: str) -> datetime:
+        # "YYYY-mm-dd HH:MM:SS[.ffffff]" is the most common one, parse it by position
+        if (
+            len(val) >= 19 and val[4] == "-" and val[7] == "-" and val[10] in " T" and val[13] == ":"
+            and val[16] == ":" and (len(val) == 19 or (val[19] == "." and 20 < len(val) <= 26 and val[20:].isdigit()))
+        ):
+            parts = (val[0:4], val[5:7], val[8:10], val[11:13], val[14:16], val[17:19])
+
+            if all(part.isdigit() for part in parts):
+                try:
+                    return datetime(*[int(part) for part in parts])
+                except ValueError:
+                    return None
+
+        format_index = self._datetime_format_index.get(field, 0)
+
+        for i in range(len(datetime_formats)):
+            index = (format_index + i) % len(datetime_formats)
+
+            try:
+                dt = datetime.strptime(val, datetime_formats[index])
+            except ValueError:
+                continue
+
+            self._datetime_format_index[field] = index
+
+            return dt
+
+        return None
+
+
+def _convert_csv_chunk(args: tuple) -> ConvertedItems:
+    """Convert a byte range of csv file in worker process."""
+    csv_file, meta_file, field_names, start, end = args
+
+    meta = BinaryMeta()
+    meta.from_file(meta_file)
+
+    with open(csv_file, "rb") as csv_fp:
+        csv_fp.seek(start)
+        chunk = csv_fp.read(end - start)
+
+    reader = DictReader(io.TextIOWrapper(io.BytesIO(chunk), newline=""), fieldnames=field_names)
+
+    return ItemsConverter(meta).convert(reader)
+
+
 class BinaryConverter:
     """Convert csv file into binary with specified meta.
 
@@ -79,15 +250,29 @@ class BinaryConverter:
         meta_file(str): Path to the meta file (yaml).
         utc_start_timestamp(int): Start timestamp in UTC which will be considered as tick 0,
             used to adjust the data reader pipeline.
+        workers(int): Number of processes to convert csv file, csv file will be split into chunks by lines,
+            so the values should not contain line breaks if more than 1 worker. Defaults to 1.
+        chunk_size(int): Size in bytes of csv chunk for each worker. Defaults to 16MB.
+        sort_by_timestamp(bool): If True, items will be sorted by timestamp (stable) when flushing,
+            or a warning will be raised if items are not in timestamp order. Defaults to False.
 
     """
-    def __init__(self, output_file: str, meta_file: str, utc_start_timestamp: int = None):
+    def __init__(
+        self, output_file: str, meta_file: str, utc_start_timestamp: int = None,
+        workers: int = 1, chunk_size: int = 16 * 1024 * 1024, sort_by_timestamp: bool = False
+    ):
         self._output_fp = None
+        self._meta_file = meta_file
         self._meta = BinaryMeta()
         self._meta.from_file(meta_file)
 
         self._output_fp = open(output_file, "wb+")
 
+        self._workers = workers
+        self._chunk_size = chunk_size
+        self._sort_by_timestamp = sort_by_timestamp
+        self._items_converter = ItemsConverter(self._meta)
+
         self._item_count = 0
         self._item_size = self._meta.item_size
         self._meta_offset = header_struct.size
@@ -100,6 +285,11 @@ class BinaryConverter:
         # is starttime changed for 1st time
         self._is_starttime_changed = False
 
+        # timestamp of last item, used to check if items are sorted
+        self._last_timestamp = None
+        self._is_sorted = True
+        self._is_unsorted_warned = False
+
         # if we have a start timestamp, then use it in binary
         if utc_start_timestamp is not None:
             self._starttime = utc_start_timestamp
@@ -111,22 +301,40 @@ class BinaryConverter:
         self._update_header()
         self._write_meta()
 
+    @property
+    def is_sorted(self) -> bool:
+        """bool: Are the items converted until now in timestamp order."""
+        return self._is_sorted
+
     def add_csv(self, csv_file: str):
-        """Convert specified csv file into current binary file, this converter will not sort the item.
+        """Convert specified csv file into current binary file, this converter will not sort the item,
+        unless sort_by_timestamp is enabled.
         This method can be called several times to convert multiple csv file into one binary,
         the order will be same as calling sequence.
 
         Args:
             csv_file(str): Csv to convert.
         """
-        with open(csv_file, newline='') as csv_fp:
-            reader = DictReader(csv_fp)
+        if self._workers > 1:
+            self._write_items_parallel(csv_file)
+        else:
+            with open(csv_file, newline='') as csv_fp:
+                reader = DictReader(csv_fp)
 
-            # write items
-            self._write_items(reader)
+                # write items
+                self._write_items(reader)
 
     def flush(self):
         """Flush the result into output file."""
+        if not self._is_sorted:
+            if self._sort_by_timestamp:
+                self._sort_items()
+            else:
+                if not self._is_unsorted_warned:
+                    self._is_unsorted_warned = True
+
+                    warnings.warn("Items are not sorted by timestamp, enable sort_by_timestamp to sort them.")
+
         self._update_header()
 
     def __del__(self):
@@ -172,58 +380,87 @@ class BinaryConverter:
 
     def _write_items(self, reader: DictReader):
         """Write items into binary."""
-        # columns need to convert
-        columns = self._meta.columns
-        # values buffer from each row, used to pack into binary
-        values = [0] * len(columns.keys())
-        # item binary buffer
-        buffer = memoryview(bytearray(self._meta.item_size))
-        # field -> data type
-        field_type_dict = self._meta.items()
-        # some column's value may cannot be parse, will skip it
-        has_invalid_column = False
+        while True:
+            # convert rows in batches, to avoid keeping whole file in memory
+            rows = list(islice(reader, ROWS_PER_BATCH))
 
-        for row in reader:
-            field_index = 0
-            has_invalid_column = False
+            if len(rows) == 0:
+                break
 
-            # clear the values
-            for j in range(len(values)):
-                values[j] = 0
+            self._write_converted_items(self._items_converter.convert(rows))
 
-            # read from current row
-            for field, dtype in field_type_dict.items():
-                column_name = columns[field]
+    def _write_items_parallel(self, csv_file: str):
+        """Split csv file into chunks by lines, convert them with multiple processes, and write in order."""
+        with open(csv_file, newline='') as csv_fp:
+            field_names = next(csv_reader(csv_fp), None)
 
-                # NOTE: we allow field not exist in csv file, the value will be zero
-                if column_name in row:
-                    val = convert_val(row[column_name], dtype, self._meta.time_zone)
-                    values[field_index] = val
-
-                    if val is None:
-                        has_invalid_column = True
-                        break
-
-                    # keep the start and end tick
-                    if field == "timestamp":
-                        if not self._is_starttime_changed:
-                            self._is_starttime_changed = True
-                            self._starttime = val
-                        else:
-                            self._starttime = min(self._starttime, val)
-
-                        self._endtime = max(val, self._endtime)
-
-                field_index += 1
-
-            if not has_invalid_column:
-                # convert item into bytes buffer, and write to file
-                self._meta.item_to_bytes(values, buffer)
-                self._output_fp.write(buffer)
-
-                # update header fields for final update
-                self._item_count += 1
-                self._data_size += self._item_size
+        if field_names is None:
+            return
+
+        # byte ranges of chunks, start from the line after header
+        chunks = []
+
+        with open(csv_file, "rb") as csv_fp:
+            csv_fp.readline()
+
+            start = csv_fp.tell()
+            file_size = os.fstat(csv_fp.fileno()).st_size
+
+            while start < file_size:
+                csv_fp.seek(min(file_size, start + self._chunk_size))
+                csv_fp.readline()
+
+                end = csv_fp.tell()
+                chunks.append((csv_file, self._meta_file, field_names, start, end))
+                start = end
+
+        with Pool(min(self._workers, max(1, len(chunks)))) as pool:
+            for converted in pool.imap(_convert_csv_chunk, chunks):
+                self._write_converted_items(converted)
+
+    def _write_converted_items(self, converted: ConvertedItems):
+        """Write converted items, and update header fields."""
+        if converted.item_count == 0:
+            return
+
+        self._output_fp.write(converted.data)
+
+        # update header fields for final update
+        self._item_count += converted.item_count
+        self._data_size += converted.item_count * self._item_size
+
+        if converted.first_time is None:
+            return
+
+        # keep the start and end tick
+        if not self._is_starttime_changed:
+            self._is_starttime_changed = True
+            self._starttime = converted.starttime
+        else:
+            self._starttime = min(self._starttime, converted.starttime)
+
+        self._endtime = max(converted.endtime, self._endtime)
+
+        if not converted.is_sorted:
+            self._is_sorted = False
+        elif self._last_timestamp is not None and converted.first_time < self._last_timestamp:
+            self._is_sorted = False
+
+        self._last_timestamp = converted.last_time
+
+    def _sort_items(self):
+        """Sort items in output file by timestamp, items with same timestamp keep the order."""
+        self._output_fp.seek(self._data_offset, 0)
+
+        items = np.frombuffer(self._output_fp.read(self._data_size), dtype=self._meta.item_dtype)
+        items = items[np.argsort(items["timestamp"], kind="stable")]
+
+        self._output_fp.seek(self._data_offset, 0)
+        self._output_fp.write(items.tobytes())
+        self._output_fp.seek(0, 2)
+
+        self._last_timestamp = int(items["timestamp"][-1])
+        self._is_sorted = True
 
 
 __all__ = ['BinaryConverter']
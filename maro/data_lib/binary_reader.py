@@ -1,6 +1,7 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import copy
 import mmap
 import os
 import sys
@@ -8,6 +9,7 @@ import warnings
 from datetime import datetime
 from typing import Union
 
+import numpy as np
 from dateutil.relativedelta import relativedelta
 from dateutil.tz import UTC
 
@@ -53,10 +55,14 @@ class ItemBuffer:
         index = 0
 
         while index < self.item_number:
-            yield self._meta.item_from_bytes(self._bytes[index * self._meta.item_size:], self._enable_adjust_ratio)
+            yield self.item(index)
 
             index += 1
 
+    def item(self, index: int):
+        """Get item at specified index of buffer."""
+        return self._meta.item_from_bytes(self._bytes[index * self._meta.item_size:], self._enable_adjust_ratio)
+
     def write(self, contents: Union[bytes, bytearray, memoryview]):
         if contents is None:
             self.item_number = 0
@@ -68,8 +74,104 @@ class ItemBuffer:
         self.item_number = int(len(contents) / self._meta.item_size)
 
 
+class ItemIterator:
+    """Iterator of items in a time range.
+
+    It keeps its own reading position and buffer, so iterators from same reader will not affect each other,
+    and it can be copied to continue reading from the same position.
+    """
+
+    def __init__(self, reader, start_time_offset: int, start_time: int, end_time: int):
+        self._reader = reader
+        self._start_time_offset = start_time_offset
+        self._start_time = start_time
+        self._end_time = end_time
+
+        # check if we have used this filter
+        self._has_filter_history = start_time_offset in reader._starttime_offset_history
+
+        # file offset to read next buffer
+        self._offset = reader._starttime_offset_history.get(start_time_offset, reader.header.data_offset)
+        self._buffer = ItemBuffer(reader._buffer_size, reader.meta, reader._enable_value_adjust)
+
+        # index of next item in buffer
+        self._index = 0
+        self._is_finished = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        buffer = self._buffer
+
+        while not self._is_finished:
+            if self._index >= buffer.item_number:
+                self._fulfill_buffer()
+
+                if buffer.item_number == 0:
+                    break
+
+            item = buffer.item(self._index)
+
+            self._index += 1
+
+            if item.timestamp > self._end_time:
+                break
+
+            if self._start_time <= item.timestamp:
+                # record the filter history
+                if not self._has_filter_history:
+                    self._has_filter_history = True
+
+                    # return to the start of the buffer
+                    self._reader._starttime_offset_history[self._start_time_offset] = \
+                        self._offset - buffer.item_number * self._reader.meta.item_size
+
+                return item
+
+        self._is_finished = True
+
+        raise StopIteration
+
+    def __deepcopy__(self, memo: dict):
+        """Copy iterator with its reading position, the reader is shared as it is read-only."""
+        iterator = copy.copy(self)
+
+        item_size = self._reader.meta.item_size
+
+        iterator._buffer = ItemBuffer(self._reader._buffer_size, self._reader.meta, self._reader._enable_value_adjust)
+        iterator._buffer.write(self._buffer._bytes[:self._buffer.item_number * item_size])
+
+        memo[id(self)] = iterator
+
+        return iterator
+
+    def _fulfill_buffer(self):
+        """Fulfill buffer from file."""
+        reader = self._reader
+
+        size_to_read = reader.meta.item_size * reader._buffer_size
+        remaining_size = reader.header.data_offset + reader.header.data_size - self._offset
+
+        size_to_read = min(size_to_read, remaining_size)
+
+        if size_to_read <= 0:
+            self._buffer.write(None)
+        else:
+            self._buffer.write(reader._mmap[self._offset:self._offset + size_to_read])
+
+            self._offset += size_to_read
+
+        self._index = 0
+
+
 class ItemTickPicker:
-    """Wrapper to support get items by tick."""
+    """Wrapper to support get items by tick.
+
+    NOTE:
+        Picker can be copied with copy.deepcopy if the items are from BinaryReader,
+        the copy will continue picking from current position.
+    """
 
     def __init__(self, item_generaotr, starttime: int, time_unit: str):
         self._item_generaotr = item_generaotr
@@ -112,6 +214,34 @@ class ItemTickPicker:
                 pass
 
 
+class ItemTickBlockPicker:
+    """Wrapper to support get items of a tick as column arrays.
+
+    Different with ItemTickPicker, ticks can be picked in any order, as it searches the sorted timestamps.
+    """
+
+    def __init__(self, reader, start_index: int, end_index: int, time_unit: str):
+        self._reader = reader
+        self._start_index = start_index
+        self._end_index = end_index
+        self._seconds_per_unit = unit_seconds(time_unit)
+
+    def items(self, tick: int):
+        """Get items for specified tick.
+
+        Args:
+            tick (int): Tick (relative to binary start time) to pick.
+
+        Returns:
+            namedtuple: Columns of items that in this tick, each field is a numpy array.
+        """
+        ticks_in_seconds = self._reader.header.starttime + tick * self._seconds_per_unit
+
+        return self._reader._get_columns(
+            ticks_in_seconds, ticks_in_seconds + self._seconds_per_unit, self._start_index, self._end_index
+        )
+
+
 class BinaryReader:
     """Read binary file converted by csv converter.
 
@@ -132,6 +262,14 @@ class BinaryReader:
                 for item in picker.items(tick):
                     print(item)
 
+            # Or get items of a tick as column arrays (block mode), without creating an object for each item.
+            picker = reader.items_tick_block_picker(0, 10, time_unit="m")
+
+            for tick in range(0, 10):
+                items = picker.items(tick)
+
+                print(items.timestamp, len(items.timestamp))
+
     Args:
         file_path(str): Binary file path to read.
         enable_value_adjust(bool): If reader should adjust the value of fields that enabled
@@ -162,19 +300,13 @@ class BinaryReader:
         self._read_header()
         self._read_meta()
 
-        # double buffer to read data
-        self._item_buffer = ItemBuffer(
-            buffer_size, self._meta, enable_value_adjust)
-
         # contains starttime offset related file offset, used in items() method
         # use this to speedup the querying
         self._starttime_offset_history = {}
 
-        # move the pointer to data area
-        self._mmap.seek(self.header.data_offset)
-
-        # data length (in byte) we already loaded, used to check data boundary
-        self._readed_data_size = 0
+        # structured array over the data area and its sorted timestamps, used by block mode
+        self._item_arr: np.ndarray = None
+        self._timestamps: np.ndarray = None
 
     @property
     def meta(self) -> BinaryMeta:
@@ -215,14 +347,8 @@ class BinaryReader:
             time_unit (str): Unit of time used to calculate offset, 's': seconds, 'm': minute, 'h': hour, 'd': day.
 
         Returns
-            interable: Items in specified range.
+            ItemIterator: Iterator of items in specified range.
         """
-        # reset to read from beginning
-        self.reset()
-
-        # default offset
-        offset = self.header.data_offset
-
         # time range to filter
         start_time = calc_time_offset(self.header.starttime, start_time_offset, time_unit)
 
@@ -232,59 +358,55 @@ class BinaryReader:
             end_time = calc_time_offset(
                 self.header.starttime, end_time_offset, time_unit)
 
-        # check if we have used this filter
-        has_filter_history = False
-
-        if start_time_offset in self._starttime_offset_history:
-            has_filter_history = True
+        return ItemIterator(self, start_time_offset, start_time, end_time)
 
-            offset = self._starttime_offset_history[start_time_offset]
+    def items_block(self, start_time_offset: int = 0, end_time_offset: int = None, time_unit: str = "s"):
+        """Get all items in specified time range as column arrays.
 
-        # fulfill buffer for first time using
-        # seek to the data part to go through all the items
-        self._mmap.seek(offset)
-
-        self._fulfill_buffer()
-
-        pre_mmap_offset = self._mmap.tell()
+        NOTE:
+            Block mode map items as a numpy structured array over the file, then search by timestamp,
+            so items will be sorted by timestamp if they are not.
 
-        while True:
-            # read and return an item from buffer
-            buffer = self._item_buffer
+        Args:
+            start_time_offset(int): Specified the which tick (in seconds) to start.
+            end_time_offset(int): Specified the end tick (in seconds) to start.
+            time_unit (str): Unit of time used to calculate offset, 's': seconds, 'm': minute, 'h': hour, 'd': day.
 
-            if buffer.item_number == 0:
-                break
+        Returns:
+            namedtuple: Columns of items in specified range, each field is a numpy array.
+        """
+        start_index, end_index = self._get_index_range(start_time_offset, end_time_offset, time_unit)
 
-            is_finished = False
+        return self._get_columns(None, None, start_index, end_index)
 
-            for item in buffer.items():
-                if start_time <= item.timestamp <= end_time:
-                    # record the filter history
-                    if not has_filter_history:
-                        has_filter_history = True
+    def items_tick_block_picker(self, start_time_offset: int = 0, end_time_offset: int = None, time_unit: str = "s"):
+        """Filter items by specified time range, and then pick by tick as column arrays.
 
-                        # return to the start of the buffer
-                        pos = pre_mmap_offset - buffer.item_number * self._meta.item_size
+        Args:
+            start_time_offset(int): Specified the which tick (in seconds) to start.
+            end_time_offset(int): Specified the end tick (in seconds) to start.
+            time_unit (str): Unit of time used to calculate offset, 's': seconds, 'm': minute, 'h': hour, 'd': day.
 
-                        self._starttime_offset_history[start_time_offset] = pos
+        Returns:
+            ItemTickBlockPicker: A picker object that support get items of a tick as column arrays.
+        """
+        start_index, end_index = self._get_index_range(start_time_offset, end_time_offset, time_unit)
 
-                    yield item
+        return ItemTickBlockPicker(self, start_index, end_index, time_unit)
 
-                if item.timestamp > end_time:
-                    is_finished = True
-                    return
+    def reset(self):
+        """Reset binary reader.
 
-            if not is_finished:
-                # then start another one
-                pre_mmap_offset = self._mmap.tell()
+        NOTE:
+            Iterators got before are not affected, as they keep their own reading positions.
+        """
+        self._starttime_offset_history.clear()
 
-                self._fulfill_buffer()
-            else:
-                break
+    def __deepcopy__(self, memo: dict):
+        """Reader is read-only after opening, so copies of objects that reference it will share it."""
+        memo[id(self)] = self
 
-    def reset(self):
-        """Reset binary reader."""
-        self._readed_data_size = 0
+        return self
 
     def __del__(self):
         """Clear resources."""
@@ -292,6 +414,10 @@ class BinaryReader:
 
     def close(self):
         """Close file."""
+        # release the array over mmap first, or mmap cannot be closed
+        self._item_arr = None
+        self._timestamps = None
+
         if self._mmap and not self._mmap.closed:
             self._mmap.close()
 
@@ -330,24 +456,54 @@ class BinaryReader:
 
         self._meta.from_bytes(meta_bytes)
 
-    def _fulfill_buffer(self):
-        """Fulfill buffer from file."""
+    def _load_item_array(self):
+        """Map data area as a structured array, and prepare timestamps for searching."""
+        if self._item_arr is not None:
+            return
 
-        buffer = self._item_buffer
+        item_number = self.header.data_size // self._meta.item_size
 
-        size_to_read = self._meta.item_size * self._buffer_size
-        remaining_size = self.header.data_size - self._readed_data_size
+        self._item_arr = np.frombuffer(
+            self._mmap, dtype=self._meta.item_dtype, count=item_number, offset=self.header.data_offset
+        )
 
-        size_to_read = min(size_to_read, remaining_size)
+        # contiguous copy of timestamps, as searching on a strided array will copy it each time
+        self._timestamps = np.ascontiguousarray(self._item_arr["timestamp"])
 
-        if size_to_read <= 0:
-            buffer.write(None)
+        if item_number > 1 and (self._timestamps[1:] < self._timestamps[:-1]).any():
+            warnings.warn("Items are not sorted by timestamp, block mode will sort them in memory.")
+
+            sorted_indices = np.argsort(self._timestamps, kind="stable")
+
+            self._item_arr = self._item_arr[sorted_indices]
+            self._timestamps = self._timestamps[sorted_indices]
+
+    def _get_index_range(self, start_time_offset: int, end_time_offset: int, time_unit: str):
+        """Get index range [start, end) of items in specified time range (both side included)."""
+        self._load_item_array()
+
+        start_time = calc_time_offset(self.header.starttime, start_time_offset, time_unit)
+
+        if end_time_offset is None:
+            end_time = self.header.endtime
         else:
-            item_bytes = self._mmap.read(size_to_read)
+            end_time = calc_time_offset(self.header.starttime, end_time_offset, time_unit)
+
+        start_index = np.searchsorted(self._timestamps, start_time, side="left")
+        end_index = np.searchsorted(self._timestamps, end_time, side="right")
+
+        return int(start_index), int(end_index)
+
+    def _get_columns(self, start_time: int, end_time: int, start_index: int, end_index: int):
+        """Get columns of items in time range [start_time, end_time) and index range [start_index, end_index)."""
+        self._load_item_array()
+
+        if start_time is not None:
+            offsets = np.searchsorted(self._timestamps[start_index: end_index], (start_time, end_time), side="left")
 
-            self._readed_data_size += len(item_bytes)
+            start_index, end_index = start_index + int(offsets[0]), start_index + int(offsets[1])
 
-            buffer.write(item_bytes)
+        return self._meta.columns_from_array(self._item_arr[start_index: end_index], self._enable_value_adjust)
 
 
 __all__ = ['BinaryReader']
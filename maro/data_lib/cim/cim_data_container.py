@@ -1,15 +1,14 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import copy
 import warnings
-from math import ceil
 from typing import Dict, List
 
-from .entities import CimDataCollection, NoisedItem, Order, OrderGenerateMode, PortSetting, VesselSetting
+from .entities import CimDataCollection, Order, OrderGenerateMode, PortSetting, VesselSetting
+from .order_generator import OrderGenerator
 from .port_buffer_tick_wrapper import PortBufferTickWrapper
-from .utils import (
-    apply_noise, buffer_tick_rand, get_buffer_tick_seed, get_order_num_seed, list_sum_normalize, order_num_rand
-)
+from .utils import buffer_tick_rand, get_buffer_tick_seed, get_order_num_seed, order_num_rand
 from .vessel_future_stops_prediction import VesselFutureStopsPrediction
 from .vessel_past_stops_wrapper import VesselPastStopsWrapper
 from .vessel_reachable_stops_wrapper import VesselReachableStopsWrapper
@@ -48,6 +47,7 @@ class CimDataContainer:
         self._past_stop_wrapper = VesselPastStopsWrapper(self._data_collection)
         self._vessel_plan_wrapper = VesselSailingPlanWrapper(self._data_collection)
         self._reachable_stops_wrapper = VesselReachableStopsWrapper(self._data_collection)
+        self._order_generator = OrderGenerator(self._data_collection)
 
         # keep the seed so we can reproduce the sequence after reset
         self._buffer_tick_seed: int = get_buffer_tick_seed()
@@ -248,11 +248,24 @@ class CimDataContainer:
         """Reset data container internal state."""
         self._is_need_reset_seed = True
 
+    def __deepcopy__(self, memo: dict):
+        """Copy data container, data collection and the wrappers are read-only, so they are shared by copies."""
+        data_cntr = copy.copy(self)
+
+        # Order generator keeps sampled noise of current block, its proportion matrices are shared.
+        data_cntr._order_generator = copy.copy(self._order_generator)
+
+        memo[id(self)] = data_cntr
+
+        return data_cntr
+
     def _reset_seed(self):
         """Reset internal seed for generate reproduceable data"""
         buffer_tick_rand.seed(self._buffer_tick_seed)
         order_num_rand.seed(self._order_num_seed)
 
+        self._order_generator.reset()
+
     def _gen_orders(self, tick: int, total_empty_container: int) -> List[Order]:
         """Generate order for specified tick.
 
@@ -260,8 +273,6 @@ class CimDataContainer:
             Currently we will not dump orders into file even for fixed mode.
 
         """
-        # result
-        order_list: List[Order] = []
         order_proportion = self._data_collection.order_proportion
         order_mode = self._data_collection.order_mode
         total_containers = self._data_collection.total_containers
@@ -274,66 +285,8 @@ class CimDataContainer:
             delta = total_containers - total_empty_container
 
             if orders_to_gen <= delta:
-                return order_list
+                return []
 
             orders_to_gen -= delta
 
-        remaining_orders = orders_to_gen  # used to make sure all the order generated
-
-        # collect and apply noise on the source distribution, then normalized it, to make sure our total number is same
-        noised_source_order_dist = []
-
-        # calculate orders distribution for each port as source
-        for port_idx in range(self.port_number):
-            source_dist: NoisedItem = self.ports[port_idx].source_proportion
-
-            noised_source_order_number = apply_noise(source_dist.base, source_dist.noise, order_num_rand)
-
-            noised_source_order_dist.append(noised_source_order_number)
-
-        # normalize it
-        noised_source_order_dist = list_sum_normalize(noised_source_order_dist)
-
-        # generate order for each target port
-        for port_idx in range(self.port_number):
-            # stop generating if no orders to gen
-            if remaining_orders == 0:
-                break
-
-            targets_dist: List[NoisedItem] = self.ports[port_idx].target_proportions
-
-            # apply noise and normalize
-            noised_targets_dist = list_sum_normalize(
-                [apply_noise(target.base, target.noise, order_num_rand) for target in targets_dist])
-
-            # order for current ports
-            cur_port_order_num = ceil(orders_to_gen * noised_source_order_dist[port_idx])
-
-            # make sure the total number is correct
-            cur_port_order_num = min(cur_port_order_num, remaining_orders)
-
-            # remaining orders for next port
-            remaining_orders -= cur_port_order_num
-
-            # dispatch order to targets
-            if cur_port_order_num > 0:
-                target_remaining_orders = cur_port_order_num
-
-                for i, target in enumerate(targets_dist):
-                    # generate and correct order number for each target
-                    cur_num = ceil(cur_port_order_num * noised_targets_dist[i])
-                    cur_num = min(cur_num, target_remaining_orders)
-
-                    # remaining orders for next target
-                    target_remaining_orders -= cur_num
-
-                    # insert into result list
-                    if cur_num > 0:
-                        order = Order(tick, port_idx, target[0], cur_num)
-
-                        order_list.append(order)
-
-        # TODO: remove later
-        assert sum([o.quantity for o in order_list]) == orders_to_gen
-
-        return order_list
+        return self._order_generator.gen_orders(tick, orders_to_gen)
@@ -1,6 +1,7 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import copy
 import os
 import urllib.parse
 
@@ -34,6 +35,18 @@ class CimDataContainerWrapper:
         """Reset data container internal state"""
         self._data_cntr.reset()
 
+    def __deepcopy__(self, memo: dict):
+        # NOTE: copy.copy will look up attributes of the new instance before its states are set,
+        # that will cause infinite recursion with __getattr__.
+        wrapper = object.__new__(type(self))
+        wrapper.__dict__.update(self.__dict__)
+
+        memo[id(self)] = wrapper
+
+        wrapper._data_cntr = copy.deepcopy(self._data_cntr, memo)
+
+        return wrapper
+
     def __getattr__(self, name):
         return getattr(self._data_cntr, name)
 
@@ -0,0 +1,134 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from typing import List
+
+import numpy as np
+
+from .entities import CimDataCollection, Order
+from .utils import order_num_rand
+
+
+class OrderGenerator:
+    """Generate orders with numpy, the noise of order proportions is sampled for a block of ticks at once.
+
+    Source and target proportions of all ports are kept as matrices (targets are padded with 0 proportion),
+    so applying noise, normalizing and distributing order numbers are done without looping over ports.
+
+    NOTE:
+        Noise of each block is sampled by a numpy random state seeded from the order number random object of
+        simulator, so the generated orders are reproducible with same seed.
+
+    Args:
+        data (CimDataCollection): Data collection from data source.
+        block_size (int): Number of ticks to sample noise at once. Defaults to 64.
+    """
+
+    def __init__(self, data: CimDataCollection, block_size: int = 64):
+        self._block_size = block_size
+
+        ports = data.ports_settings
+        port_number = len(ports)
+        max_target_number = max([len(port.target_proportions) for port in ports], default=0)
+
+        self._source_base = np.array([port.source_proportion.base for port in ports], dtype=np.float64)
+        self._source_noise = np.array([port.source_proportion.noise for port in ports], dtype=np.float64)
+
+        self._target_base = np.zeros((port_number, max_target_number), dtype=np.float64)
+        self._target_noise = np.zeros((port_number, max_target_number), dtype=np.float64)
+        self._target_index = np.zeros((port_number, max_target_number), dtype=np.int64)
+
+        # Padded targets are masked out, they always get 0 proportion.
+        self._target_mask = np.zeros((port_number, max_target_number), dtype=bool)
+
+        for port in ports:
+            for i, target in enumerate(port.target_proportions):
+                self._target_base[port.index, i] = target.base
+                self._target_noise[port.index, i] = target.noise
+                self._target_index[port.index, i] = target.index
+                self._target_mask[port.index, i] = True
+
+        # Noised proportions of current block, will be replaced (not changed in place) by next block.
+        self._block_start_tick = None
+        self._noised_source_dist = None
+        self._noised_targets_dist = None
+
+    def reset(self):
+        """Clear sampled noise, should be called after order number random object reset its seed."""
+        self._block_start_tick = None
+        self._noised_source_dist = None
+        self._noised_targets_dist = None
+
+    def gen_orders(self, tick: int, orders_to_gen: int) -> List[Order]:
+        """Generate orders for specified tick.
+
+        Args:
+            tick (int): Tick of orders.
+            orders_to_gen (int): Total number of containers of orders.
+
+        Returns:
+            List[Order]: Orders for each source and target port pair, with positive quantity.
+        """
+        if orders_to_gen <= 0:
+            return []
+
+        if self._block_start_tick is None or not 0 <= tick - self._block_start_tick < self._block_size:
+            self._sample_block(tick)
+
+        block_tick = tick - self._block_start_tick
+
+        # Order number of each source port, make sure the total number is correct.
+        port_order_nums = self._distribute(orders_to_gen, self._noised_source_dist[block_tick])
+
+        # Order number of each target port, for each source port.
+        order_nums = self._distribute(port_order_nums[:, None], self._noised_targets_dist[block_tick])
+
+        src_port_indices, target_indices = np.nonzero(order_nums > 0)
+
+        order_list = [
+            Order(tick, src_port_idx, dest_port_idx, quantity) for src_port_idx, dest_port_idx, quantity in zip(
+                src_port_indices.tolist(),
+                self._target_index[src_port_indices, target_indices].tolist(),
+                order_nums[src_port_indices, target_indices].tolist()
+            )
+        ]
+
+        return order_list
+
+    def _sample_block(self, tick: int):
+        """Sample noise and normalize proportions for the block that starts from specified tick."""
+        block_size = self._block_size
+        random_state = np.random.RandomState(order_num_rand.getrandbits(32))
+
+        noised_source = self._source_base + random_state.uniform(
+            -self._source_noise, self._source_noise, (block_size, ) + self._source_noise.shape
+        )
+        noised_targets = self._target_base + random_state.uniform(
+            -self._target_noise, self._target_noise, (block_size, ) + self._target_noise.shape
+        )
+        noised_targets[:, ~self._target_mask] = 0
+
+        self._block_start_tick = tick
+        self._noised_source_dist = self._sum_normalize(noised_source)
+        self._noised_targets_dist = self._sum_normalize(noised_targets)
+
+    @staticmethod
+    def _sum_normalize(dist: np.ndarray) -> np.ndarray:
+        """Normalize with sum of last axis."""
+        total = dist.sum(axis=-1, keepdims=True)
+
+        # Avoid dividing zero, there will be no order for the distribution.
+        return np.divide(dist, total, out=np.zeros_like(dist), where=total != 0)
+
+    @staticmethod
+    def _distribute(order_num, dist: np.ndarray) -> np.ndarray:
+        """Distribute order number by proportions in order, each item takes ceiled number until no remaining."""
+        cur_nums = np.ceil(order_num * dist).astype(np.int64)
+
+        # Clipped accumulated number, then each item takes min(its number, remaining number).
+        accumulated_nums = np.minimum(np.cumsum(cur_nums, axis=-1), order_num)
+
+        nums = accumulated_nums.copy()
+        nums[..., 1:] -= accumulated_nums[..., :-1]
+
+        return nums
@@ -35,6 +35,16 @@ dtype_pack_map = {
     "d": "d"
 }
 
+# mapping from meta info to numpy data type (little-endian, same as pack format)
+dtype_numpy_map = {
+    "i": "<i4",
+    "i4": "<i4",
+    "i2": "<i2",
+    "i8": "<i8",
+    "f": "<f4",
+    "d": "<f8"
+}
+
 dtype_convert_map = {
     "i": int,
     'i2': int,
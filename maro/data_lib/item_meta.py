@@ -9,9 +9,10 @@ from collections import namedtuple
 from struct import Struct
 from typing import List, Union
 
+import numpy as np
 from yaml import SafeDumper, SafeLoader, YAMLObject, safe_dump, safe_load
 
-from maro.data_lib.common import dtype_pack_map
+from maro.data_lib.common import dtype_numpy_map, dtype_pack_map
 from maro.utils.exception.data_lib_exeption import MetaTimestampNotExist
 
 
@@ -48,6 +49,7 @@ class BinaryMeta:
     def __init__(self):
         self._item_nt: namedtuple = None
         self._item_struct: Struct = None
+        self._item_dtype: np.dtype = None
 
         self._tzone = None
         # which attribute used as events
@@ -87,6 +89,11 @@ class BinaryMeta:
         """int: Item binary size (in bytes)."""
         return self._item_struct.size
 
+    @property
+    def item_dtype(self) -> np.dtype:
+        """np.dtype: Numpy structured data type of item, it has same layout as item binary."""
+        return self._item_dtype
+
     @property
     def columns(self) -> dict:
         """dict: Columns to extract."""
@@ -210,6 +217,38 @@ class BinaryMeta:
 
         return self._item_nt._make(item_tuple)
 
+    def columns_from_array(self, item_arr: np.ndarray, adjust_value: bool = False):
+        """Convert items in a structured array into column arrays.
+
+        Args:
+            item_arr (np.ndarray): Structured array with item_dtype.
+            adjust_value (bool): If need to adjust value for attributes that enabled this feature.
+
+        Returns:
+            namedtuple: Result tuple with same fields as item, value of each field is a numpy array.
+        """
+        columns = [np.array(item_arr[attr.name]) for attr in self._attrs]
+
+        if adjust_value and len(self._adjust_attrs) > 0:
+            adjust_attrs = list(self._adjust_attrs.items())
+
+            # Draw from same random stream in same order as item_from_bytes, so seeding random reproduces the values.
+            percentages = np.array(
+                [
+                    [random.randrange(int(ratio[0]), int(ratio[1])) for _, ratio in adjust_attrs]
+                    for _ in range(len(item_arr))
+                ],
+                dtype=np.float64
+            ).reshape(len(item_arr), len(adjust_attrs))
+
+            for attr_order, (index, _) in enumerate(adjust_attrs):
+                column = columns[index]
+
+                # make it percentage
+                columns[index] = column + percentages[:, attr_order] * 0.01 * column
+
+        return self._item_nt._make(columns)
+
     def _build_item_struct(self):
         """Build item struct use field name in meta."""
         self._item_nt = namedtuple("Item", [a.name for a in self._attrs])
@@ -218,6 +257,8 @@ class BinaryMeta:
 
         self._item_struct = Struct(fmt)
 
+        self._item_dtype = np.dtype([(a.name, dtype_numpy_map[a.dtype]) for a in self._attrs])
+
     def _validate(self, conf: dict):
         # attributes
         attributes_def = conf.get("entity", {})
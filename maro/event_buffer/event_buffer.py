@@ -3,12 +3,14 @@
 
 
 from collections import defaultdict
+from copy import deepcopy
 from typing import Callable
 
 from .atom_event import AtomEvent
 from .cascade_event import CascadeEvent
 from .event_linked_list import EventLinkedList
 from .event_pool import EventPool
+from .event_store import event_store_dict
 from .event_state import EventState
 from .maro_events import MaroEvents
 from .typings import Event, EventList
@@ -32,11 +34,18 @@ class EventBuffer:
             EventBuffer will recycle the finished events for furthure using, not push them
             into finished events list, so it will cause method "get_finished_events" return
             empty list.
+        event_store (str): Name of the store that holds pending events, "dict" or "heap".
+            "dict" keeps a linked list for each tick, "heap" keeps all pending events in a binary heap
+            and extracts events of a tick in batch, it is faster for sparse and long-horizon scenarios.
+            Defaults to "dict".
     """
 
-    def __init__(self, disable_finished_events: bool = False):
-        # id for events that generate from this instance
-        self._pending_events = defaultdict(EventLinkedList)
+    def __init__(self, disable_finished_events: bool = False, event_store: str = "dict"):
+        if event_store not in event_store_dict:
+            raise ValueError(f"Unsupported event store: {event_store}, available: {list(event_store_dict.keys())}.")
+
+        # Pending events, tick -> events.
+        self._pending_events = event_store_dict[event_store]()
         self._handlers = defaultdict(list)
 
         # used to hold all the events that been processed
@@ -46,6 +55,23 @@ class EventBuffer:
 
         self._disable_finished_events = disable_finished_events
 
+    def __deepcopy__(self, memo: dict):
+        """Copy the event buffer with its pending events and handlers.
+
+        Finished events will not be changed any more, so they are shared by the copies,
+        only the list that holds them is copied.
+        """
+        event_buffer = type(self).__new__(type(self))
+        memo[id(self)] = event_buffer
+
+        for name, value in self.__dict__.items():
+            if name == "_finished_events":
+                event_buffer._finished_events = list(value)
+            else:
+                setattr(event_buffer, name, deepcopy(value, memo))
+
+        return event_buffer
+
     def get_finished_events(self) -> EventList:
         """Get all the processed events, call this function before reset method.
 
@@ -63,7 +89,7 @@ class EventBuffer:
         Returns:
             EventList: List of event object.
         """
-        return [evt for evt in self._pending_events[tick] if evt is not None]
+        return self._pending_events.get_pending_events(tick)
 
     def reset(self):
         """Reset internal states, this method will clear all events.
@@ -76,10 +102,10 @@ class EventBuffer:
 
         self._finished_events.clear()
 
-        for pending_pool in self._pending_events.values():
+        for _, pending_pool in self._pending_events.items():
             self._event_pool.recycle(pending_pool)
 
-            pending_pool.clear()
+        self._pending_events.clear()
 
     def gen_atom_event(self, tick: int, event_type: object, payload: object = None) -> AtomEvent:
         """Generate an atom event, an atom event is for normal usages,
@@ -152,7 +178,17 @@ class EventBuffer:
                 usually get event object from get_atom_event or get_cascade_event.
         """
 
-        self._pending_events[event.tick].append(event)
+        self._pending_events.insert(event)
+
+    def insert_event_to_head(self, event: Event):
+        """Insert an event to the head of pending events of its tick,
+        so it will be executed before the events of same tick that already inserted.
+
+        Args:
+            event (Event): Event to insert,
+                usually get event object from get_atom_event or get_cascade_event.
+        """
+        self._pending_events.insert_to_head(event)
 
     def execute(self, tick: int) -> EventList:
         """Process and dispatch event by tick.
@@ -168,9 +204,9 @@ class EventBuffer:
         Returns:
             EventList: A list of events that are pending decisions at the current tick.
         """
-        if tick in self._pending_events:
-            cur_events_list: EventLinkedList = self._pending_events[tick]
+        cur_events_list: EventLinkedList = self._pending_events.get_tick_events(tick)
 
+        if cur_events_list is not None:
             # 1. check if current events match tick.
             while len(cur_events_list):
                 next_events = cur_events_list.pop()
@@ -76,6 +76,10 @@ class EventLinkedList:
         event._next_event_ = self._head._next_event_
         self._head._next_event_ = event
 
+        # First event of an empty list is the tail too.
+        if self._tail is self._head:
+            self._tail = event
+
         # Counting.
         self._count += 1
 
@@ -93,6 +97,9 @@ class EventLinkedList:
                 # Remove it (head).
                 self._head._next_event_ = event._next_event_
 
+                if self._tail is event:
+                    self._tail = self._head
+
                 event._next_event_ = None
 
                 # Counting.
@@ -148,7 +155,7 @@ class EventLinkedList:
             if event is None:
                 raise StopIteration()
             else:
-                self._iter_cur_event = event._next_event_
+                self._iter_cur_event = event
 
         return event
 
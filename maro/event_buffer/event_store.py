@@ -0,0 +1,198 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from heapq import heappop, heappush
+from typing import Iterator, Tuple, Union
+
+from .event_linked_list import EventLinkedList
+from .typings import Event, EventList
+
+
+class AbsEventStore(ABC):
+    """Store used by EventBuffer to hold pending events until their tick.
+
+    Events of same tick must be kept in insert order, EventBuffer will execute them
+    with the EventLinkedList returned by get_tick_events, then events inserted for the executing tick
+    must be appended to that list.
+    """
+
+    @abstractmethod
+    def insert(self, event: Event):
+        """Insert an event at the end of its tick.
+
+        Args:
+            event (Event): Event to insert.
+        """
+        pass
+
+    @abstractmethod
+    def insert_to_head(self, event: Event):
+        """Insert an event at the head of its tick, it will be executed before the events that already inserted.
+
+        Args:
+            event (Event): Event to insert.
+        """
+        pass
+
+    @abstractmethod
+    def get_tick_events(self, tick: int) -> EventLinkedList:
+        """Get events to execute at specified tick.
+
+        Args:
+            tick (int): Tick of events.
+
+        Returns:
+            EventLinkedList: Events of this tick, or None if there is no event.
+        """
+        pass
+
+    @abstractmethod
+    def get_pending_events(self, tick: int) -> EventList:
+        """Get pending events at specified tick without changing the store.
+
+        Args:
+            tick (int): Tick of events.
+
+        Returns:
+            EventList: List of event object.
+        """
+        pass
+
+    @abstractmethod
+    def items(self) -> Iterator[Tuple[int, Union[EventLinkedList, EventList]]]:
+        """Tick and its events in store."""
+        pass
+
+    @abstractmethod
+    def clear(self):
+        """Clear events in store, the tick keys may be kept."""
+        pass
+
+    def __len__(self):
+        """Number of ticks in store."""
+        return sum(1 for _ in self.items())
+
+
+class DictEventStore(AbsEventStore):
+    """Event store that keep an event linked list for each tick in a dictionary.
+
+    This is the default store, it is fast for dense scenarios that have events at most ticks.
+    """
+
+    def __init__(self):
+        self._events = defaultdict(EventLinkedList)
+
+    def insert(self, event: Event):
+        self._events[event.tick].append(event)
+
+    def insert_to_head(self, event: Event):
+        self._events[event.tick].insert(event)
+
+    def get_tick_events(self, tick: int) -> EventLinkedList:
+        return self._events.get(tick, None)
+
+    def get_pending_events(self, tick: int) -> EventList:
+        return [evt for evt in self._events[tick] if evt is not None]
+
+    def items(self) -> Iterator[Tuple[int, EventLinkedList]]:
+        return self._events.items()
+
+    def clear(self):
+        for events in self._events.values():
+            events.clear()
+
+    def __len__(self):
+        return len(self._events)
+
+
+class HeapEventStore(AbsEventStore):
+    """Event store that keep events in a binary heap ordered by (tick, insert order).
+
+    Events inserted to head take negative and decreasing sequences, so they are ahead of other events of the tick.
+
+    All the events of a tick will be extracted into one event linked list when the tick is executing,
+    so there is no per-tick container, this is suitable for sparse and long-horizon scenarios.
+
+    NOTE:
+        Events inserted with a tick that already passed will be dropped when a later tick is executing.
+    """
+
+    def __init__(self):
+        # Item: (tick, insert sequence, event).
+        self._heap = []
+        self._sequence = 0
+        self._head_sequence = 0
+
+        # Tick that extracted, and its events.
+        self._cur_tick = None
+        self._cur_events = EventLinkedList()
+
+    def insert(self, event: Event):
+        if event.tick == self._cur_tick:
+            self._cur_events.append(event)
+        else:
+            heappush(self._heap, (event.tick, self._sequence, event))
+
+            self._sequence += 1
+
+    def insert_to_head(self, event: Event):
+        if event.tick == self._cur_tick:
+            self._cur_events.insert(event)
+        else:
+            self._head_sequence -= 1
+
+            heappush(self._heap, (event.tick, self._head_sequence, event))
+
+    def get_tick_events(self, tick: int) -> EventLinkedList:
+        if tick != self._cur_tick:
+            heap = self._heap
+
+            if len(heap) == 0 or heap[0][0] > tick:
+                return None
+
+            self._cur_tick = tick
+            self._cur_events.clear()
+
+            # Batch extraction of all the events of this tick, and drop the ones that already passed.
+            while len(heap) > 0 and heap[0][0] <= tick:
+                evt_tick, _, event = heappop(heap)
+
+                if evt_tick == tick:
+                    self._cur_events.append(event)
+
+        return self._cur_events
+
+    def get_pending_events(self, tick: int) -> EventList:
+        pending_events = [evt for evt in self._cur_events if evt is not None] if tick == self._cur_tick else []
+
+        pending_events.extend(item[2] for item in sorted(self._heap) if item[0] == tick)
+
+        return pending_events
+
+    def items(self) -> Iterator[Tuple[int, EventList]]:
+        # NOTE: we cannot link pending events here, or it will break the list that executing them later.
+        tick_events = defaultdict(list)
+
+        if self._cur_tick is not None:
+            tick_events[self._cur_tick] = [evt for evt in self._cur_events if evt is not None]
+
+        for tick, _, event in sorted(self._heap):
+            tick_events[tick].append(event)
+
+        return tick_events.items()
+
+    def clear(self):
+        self._heap.clear()
+        self._sequence = 0
+        self._head_sequence = 0
+        self._cur_tick = None
+        self._cur_events.clear()
+
+
+# Supported event stores.
+event_store_dict = {
+    "dict": DictEventStore,
+    "heap": HeapEventStore
+}
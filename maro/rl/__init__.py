@@ -17,7 +17,7 @@ from maro.rl.learner import AbsLearner, SimpleLearner
 from maro.rl.models import AbsBlock, FullyConnectedBlock, LearningModel, NNStack, OptimizerOptions
 from maro.rl.scheduling import LinearParameterScheduler, Scheduler, TwoPhaseLinearParameterScheduler
 from maro.rl.shaping import AbsShaper, ActionShaper, ExperienceShaper, KStepExperienceShaper, StateShaper
-from maro.rl.storage import AbsStore, ColumnBasedStore, OverwriteType
+from maro.rl.storage import AbsStore, ArrayBasedStore, ColumnBasedStore, OverwriteType
 
 __all__ = [
     "AbsActor", "SimpleActor",
@@ -30,5 +30,5 @@ __all__ = [
     "AbsBlock", "FullyConnectedBlock", "LearningModel", "NNStack", "OptimizerOptions",
     "LinearParameterScheduler", "Scheduler", "TwoPhaseLinearParameterScheduler",
     "AbsShaper", "ActionShaper", "ExperienceShaper", "KStepExperienceShaper", "StateShaper",
-    "AbsStore", "ColumnBasedStore", "OverwriteType"
+    "AbsStore", "ArrayBasedStore", "ColumnBasedStore", "OverwriteType"
 ]
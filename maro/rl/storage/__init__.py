@@ -2,6 +2,7 @@
 # Licensed under the MIT license.
 
 from .abs_store import AbsStore
+from .array_based_store import ArrayBasedStore
 from .column_based_store import ColumnBasedStore, OverwriteType
 
-__all__ = ["AbsStore", "ColumnBasedStore", "OverwriteType"]
+__all__ = ["AbsStore", "ArrayBasedStore", "ColumnBasedStore", "OverwriteType"]
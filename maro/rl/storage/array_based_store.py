@@ -0,0 +1,335 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from typing import Callable, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from maro.utils import clone
+from maro.utils.exception.rl_toolkit_exception import StoreMisalignment
+
+from .abs_store import AbsStore
+from .column_based_store import ColumnBasedStore, OverwriteType
+
+
+class ArrayBasedStore(AbsStore):
+    """
+    An implementation of ``AbsStore`` for experience storage in RL, which keeps each column in a numpy array.
+
+    It has the same interface as ``ColumnBasedStore``, but the column arrays are allocated with the store capacity
+    when the key is put into the store the first time, the item shape and dtype of a column are inferred from the
+    first put contents. The item shape cannot be changed after that, while the dtype is promoted when later contents
+    need a wider one, e.g., floats put into a column of ints. Non-numeric contents are kept in object arrays.
+    Put, get, update and sampling are done with numpy operations instead of item by item, so it is suitable for
+    experience pools with a large number of transitions.
+
+    Args:
+        capacity (int): If negative, the store is of unlimited capacity, column arrays will be enlarged when full.
+            Defaults to -1.
+        overwrite_type (OverwriteType): If storage capacity is bounded, this specifies how existing entries
+            are overwritten when the capacity is exceeded. Two types of overwrite behavior are supported:
+            - Rolling, where overwrite occurs sequentially with wrap-around.
+            - Random, where overwrite occurs randomly among filled positions.
+            Alternatively, the user may also specify overwrite positions (see ``put``).
+        initial_size (int): Initial array length of columns for unlimited store, must be positive. Defaults to 1024.
+    """
+    def __init__(self, capacity: int = -1, overwrite_type: OverwriteType = None, initial_size: int = 1024):
+        super().__init__()
+        if initial_size <= 0:
+            raise ValueError(f"initial_size should be positive, got {initial_size}")
+        self._capacity = capacity
+        self._overwrite_type = overwrite_type
+        self._initial_size = initial_size
+        self._store = {}
+        self._size = 0
+        # Next position to write for rolling overwrite.
+        self._rolling_index = 0
+        self._iter_index = 0
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._iter_index >= self._size:
+            self._iter_index = 0
+            raise StopIteration
+        index = self._iter_index
+        self._iter_index += 1
+        return self[index]
+
+    def __getitem__(self, index: int):
+        # Same as list indexing, positions beyond the store size are out of range.
+        return {k: arr[:self._size][index] for k, arr in self._store.items()}
+
+    @property
+    def capacity(self):
+        """Store capacity.
+
+        If negative, the store grows without bound. Otherwise, the number of items in the store will not exceed
+        this capacity.
+        """
+        return self._capacity
+
+    @property
+    def overwrite_type(self):
+        """An ``OverwriteType`` member indicating the overwrite behavior when the store capacity is exceeded."""
+        return self._overwrite_type
+
+    def get(self, indexes: Sequence) -> dict:
+        indexes = np.asarray(indexes, dtype=np.int64)
+        return {k: arr[:self._size][indexes] for k, arr in self._store.items()}
+
+    def put(self, contents: dict, overwrite_indexes: Sequence = None) -> List[int]:
+        """Put new contents in the store.
+
+        Args:
+            contents (dict): Dictionary of items to add to the store. If the store is not empty, this must have the
+                same keys as the store itself. Otherwise an ``StoreMisalignment`` will be raised. Same as
+                ``ColumnBasedStore``, a list value means multiple items, other values are treated as one item.
+            overwrite_indexes (Sequence, optional): Indexes where the contents are to be overwritten. This is only
+                used when the store has a fixed capacity and putting ``contents`` in the store would exceed this
+                capacity. If this is None and overwriting is necessary, rolling or random overwriting will be done
+                according to the ``overwrite`` property. Defaults to None.
+        Returns:
+            The indexes where the newly added entries reside in the store.
+        """
+        if len(self._store) > 0 and contents.keys() != self._store.keys():
+            raise StoreMisalignment(f"expected keys {list(self._store.keys())}, got {list(contents.keys())}")
+        ColumnBasedStore.check_uniformity(contents)
+        added = contents[next(iter(contents))]
+        is_batch = isinstance(added, list)
+        added_size = len(added) if is_batch else 1
+        if added_size == 0:
+            return []
+
+        contents = {k: val if is_batch else [val] for k, val in contents.items()}
+        if len(self._store) == 0:
+            self._allocate(contents)
+
+        if self._capacity < 0:
+            self._reserve(self._size + added_size)
+            write_indexes = np.arange(self._size, self._size + added_size)
+        else:
+            write_indexes = self._get_update_indexes(added_size, overwrite_indexes=overwrite_indexes)
+
+        self.update(write_indexes, contents)
+        self._size = self._size + added_size if self._capacity < 0 else min(self._capacity, self._size + added_size)
+        return write_indexes.tolist()
+
+    def update(self, indexes: Sequence, contents: dict) -> Sequence:
+        """
+        Update contents at given positions.
+
+        Args:
+            indexes (Sequence): Positions where updates are to be made.
+            contents (dict): Contents to write to the internal store at given positions. It is subject to uniformity
+                checks to ensure that the lists for all keys have the same length.
+
+        Returns:
+            The indexes where store contents are updated.
+        """
+        ColumnBasedStore.check_uniformity(contents)
+        write_indexes = np.asarray(indexes, dtype=np.int64)
+        for key, value_list in contents.items():
+            assert len(indexes) == len(value_list), f"expected updates at {len(indexes)} indexes, got {len(value_list)}"
+            arr, values = self._promote(key, value_list)
+            if arr.dtype == object:
+                # Assign one by one to avoid numpy treating sequence objects as extra dimensions.
+                for index, value in zip(write_indexes, value_list):
+                    arr[index] = value
+            else:
+                arr[write_indexes] = values
+
+        return indexes
+
+    def apply_multi_filters(self, filters: Sequence[Callable]):
+        """Multi-filter method.
+
+            The input to one filter is the output from its predecessor in the sequence.
+
+        Args:
+            filters (Sequence[Callable]): Filter list, each item is a lambda function,
+                e.g., [lambda d: d['a'] == 1 and d['b'] == 1].
+        Returns:
+            Filtered indexes and corresponding objects.
+        """
+        indexes = range(self._size)
+        for f in filters:
+            indexes = [i for i in indexes if f(self[i])]
+
+        return indexes, self.get(indexes)
+
+    def apply_multi_samplers(self, samplers: Sequence, replace: bool = True) -> Tuple:
+        """Multi-samplers method.
+
+        This implements chained sampling where the input to one sampler is the output from its predecessor in
+        the sequence. Different from ``ColumnBasedStore``, the weight function is called once with the columns
+        of all candidate items, and should return the weights as an array.
+
+        Args:
+            samplers (Sequence): A sequence of weight functions for computing the sampling weights of the items
+                in the store, e.g., [lambda d: d['a'], lambda d: d['b']].
+            replace (bool): If True, sampling will be performed with replacement.
+        Returns:
+            Sampled indexes and corresponding objects.
+        """
+        indexes = np.arange(self._size)
+        for weight_fn, sample_size in samplers:
+            weights = np.asarray(weight_fn(self.get(indexes)), dtype=np.float64)
+            indexes = indexes[self._choice(weights, sample_size, replace)]
+
+        return indexes, self.get(indexes)
+
+    def sample(self, size, weights: Union[list, np.ndarray] = None, replace: bool = True):
+        """
+        Obtain a random sample from the experience pool.
+
+        Args:
+            size (int): Sample sizes for each round of sampling in the chain. If this is a single integer, it is
+                        used as the sample size for all samplers in the chain.
+            weights (Union[list, np.ndarray]): Sampling weights.
+            replace (bool): If True, sampling is performed with replacement. Defaults to True.
+        Returns:
+            Sampled indexes and the corresponding objects,
+            e.g., [1, 2, 3], ['a', 'b', 'c'].
+        """
+        if weights is None:
+            indexes = np.random.choice(self._size, size=size, replace=replace)
+        else:
+            indexes = self._choice(np.asarray(weights, dtype=np.float64), size, replace)
+        return indexes, self.get(indexes)
+
+    def sample_by_key(self, key, size: int, replace: bool = True):
+        """
+        Obtain a random sample from the store using one of the columns as sampling weights.
+
+        Args:
+            key: The column whose values are to be used as sampling weights.
+            size (int): Sample size.
+            replace (bool): If True, sampling is performed with replacement.
+        Returns:
+            Sampled indexes and the corresponding objects.
+        """
+        indexes = self._choice(self._store[key][:self._size].astype(np.float64), size, replace)
+        return indexes, self.get(indexes)
+
+    def sample_by_keys(self, keys: Sequence, sizes: Sequence, replace: bool = True):
+        """
+        Obtain a random sample from the store by chained sampling using multiple columns as sampling weights.
+
+        Args:
+            keys (Sequence): The column whose values are to be used as sampling weights.
+            sizes (Sequence): Sample size.
+            replace (bool): If True, sampling is performed with replacement.
+        Returns:
+            Sampled indexes and the corresponding objects.
+        """
+        if len(keys) != len(sizes):
+            raise ValueError(f"expected sizes of length {len(keys)}, got {len(sizes)}")
+
+        indexes = np.arange(self._size)
+        for key, size in zip(keys, sizes):
+            weights = self._store[key][indexes].astype(np.float64)
+            indexes = indexes[self._choice(weights, size, replace)]
+
+        return indexes, self.get(indexes)
+
+    def dumps(self):
+        """Return a deep copy of store contents."""
+        return {k: clone(arr[:self._size]) for k, arr in self._store.items()}
+
+    def get_by_key(self, key):
+        """Get the contents of the store corresponding to ``key``."""
+        return self._store[key][:self._size]
+
+    def clear(self):
+        """Empty the store."""
+        self._store = {}
+        self._size = 0
+        self._rolling_index = 0
+        self._iter_index = 0
+
+    def _allocate(self, contents: dict):
+        """Allocate column arrays with the shape and dtype inferred from contents."""
+        length = self._capacity if self._capacity >= 0 else self._initial_size
+        for key, value_list in contents.items():
+            try:
+                values = np.asarray(value_list)
+            except ValueError:
+                values = None
+
+            if values is None or values.dtype.kind not in "biufc":
+                self._store[key] = np.empty(length, dtype=object)
+            else:
+                self._store[key] = np.zeros((length, ) + values.shape[1:], dtype=values.dtype)
+
+    def _promote(self, key, value_list: list) -> Tuple[np.ndarray, np.ndarray]:
+        """Promote the dtype of a numeric column if the values cannot be kept without loss.
+
+        Returns:
+            The column array, and the values as an array if the column is numeric.
+        """
+        arr = self._store[key]
+        if arr.dtype == object:
+            return arr, None
+
+        try:
+            values = np.asarray(value_list)
+        except ValueError:
+            values = None
+
+        if values is None or values.dtype.kind not in "biufc":
+            dtype = np.dtype(object)
+        else:
+            dtype = np.result_type(arr.dtype, values.dtype)
+
+        if dtype != arr.dtype:
+            arr = arr.astype(dtype)
+            self._store[key] = arr
+
+        return arr, values
+
+    def _reserve(self, size: int):
+        """Enlarge column arrays of unlimited store to hold specified number of items."""
+        length = len(next(iter(self._store.values())))
+        if size <= length:
+            return
+
+        while length < size:
+            length *= 2
+
+        for key, arr in self._store.items():
+            new_arr = np.empty((length, ) + arr.shape[1:], dtype=arr.dtype)
+            new_arr[:self._size] = arr[:self._size]
+            self._store[key] = new_arr
+
+    def _choice(self, weights: np.ndarray, size: int, replace: bool) -> np.ndarray:
+        """Weighted sampling of positions of the weights."""
+        return np.random.choice(len(weights), size=size, replace=replace, p=weights / np.sum(weights))
+
+    def _get_update_indexes(self, added_size: int, overwrite_indexes=None) -> np.ndarray:
+        if added_size > self._capacity:
+            raise ValueError("size of added items should not exceed the store capacity.")
+
+        num_overwrites = self._size + added_size - self._capacity
+        if num_overwrites <= 0:
+            write_indexes = np.arange(self._size, self._size + added_size)
+            if self._overwrite_type == OverwriteType.ROLLING:
+                self._rolling_index = (self._size + added_size) % self._capacity
+            return write_indexes
+
+        free_indexes = np.arange(self._size, self._capacity)
+        if overwrite_indexes is not None:
+            write_indexes = np.concatenate([free_indexes, np.asarray(overwrite_indexes, dtype=np.int64)])
+        elif self._overwrite_type == OverwriteType.ROLLING:
+            # Wrap around from the oldest entry.
+            write_indexes = (self._rolling_index + np.arange(added_size)) % self._capacity
+            self._rolling_index = (self._rolling_index + added_size) % self._capacity
+        else:
+            random_indexes = np.random.choice(self._size, size=num_overwrites, replace=False)
+            write_indexes = np.concatenate([free_indexes, random_indexes])
+
+        return write_indexes
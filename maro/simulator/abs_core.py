@@ -75,6 +75,16 @@ class AbsEnv(ABC):
         """Dump environment for restore."""
         pass
 
+    @abstractmethod
+    def restore(self, checkpoint):
+        """Restore environment from the checkpoint that dumped before."""
+        pass
+
+    @abstractmethod
+    def fork(self):
+        """Fork a new environment from current states."""
+        pass
+
     @abstractmethod
     def reset(self):
         """Reset environment."""
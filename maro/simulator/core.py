@@ -1,9 +1,11 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import copy
+import weakref
 from collections import Iterable
 from importlib import import_module
-from inspect import getmembers, isclass
+from inspect import GEN_CREATED, getgeneratorstate, getmembers, isclass
 from typing import List
 
 from maro.backends.frame import FrameBase, SnapshotList
@@ -13,9 +15,15 @@ from maro.utils.exception.simulator_exception import BusinessEngineNotFoundError
 
 from .abs_core import AbsEnv, DecisionMode
 from .scenarios.abs_business_engine import AbsBusinessEngine
+from .utils import random as sim_random
 from .utils import seed as sim_seed
 from .utils.common import tick_to_frame_index
 
+# Weak reference to the environment that current states of simulator random objects belong to.
+# As simulator random objects are shared by all environments, states of them will be swapped when
+# stepping another environment, so forked environments will not affect the random sequences of each other.
+_random_state_owner = None
+
 
 class Env(AbsEnv):
     """Default environment implementation using generator.
@@ -35,6 +43,10 @@ class Env(AbsEnv):
         disable_finished_events (bool): Disable finished events list, with this set to True, EventBuffer will
             re-use finished event object, this reduce event object number.
         options (dict): Additional parameters passed to business engine.
+            Following options are used by environment itself:
+            "enable-dump-snapshot" (str): Folder to dump snapshots and decision events at reset.
+            "event-store" (str): Store of pending events in EventBuffer, "dict" (default) or "heap",
+            "heap" is faster for sparse and long-horizon scenarios.
     """
 
     def __init__(
@@ -54,11 +66,19 @@ class Env(AbsEnv):
             else business_engine_cls.__name__
         self._business_engine: AbsBusinessEngine = None
 
-        self._event_buffer = EventBuffer(disable_finished_events)
+        self._event_buffer = EventBuffer(
+            disable_finished_events, self._additional_options.get("event-store", "dict")
+        )
 
         # decision_events array for dump.
         self._decision_events = []
 
+        # Pending events of the decision that waiting for action, used to resume simulation after copying.
+        self._pending_events = None
+
+        # States of simulator random objects, only kept when they are not owned by this environment.
+        self._random_state = None
+
         # The generator used to push the simulator forward.
         self._simulate_generator = self._simulate()
 
@@ -79,6 +99,8 @@ class Env(AbsEnv):
         Returns:
             tuple: a tuple of (metrics, decision event, is_done).
         """
+        self._activate_random_state()
+
         try:
             metrics, decision_event, _is_done = self._simulate_generator.send(
                 action)
@@ -90,17 +112,90 @@ class Env(AbsEnv):
     def dump(self):
         """Dump environment for restore.
 
+        The checkpoint contains the frame (with snapshots), pending events, states of simulator random objects,
+        business engine internal states and positions of data readers.
+
+        NOTE:
+            Only the environment with static (numpy) backend can be dumped.
+
+        Returns:
+            Env: Checkpoint of current environment, it is an environment that copied from current one,
+                and can be restored multiple times.
+
+        Raises:
+            NotImplementedError: If the backend of frame does not support copying.
+        """
+        return copy.deepcopy(self)
+
+    def restore(self, checkpoint):
+        """Restore environment from the checkpoint that dumped before.
+
         NOTE:
-            Not implemented.
+            Frame, snapshot list and nodes got from environment before restoring are not updated,
+            get them from environment again after restoring.
+
+        Args:
+            checkpoint (Env): Checkpoint from dump method.
         """
-        return
+        self._simulate_generator.close()
+
+        env = copy.deepcopy(checkpoint)
+
+        # The generator of copied environment runs with copied environment, so we re-create it.
+        env._simulate_generator.close()
+
+        for name, value in env.__dict__.items():
+            if name != "_simulate_generator":
+                self.__dict__[name] = value
+
+        self._resume_simulate_generator(checkpoint._simulate_generator)
+
+        # Make sure states of simulator random objects will be loaded at next step.
+        self._release_random_state()
+
+    def fork(self):
+        """Fork a new environment from current states.
+
+        The new environment continues from current decision event, stepping one of them will not affect another,
+        this is useful for lookahead planning and tree search.
+        Arrays of frame and snapshots are copied, read-only data (like data readers and generated data of
+        data container) are shared by forked environments, so forking is much cheaper than creating a new one.
+
+        NOTE:
+            Only the environment with static (numpy) backend can be forked.
+
+        Returns:
+            Env: Forked environment.
+
+        Raises:
+            NotImplementedError: If the backend of frame does not support copying.
+        """
+        return copy.deepcopy(self)
+
+    def __deepcopy__(self, memo: dict):
+        env = self.__class__.__new__(self.__class__)
+
+        memo[id(self)] = env
+
+        # NOTE: business engine will be copied before event buffer, as it is created first.
+        for name, value in self.__dict__.items():
+            if name not in ("_simulate_generator", "_random_state"):
+                env.__dict__[name] = copy.deepcopy(value, memo)
+
+        env._random_state = self._get_random_state()
+        env._resume_simulate_generator(self._simulate_generator)
+
+        return env
 
     def reset(self):
         """Reset environment."""
+        self._activate_random_state()
+
         self._tick = self._start_tick
 
         self._simulate_generator.close()
         self._simulate_generator = self._simulate()
+        self._pending_events = None
 
         self._event_buffer.reset()
 
@@ -116,6 +211,15 @@ class Env(AbsEnv):
 
         self._business_engine.reset()
 
+    def close(self):
+        """Release resources of environment, like snapshot history files and background threads of business engine.
+
+        Environment is not available after closing.
+        """
+        self._simulate_generator.close()
+
+        self._business_engine.close()
+
     @property
     def configs(self) -> dict:
         """dict: Configurations of current environment."""
@@ -174,6 +278,8 @@ class Env(AbsEnv):
         """
 
         if seed is not None:
+            self._activate_random_state()
+
             sim_seed(seed)
 
     @property
@@ -238,18 +344,73 @@ class Env(AbsEnv):
             additional_options=self._additional_options
         )
 
-    def _simulate(self):
-        """This is the generator to wrap each episode process."""
+    def _activate_random_state(self):
+        """Load states of simulator random objects for this environment, if they are owned by another one."""
+        global _random_state_owner
+
+        owner = _random_state_owner() if _random_state_owner is not None else None
+
+        if owner is self:
+            return
+
+        if owner is not None:
+            owner._random_state = sim_random.get_state()
+
+        if self._random_state is not None:
+            sim_random.set_state(self._random_state)
+
+            self._random_state = None
+
+        _random_state_owner = weakref.ref(self)
+
+    def _release_random_state(self):
+        """Give up the ownership of simulator random objects, without keeping their current states."""
+        global _random_state_owner
+
+        if _random_state_owner is not None and _random_state_owner() is self:
+            _random_state_owner = None
+
+    def _get_random_state(self) -> dict:
+        """Get states of simulator random objects for this environment."""
+        if self._random_state is not None:
+            return self._random_state
+
+        return sim_random.get_state()
+
+    def _resume_simulate_generator(self, source_generator):
+        """Create simulate generator for copied environment, which is at same position as source generator."""
+        self._simulate_generator = self._simulate(self._pending_events)
+
+        if self._pending_events is not None:
+            # Run to the pending decision, so that it is ready to receive action.
+            next(self._simulate_generator)
+        elif getgeneratorstate(source_generator) != GEN_CREATED:
+            # Source generator is at the end.
+            self._simulate_generator.close()
+
+    def _simulate(self, pending_events: list = None):
+        """This is the generator to wrap each episode process.
+
+        Args:
+            pending_events (list): Pending events of the decision to resume from, used by copied environment.
+        """
         is_end_tick = False
 
+        # Business engine already stepped and events already executed if resuming from pending events.
+        is_resuming = pending_events is not None
+
         while True:
             # Ask business engine to do thing for this tick, such as generating and pushing events.
             # We do not push events now.
-            self._business_engine.step(self._tick)
+            if not is_resuming:
+                self._business_engine.step(self._tick)
 
             while True:
                 # Keep processing events, until no more events in this tick.
-                pending_events = self._event_buffer.execute(self._tick)
+                if is_resuming:
+                    is_resuming = False
+                else:
+                    pending_events = self._event_buffer.execute(self._tick)
 
                 # Processing pending events.
                 pending_event_length: int = len(pending_events)
@@ -274,8 +435,13 @@ class Env(AbsEnv):
                 decision_events = decision_events[0] if self._decision_mode == DecisionMode.Sequential \
                     else decision_events
 
+                self._pending_events = pending_events
+
                 # Yield current state first, and waiting for action.
                 actions = yield self._business_engine.get_metrics(), decision_events, False
+
+                self._pending_events = None
+
                 # archive decision events.
                 self._decision_events.append(decision_events)
 
@@ -1,6 +1,7 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import copy
 import os
 from abc import ABC, abstractmethod
 from pathlib import Path
@@ -190,3 +191,30 @@ class AbsBusinessEngine(ABC):
             folder (str): Folder to place dumped files.
         """
         pass
+
+    def close(self):
+        """Release resources of business engine, like history files of frame and background threads.
+
+        Business engine that holds such resources should release them by overriding this method,
+        business engine is not available after closing.
+        """
+        if self.frame is not None:
+            self.frame.close_history()
+
+    def __deepcopy__(self, memo: dict):
+        """Copy business engine with its frame, event buffer and internal states, used to copy environment.
+
+        Frame is copied first, so nodes referenced by business engine or event payloads will be replaced
+        with the nodes of copied frame. Business engine that holds objects which cannot be copied
+        (such as file handles) should share or re-create them with its own ``__deepcopy__`` method.
+        """
+        business_engine = self.__class__.__new__(self.__class__)
+
+        memo[id(self)] = business_engine
+
+        copy.deepcopy(self.frame, memo)
+
+        for name, value in self.__dict__.items():
+            business_engine.__dict__[name] = copy.deepcopy(value, memo)
+
+        return business_engine
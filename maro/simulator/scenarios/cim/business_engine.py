@@ -3,8 +3,11 @@
 
 
 import os
+from collections import defaultdict
 from math import ceil, floor
+from typing import List
 
+import numpy as np
 from yaml import safe_load
 
 from maro.backends.frame import FrameBase, SnapshotList
@@ -20,6 +23,9 @@ from .events import Events
 from .frame_builder import gen_cim_frame
 from .ports_order_export import PortOrderExporter
 
+# Departure events are inserted for this number of ticks ahead, instead of all the ticks at the beginning.
+DEPARTURE_EVENT_WINDOW = 64
+
 metrics_desc = """
 CIM metrics used provide statistics information until now (may be in the middle of current tick).
 It contains following keys:
@@ -28,6 +34,8 @@ order_requirements (int): Accumulative orders until now.
 container_shortage (int): Accumulative shortage until now.
 operation_number (int): Total empty transfer (both load and discharge) cost,
     the cost factors can be configured in configuration file at section "transfer_cost_factors".
+total_empty (int): Empty containers on all ports and vessels now.
+total_full (int): Full containers on all ports and vessels now, not including the ones on shipper or consignee.
 """
 
 
@@ -73,6 +81,15 @@ class CimBusinessEngine(AbsBusinessEngine):
         # Used to collect total cost to avoid to much snapshot querying.
         self._total_operate_num: float = 0
 
+        # Fleet-wide totals, updated in event handlers to avoid going through all the nodes.
+        self._total_empty: int = 0
+        self._total_full: int = 0
+        self._total_shortage: int = 0
+        self._total_booking: int = 0
+
+        # Check the totals with the values of nodes after each tick, for debugging.
+        self._is_totals_check_enabled = bool(additional_options.get("enable-totals-check", False))
+
         self._init_frame()
 
         # Snapshot list should be initialized after frame.
@@ -80,8 +97,11 @@ class CimBusinessEngine(AbsBusinessEngine):
 
         self._register_events()
 
-        # As we already unpack the route to the max tick, we can insert all departure events at the beginning.
-        self._load_departure_events()
+        # Index of next stop to insert departure event for each vessel, and last tick that departure events inserted.
+        self._departure_stop_indices = []
+        self._departure_inserted_tick: int = -1
+
+        self._reset_departure_events()
 
     @property
     def configs(self):
@@ -99,21 +119,22 @@ class CimBusinessEngine(AbsBusinessEngine):
         return self._snapshots
 
     def step(self, tick: int):
-        """Called at each tick to generate orders and arrival events.
+        """Called at each tick to generate orders, and insert departure events within the window.
 
         Args:
             tick (int): Tick to generate orders.
         """
 
         # At each tick:
-        # 1. Generate orders for this tick.
-        # 2. Transfer orders into events (ORDER).
-        # 3. Check and add vessel arrival event (atom and cascade).
+        # 1. Insert departure events of following ticks if not inserted yet.
+        # 2. Generate orders for this tick.
+        # 3. Transfer orders into events (ORDER).
+        # 4. Check and add vessel arrival event (atom and cascade).
+        # 5. Update stop lists and plans of the vessels that changed.
 
-        total_empty_number = sum(
-            [node.empty for node in self._ports + self._vessels])
+        self._insert_departure_events(tick)
 
-        for order in self._data_cntr.get_orders(tick, total_empty_number):
+        for order in self._data_cntr.get_orders(tick, self._total_empty):
             # Use cascade event to support insert sub events.
             order_evt = self._event_buffer.gen_cascade_event(tick, Events.ORDER, order)
 
@@ -125,10 +146,14 @@ class CimBusinessEngine(AbsBusinessEngine):
         # TODO: Remove it after event priority is supported.
         decision_evt_list = []
 
-        for vessel in self._vessels:
-            vessel_idx: int = vessel.idx
-            loc_idx: int = vessel.next_loc_idx
+        # Location indices of all vessels, read with one call.
+        next_loc_indices = self._frame.get_node_attribute_values("vessels", "next_loc_idx")
+        last_loc_indices = self._frame.get_node_attribute_values("vessels", "last_loc_idx")
+
+        # Arrived vessels and their stops, plan of the arrived port will be set to the arrive tick.
+        arrived_stops = []
 
+        for vessel_idx, loc_idx in enumerate(next_loc_indices.tolist()):
             stop: Stop = self._data_cntr.vessel_stops[vessel_idx, loc_idx]
             port_idx: int = stop.port_idx
 
@@ -159,25 +184,98 @@ class CimBusinessEngine(AbsBusinessEngine):
                     decision_evt_list.append(decision_event)
 
                     # Update vessel location so that later logic will get correct value.
-                    vessel.last_loc_idx = vessel.next_loc_idx
-
-            # We should update the future stop list at each tick.
-            past_stops = self._data_cntr.vessel_past_stops[vessel.idx, vessel.last_loc_idx, loc_idx]
-            future_stops = self._data_cntr.vessel_future_stops[vessel.idx, vessel.last_loc_idx, loc_idx]
-
-            vessel.set_stop_list(past_stops, future_stops)
+                    self._vessels[vessel_idx].last_loc_idx = loc_idx
+                    last_loc_indices[vessel_idx] = loc_idx
 
-            # Update vessel plans.
-            for plan_port_idx, plan_tick in self._data_cntr.vessel_planned_stops[vessel_idx, vessel.route_idx, loc_idx]:
-                self._vessel_plans[vessel_idx, plan_port_idx] = plan_tick
+                    arrived_stops.append(stop)
 
-            if loc_idx > 0 and stop.arrive_tick == tick:
-                self._vessel_plans[vessel_idx, port_idx] = stop.arrive_tick
+        self._update_vessel_stops_and_plans(last_loc_indices, next_loc_indices, arrived_stops)
 
         # Insert the cascade events at the end.
         for event in decision_evt_list:
             self._event_buffer.insert_event(event)
 
+    def _update_vessel_stops_and_plans(
+        self, last_loc_indices: np.ndarray, next_loc_indices: np.ndarray, arrived_stops: List[Stop]
+    ):
+        """Update stop lists and plans of the vessels that location changed, or plan changed since last update.
+
+        Stop lists and plans only depend on the locations of vessel, so the unchanged vessels are skipped,
+        and the values of all the updated vessels are written with one call for each attribute.
+
+        Args:
+            last_loc_indices (np.ndarray): Last location index of each vessel.
+            next_loc_indices (np.ndarray): Next location index of each vessel.
+            arrived_stops (List[Stop]): Stops that vessels arrived at current tick.
+        """
+        is_vessel_changed = (
+            self._is_vessel_plan_dirty
+            | (last_loc_indices != self._updated_loc_indices[0])
+            | (next_loc_indices != self._updated_loc_indices[1])
+        )
+
+        vessel_indices = np.flatnonzero(is_vessel_changed)
+
+        if len(vessel_indices) > 0:
+            past_stop_number = self._data_cntr.past_stop_number
+            future_stop_number = self._data_cntr.future_stop_number
+            vessel_number = len(vessel_indices)
+
+            past_stops = np.full((2, vessel_number, past_stop_number), -1, dtype=np.int32)
+            future_stops = np.full((2, vessel_number, future_stop_number), -1, dtype=np.int32)
+
+            # Vessel plan cell (vessel index, port index) -> planned tick, later one overwrites previous one.
+            plans = {}
+
+            for i, vessel_idx in enumerate(vessel_indices.tolist()):
+                last_loc_idx = int(last_loc_indices[vessel_idx])
+                loc_idx = int(next_loc_indices[vessel_idx])
+
+                for stops, stop_list in (
+                    (past_stops, self._data_cntr.vessel_past_stops[vessel_idx, last_loc_idx, loc_idx]),
+                    (future_stops, self._data_cntr.vessel_future_stops[vessel_idx, last_loc_idx, loc_idx])
+                ):
+                    for j, stop in enumerate(stop_list):
+                        if stop is not None:
+                            stops[0, i, j] = stop.port_idx
+                            stops[1, i, j] = stop.arrive_tick
+
+                route_idx = self._vessels[vessel_idx].route_idx
+
+                for plan_port_idx, plan_tick in self._data_cntr.vessel_planned_stops[vessel_idx, route_idx, loc_idx]:
+                    plans[(vessel_idx, plan_port_idx)] = plan_tick
+
+            set_vessel_values = self._frame.set_node_attribute_values
+
+            set_vessel_values("vessels", "past_stop_list", past_stops[0], vessel_indices)
+            set_vessel_values("vessels", "past_stop_tick_list", past_stops[1], vessel_indices)
+            set_vessel_values("vessels", "future_stop_list", future_stops[0], vessel_indices)
+            set_vessel_values("vessels", "future_stop_tick_list", future_stops[1], vessel_indices)
+
+            for stop in arrived_stops:
+                plans[(stop.vessel_idx, stop.port_idx)] = stop.arrive_tick
+
+            self._vessel_plans.set_values(plans.keys(), plans.values())
+
+        self._updated_loc_indices[0] = last_loc_indices
+        self._updated_loc_indices[1] = next_loc_indices
+
+        # Plans of arrived vessels will be overwritten by their sailing plans at next tick.
+        self._is_vessel_plan_dirty[:] = False
+
+        for stop in arrived_stops:
+            self._is_vessel_plan_dirty[stop.vessel_idx] = True
+
+    def _reset_vessel_updates(self):
+        """Make all the vessels to update stop lists and plans at next step."""
+        vessel_number = self._data_cntr.vessel_number
+
+        # Last and next location indices of vessels when their stop lists and plans updated.
+        self._updated_loc_indices = np.full((2, vessel_number), -1, dtype=np.int64)
+
+        # Vessels that their plans changed by actions or arrival, they should be updated even not moved.
+        self._is_vessel_plan_dirty = np.ones(vessel_number, dtype=bool)
+
     def post_step(self, tick: int):
         """Post-process after each step.
 
@@ -199,6 +297,9 @@ class CimBusinessEngine(AbsBusinessEngine):
                 port.fulfillment = 0
                 port.transfer_cost = 0
 
+        if self._is_totals_check_enabled:
+            self._check_totals(tick)
+
         return tick + 1 == self._max_tick
 
     def reset(self):
@@ -212,11 +313,13 @@ class CimBusinessEngine(AbsBusinessEngine):
 
         self._data_cntr.reset()
 
-        # Insert departure event again.
-        self._load_departure_events()
+        # Insert departure events again from the first stops.
+        self._reset_departure_events()
 
         self._total_operate_num = 0
 
+        self._reset_totals()
+
     def action_scope(self, port_idx: int, vessel_idx: int) -> ActionScope:
         """Get the action scope of specified agent.
 
@@ -247,14 +350,13 @@ class CimBusinessEngine(AbsBusinessEngine):
             dict: A dict that contains "perf", "total_shortage" and "total_cost",
                 and can use help method to show help docs.
         """
-        total_shortage = sum([p.acc_shortage for p in self._ports])
-        total_booking = sum([p.acc_booking for p in self._ports])
-
         return DocableDict(
             metrics_desc,
-            order_requirements=total_booking,
-            container_shortage=total_shortage,
-            operation_number=self._total_operate_num
+            order_requirements=self._total_booking,
+            container_shortage=self._total_shortage,
+            operation_number=self._total_operate_num,
+            total_empty=self._total_empty,
+            total_full=self._total_full
         )
 
     def get_node_mapping(self) -> dict:
@@ -316,6 +418,41 @@ class CimBusinessEngine(AbsBusinessEngine):
         # Init vessel plans.
         self._vessel_plans[:] = -1
 
+        self._reset_vessel_updates()
+
+        self._reset_totals()
+
+    def _reset_totals(self):
+        """Reset fleet-wide totals with initial states of nodes."""
+        self._total_empty, self._total_full, self._total_shortage, self._total_booking = self._calc_totals()
+
+    def _calc_totals(self) -> tuple:
+        """Calculate fleet-wide totals from the states of all nodes.
+
+        Returns:
+            tuple: Total empty, full, shortage and booking.
+        """
+        def total_of(node_name: str, attr_name: str) -> int:
+            return int(self._frame.get_node_attribute_values(node_name, attr_name).sum())
+
+        return (
+            total_of("ports", "empty") + total_of("vessels", "empty"),
+            total_of("ports", "full") + total_of("vessels", "full"),
+            total_of("ports", "acc_shortage"),
+            total_of("ports", "acc_booking")
+        )
+
+    def _check_totals(self, tick: int):
+        """Check if fleet-wide totals are same as the ones calculated from nodes."""
+        totals = (self._total_empty, self._total_full, self._total_shortage, self._total_booking)
+        expected_totals = self._calc_totals()
+
+        if totals != expected_totals:
+            raise AssertionError(
+                f"Fleet-wide totals (empty, full, shortage, booking) at tick {tick} are {totals}, "
+                f"but the ones calculated from nodes are {expected_totals}."
+            )
+
     def _reset_nodes(self):
         # Reset both vessels and ports.
         # NOTE: This should be called after frame.reset.
@@ -328,6 +465,8 @@ class CimBusinessEngine(AbsBusinessEngine):
         # Reset vessel plans.
         self._vessel_plans[:] = -1
 
+        self._reset_vessel_updates()
+
     def _register_events(self):
         """Register events."""
         register_handler = self._event_buffer.register_event_handler
@@ -340,15 +479,44 @@ class CimBusinessEngine(AbsBusinessEngine):
         register_handler(Events.DISCHARGE_FULL, self._on_discharge)
         register_handler(MaroEvents.TAKE_ACTION, self._on_action_received)
 
-    def _load_departure_events(self):
-        """Insert leaving event at the beginning as we already unpack the root to a loop at the beginning."""
+    def _reset_departure_events(self):
+        """Start inserting departure events from the first stop of each vessel."""
+        self._departure_stop_indices = [0] * self._data_cntr.vessel_number
+        self._departure_inserted_tick = -1
+
+    def _insert_departure_events(self, tick: int):
+        """Insert departure events of the stops that leave within the window from current tick.
+
+        Departure events used to be inserted for all the ticks at the beginning, that makes them the first events
+        of their tick, so they are inserted to the head in reversed order here, to keep the same executing order.
+        """
+        if tick <= self._departure_inserted_tick:
+            return
+
+        window_end_tick = tick + DEPARTURE_EVENT_WINDOW
+        tick_payloads = defaultdict(list)
 
         for vessel_idx, stops in enumerate(self._data_cntr.vessel_stops[:]):
-            for stop in stops:
-                payload = VesselStatePayload(stop.port_idx, vessel_idx)
-                dep_evt = self._event_buffer.gen_atom_event(stop.leave_tick, Events.VESSEL_DEPARTURE, payload)
+            stop_idx = self._departure_stop_indices[vessel_idx]
+
+            while stop_idx < len(stops) and stops[stop_idx].leave_tick <= window_end_tick:
+                stop = stops[stop_idx]
+
+                # Departures before current tick (like before start tick) will never be executed.
+                if stop.leave_tick >= tick:
+                    tick_payloads[stop.leave_tick].append(VesselStatePayload(stop.port_idx, vessel_idx))
+
+                stop_idx += 1
+
+            self._departure_stop_indices[vessel_idx] = stop_idx
+
+        for leave_tick, payloads in tick_payloads.items():
+            for payload in reversed(payloads):
+                dep_evt = self._event_buffer.gen_atom_event(leave_tick, Events.VESSEL_DEPARTURE, payload)
+
+                self._event_buffer.insert_event_to_head(dep_evt)
 
-                self._event_buffer.insert_event(dep_evt)
+        self._departure_inserted_tick = window_end_tick
 
     def _init_frame(self):
         """Initialize the frame based on data generator."""
@@ -409,6 +577,7 @@ class CimBusinessEngine(AbsBusinessEngine):
         src_empty = src_port.empty
         src_port.booking += execute_qty
         src_port.acc_booking += execute_qty
+        self._total_booking += execute_qty
 
         # Check if there is any shortage.
         if src_empty < order.quantity:
@@ -416,10 +585,12 @@ class CimBusinessEngine(AbsBusinessEngine):
             shortage_qty = order.quantity - src_empty
             src_port.shortage += shortage_qty
             src_port.acc_shortage += shortage_qty
+            self._total_shortage += shortage_qty
             execute_qty = src_empty
 
         # Update port state.
         src_port.empty -= execute_qty
+        self._total_empty -= execute_qty
         # Full contianers that pending to return.
         src_port.on_shipper += execute_qty
 
@@ -451,6 +622,7 @@ class CimBusinessEngine(AbsBusinessEngine):
         src_port = self._ports[payload.src_port_idx]
         src_port.on_shipper -= payload.quantity
         src_port.full += payload.quantity
+        self._total_full += payload.quantity
 
         pending_full_number = self._get_pending_full(
             payload.src_port_idx, payload.dest_port_idx)
@@ -568,6 +740,7 @@ class CimBusinessEngine(AbsBusinessEngine):
 
         vessel.full -= discharge_qty
         port.on_consignee += discharge_qty
+        self._total_full -= discharge_qty
 
         self._full_on_vessels[vessel_idx, port_idx] -= discharge_qty
 
@@ -593,6 +766,7 @@ class CimBusinessEngine(AbsBusinessEngine):
 
         port.on_consignee -= payload.quantity
         port.empty += payload.quantity
+        self._total_empty += payload.quantity
 
     def _on_action_received(self, event: CascadeEvent):
         """Handler for processing actions from agent.
@@ -632,3 +806,4 @@ class CimBusinessEngine(AbsBusinessEngine):
                 port.transfer_cost += num
 
                 self._vessel_plans[vessel_idx, port_idx] += self._data_cntr.vessel_period[vessel_idx]
+                self._is_vessel_plan_dirty[vessel_idx] = True
@@ -2,6 +2,7 @@
 # Licensed under the MIT license.
 
 
+import copy
 from enum import IntEnum
 
 from maro.backends.frame import SnapshotList
@@ -102,6 +103,17 @@ class DecisionEvent:
 
         return self._early_discharge
 
+    def __deepcopy__(self, memo: dict):
+        """Copy all the fields, as __getstate__ only returns the pickleable ones."""
+        decision_event = self.__class__.__new__(self.__class__)
+
+        memo[id(self)] = decision_event
+
+        for name, value in self.__dict__.items():
+            decision_event.__dict__[name] = copy.deepcopy(value, memo)
+
+        return decision_event
+
     def __getstate__(self):
         """Return pickleable dictionary.
 
@@ -4,6 +4,8 @@
 import csv
 import os
 
+import numpy as np
+
 
 def load_adj_from_csv(file: str, skiprows: int = 0):
     """Read adj information from csv file.
@@ -30,3 +32,41 @@ def load_adj_from_csv(file: str, skiprows: int = 0):
             adj.append([float(col) for col in row])
 
     return adj
+
+
+def load_adj_from_npy(file: str) -> np.ndarray:
+    """Memory-map adj information from npy file, which is converted by convert_adj_csv_to_npy.
+
+    The file is mapped as read-only, so its pages are loaded on demand, and shared by the environments
+    that use the same file.
+
+    Args:
+        file (str): Npy file to read.
+
+    Returns:
+        np.ndarray: A 2-dim read-only array.
+    """
+    if file.startswith("~"):
+        file = os.path.expanduser(file)
+
+    return np.load(file, mmap_mode="r")
+
+
+def convert_adj_csv_to_npy(csv_file: str, npy_file: str, skiprows: int = 0, dtype: np.dtype = np.float32):
+    """Convert adj information from csv file into npy file, to load it with load_adj_from_npy.
+
+    Args:
+        csv_file (str): Csv file to convert.
+        npy_file (str): Npy file to output.
+        skiprows (int): Row number to skip.
+        dtype (np.dtype): Data type of values in output file.
+    """
+    if csv_file.startswith("~"):
+        csv_file = os.path.expanduser(csv_file)
+
+    if npy_file.startswith("~"):
+        npy_file = os.path.expanduser(npy_file)
+
+    adj = np.loadtxt(csv_file, dtype=dtype, delimiter=",", skiprows=skiprows, ndmin=2)
+
+    np.save(npy_file, adj)
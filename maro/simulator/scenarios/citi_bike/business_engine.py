@@ -3,7 +3,7 @@
 
 import datetime
 import os
-from typing import List
+from typing import Dict, List
 
 import holidays
 import numpy as np
@@ -22,8 +22,8 @@ from maro.simulator.scenarios.matrix_accessor import MatrixAttributeAccessor
 from maro.utils.exception.cli_exception import CommandError
 from maro.utils.logger import CliLogger
 
-from .adj_loader import load_adj_from_csv
-from .common import BikeReturnPayload, BikeTransferPayload, DecisionEvent
+from .adj_loader import load_adj_from_csv, load_adj_from_npy
+from .common import BikeReturnPayload, BikeReturnsPayload, BikeTransferPayload, DecisionEvent
 from .decision_strategy import BikeDecisionStrategy
 from .events import CitiBikeEvents
 from .frame_builder import build_frame
@@ -70,6 +70,12 @@ class CitibikeBusinessEngine(AbsBusinessEngine):
         self._total_shortages: int = 0
         self._total_operate_num: int = 0
 
+        # Process trips of a tick as columns, instead of one event for each trip.
+        self._is_batch_trips: bool = self._additional_options.get("batch-trips", False)
+
+        # Bike returns of trips in batch mode, key is the tick to return.
+        self._return_ledger: Dict[int, BikeReturnsPayload] = {}
+
         self._init()
 
     @property
@@ -93,13 +99,23 @@ class CitibikeBusinessEngine(AbsBusinessEngine):
         Args:
             tick (int): Current tick to process.
         """
-        # If we do not set auto event, then we need to push it manually.
-        for trip in self._item_picker.items(tick):
-            # Generate a trip event, to dispatch to related callback to process this requirement.
-            trip_evt = self._event_buffer.gen_atom_event(
-                tick, CitiBikeEvents.RequireBike, payload=trip)
+        if self._is_batch_trips:
+            trips = self._item_picker.items(tick)
 
-            self._event_buffer.insert_event(trip_evt)
+            # One event for all the trips of this tick, payload is the columns of trips.
+            if len(trips.src_station) > 0:
+                trips_evt = self._event_buffer.gen_atom_event(
+                    tick, CitiBikeEvents.RequireBike, payload=trips)
+
+                self._event_buffer.insert_event(trips_evt)
+        else:
+            # If we do not set auto event, then we need to push it manually.
+            for trip in self._item_picker.items(tick):
+                # Generate a trip event, to dispatch to related callback to process this requirement.
+                trip_evt = self._event_buffer.gen_atom_event(
+                    tick, CitiBikeEvents.RequireBike, payload=trip)
+
+                self._event_buffer.insert_event(trip_evt)
 
         if self._decision_strategy.is_decision_tick(tick):
             # Generate an event, so that we can do the checking after all the trip requirement processed.
@@ -117,6 +133,8 @@ class CitibikeBusinessEngine(AbsBusinessEngine):
             # NOTE: We should use frame_index method to get correct index in snapshot list.
             self._frame.take_snapshot(self.frame_index(tick))
 
+            self._decision_strategy.next_frame()
+
             # We reset the station station each resolution.
             for station in self._stations:
                 station.shortage = 0
@@ -141,7 +159,8 @@ class CitibikeBusinessEngine(AbsBusinessEngine):
         """dict: Event payload details of current scenario."""
         return {
             CitiBikeEvents.RequireBike.name: list(self._trip_reader.meta.columns.keys()),
-            CitiBikeEvents.ReturnBike.name: BikeReturnPayload.summary_key,
+            CitiBikeEvents.ReturnBike.name:
+                BikeReturnsPayload.summary_key if self._is_batch_trips else BikeReturnPayload.summary_key,
             CitiBikeEvents.RebalanceBike.name: DecisionEvent.summary_key,
             CitiBikeEvents.DeliverBike.name: BikeTransferPayload.summary_key
         }
@@ -158,8 +177,9 @@ class CitibikeBusinessEngine(AbsBusinessEngine):
 
         self._trip_reader.reset()
 
-        self._item_picker = self._trip_reader.items_tick_picker(
-            self._start_tick, self._max_tick, time_unit="m")
+        self._item_picker = self._get_item_picker()
+
+        self._return_ledger.clear()
 
         for station in self._stations:
             station.reset()
@@ -238,9 +258,7 @@ class CitibikeBusinessEngine(AbsBusinessEngine):
         # Used to cache last date we updated the station additional features to avoid to much time updating.
         self._last_date: datetime.datetime = None
 
-        # Filter data with tick range by minute (time_unit='m').
-        self._item_picker = self._trip_reader.items_tick_picker(
-            self._start_tick, self._max_tick, time_unit="m")
+        self._item_picker = self._get_item_picker()
 
         # We use this to initializing frame and stations states.
         stations_states = get_station_info(self._conf["stations_init_data"])
@@ -253,7 +271,14 @@ class CitibikeBusinessEngine(AbsBusinessEngine):
 
         # Our decision strategy to determine when we need an action.
         self._decision_strategy = BikeDecisionStrategy(
-            self._stations, self._distance_adj, self._snapshots, self._conf["decision"])
+            self._frame, self._distance_adj, self._conf["decision"], self.calc_max_snapshots())
+
+    def _get_item_picker(self):
+        # Filter data with tick range by minute (time_unit='m').
+        if self._is_batch_trips:
+            return self._trip_reader.items_tick_block_picker(self._start_tick, self._max_tick, time_unit="m")
+
+        return self._trip_reader.items_tick_picker(self._start_tick, self._max_tick, time_unit="m")
 
     def _load_configs(self):
         """Load configurations"""
@@ -275,9 +300,13 @@ class CitibikeBusinessEngine(AbsBusinessEngine):
             station.set_init_state(state.bikes, state.capacity, state.id)
 
     def _init_adj_matrix(self):
-        # Our distance adj. Assume that the adj is NxN without header.
-        distance_adj = np.array(load_adj_from_csv(
-            self._conf["distance_adj_data"], skiprows=1))
+        distance_adj_data = self._conf["distance_adj_data"]
+
+        # Our distance adj. Assume that the adj is NxN, npy file is mapped, csv file has a header.
+        if distance_adj_data.endswith(".npy"):
+            distance_adj = load_adj_from_npy(distance_adj_data)
+        else:
+            distance_adj = np.array(load_adj_from_csv(distance_adj_data, skiprows=1))
 
         # We only have one node here.
         self._matrices_node = self._frame.matrices[0]
@@ -299,10 +328,16 @@ class CitibikeBusinessEngine(AbsBusinessEngine):
 
     def _register_events(self):
         # Register our own events and their callback handlers.
-        self._event_buffer.register_event_handler(
-            CitiBikeEvents.RequireBike, self._on_required_bike)
-        self._event_buffer.register_event_handler(
-            CitiBikeEvents.ReturnBike, self._on_bike_returned)
+        if self._is_batch_trips:
+            self._event_buffer.register_event_handler(
+                CitiBikeEvents.RequireBike, self._on_required_bikes)
+            self._event_buffer.register_event_handler(
+                CitiBikeEvents.ReturnBike, self._on_bikes_returned)
+        else:
+            self._event_buffer.register_event_handler(
+                CitiBikeEvents.RequireBike, self._on_required_bike)
+            self._event_buffer.register_event_handler(
+                CitiBikeEvents.ReturnBike, self._on_bike_returned)
         self._event_buffer.register_event_handler(
             CitiBikeEvents.RebalanceBike, self._on_rebalance_bikes)
         self._event_buffer.register_event_handler(
@@ -356,6 +391,8 @@ class CitibikeBusinessEngine(AbsBusinessEngine):
         # Update trip count, each item only contains 1 requirement.
         station.trip_requirement += 1
 
+        self._decision_strategy.add_trip_requirement(station_idx)
+
         # Statistics for metrics.
         self._total_trips += 1
 
@@ -381,21 +418,125 @@ class CitibikeBusinessEngine(AbsBusinessEngine):
 
             self._event_buffer.insert_event(bike_return_evt)
 
+    def _on_required_bikes(self, evt: AtomEvent):
+        """Callback when there are trip requirements of a tick generated, in batch mode."""
+        trips = evt.payload
+        src_stations = trips.src_station.astype(np.int64)
+        dest_stations = trips.dest_station.astype(np.int64)
+
+        station_indices, trip_numbers = np.unique(src_stations, return_counts=True)
+
+        get_station_values = self._frame.get_node_attribute_values
+        set_station_values = self._frame.set_node_attribute_values
+
+        station_bikes = get_station_values("stations", "bikes", station_indices)
+
+        # Trips of a station take bikes in order, the ones after bikes used up are shortages.
+        sorted_trip_indices = np.argsort(src_stations, kind="stable")
+        sorted_src_stations = src_stations[sorted_trip_indices]
+
+        trip_orders = np.empty(len(src_stations), dtype=np.int64)
+        trip_orders[sorted_trip_indices] = \
+            np.arange(len(src_stations)) - np.searchsorted(sorted_src_stations, sorted_src_stations)
+
+        is_fulfilled = trip_orders < station_bikes[np.searchsorted(station_indices, src_stations)]
+
+        # Same as is_fulfilled, no trip is fulfilled if bikes of station are not positive.
+        fulfillments = np.minimum(np.maximum(station_bikes, 0), trip_numbers)
+        shortages = trip_numbers - fulfillments
+
+        set_station_values("stations", "bikes", station_bikes - fulfillments, station_indices)
+
+        for attr_name, values in (
+            ("trip_requirement", trip_numbers), ("shortage", shortages), ("fulfillment", fulfillments)
+        ):
+            set_station_values(
+                "stations", attr_name, get_station_values("stations", attr_name, station_indices) + values,
+                station_indices
+            )
+
+        self._decision_strategy.add_trip_requirement(station_indices, trip_numbers)
+
+        # Statistics for metrics.
+        self._total_trips += len(src_stations)
+        self._total_shortages += int(shortages.sum())
+
+        station_pairs, pair_trip_numbers = np.unique(
+            np.stack((src_stations, dest_stations), axis=1), axis=0, return_counts=True
+        )
+        station_pairs = [tuple(station_pair) for station_pair in station_pairs.tolist()]
+
+        self._trips_adj.set_values(station_pairs, self._trips_adj.get_values(station_pairs) + pair_trip_numbers)
+
+        # Bikes of fulfilled trips are returned by end tick, grouped by the tick in the ledger.
+        return_ticks = evt.tick + trips.durations[is_fulfilled].astype(np.int64)
+        return_src_stations = src_stations[is_fulfilled]
+        return_dest_stations = dest_stations[is_fulfilled]
+
+        sorted_return_indices = np.argsort(return_ticks, kind="stable")
+        sorted_return_ticks = return_ticks[sorted_return_indices]
+
+        unique_return_ticks, tick_starts = np.unique(sorted_return_ticks, return_index=True)
+
+        for return_tick, return_indices in zip(
+            unique_return_ticks.tolist(), np.split(sorted_return_indices, tick_starts[1:])
+        ):
+            returns = self._return_ledger.get(return_tick, None)
+
+            if returns is None:
+                returns = BikeReturnsPayload()
+
+                self._return_ledger[return_tick] = returns
+
+                bike_return_evt = self._event_buffer.gen_atom_event(
+                    return_tick, CitiBikeEvents.ReturnBike, payload=returns
+                )
+
+                self._event_buffer.insert_event(bike_return_evt)
+
+            returns.add_returns(return_src_stations[return_indices], return_dest_stations[return_indices])
+
     def _on_bike_returned(self, evt: AtomEvent):
         """Callback when there is a bike returned to a station."""
         payload: BikeReturnPayload = evt.payload
 
-        station: Station = self._stations[payload.to_station_idx]
+        self._return_bikes(payload.from_station_idx, payload.to_station_idx, payload.number)
+
+    def _on_bikes_returned(self, evt: AtomEvent):
+        """Callback when bikes of a tick returned to stations, in batch mode."""
+        returns: BikeReturnsPayload = evt.payload
+
+        if self._return_ledger.get(evt.tick, None) is returns:
+            self._return_ledger.pop(evt.tick)
+
+        to_station_indices = returns.to_station_indices
+
+        station_indices, return_numbers = np.unique(to_station_indices, return_counts=True)
+
+        station_bikes = self._frame.get_node_attribute_values("stations", "bikes", station_indices)
+        empty_docks = self._frame.get_node_attribute_values("stations", "capacity", station_indices) - station_bikes
+
+        if np.all(return_numbers <= empty_docks):
+            self._frame.set_node_attribute_values("stations", "bikes", station_bikes + return_numbers, station_indices)
+        else:
+            # Failed returns are moved to neighbors, which changes the empty docks of others, so return one by one.
+            for from_station_idx, to_station_idx in zip(
+                returns.from_station_indices.tolist(), to_station_indices.tolist()
+            ):
+                self._return_bikes(from_station_idx, to_station_idx, 1)
+
+    def _return_bikes(self, from_station_idx: int, to_station_idx: int, return_number: int):
+        """Return bikes to a station, the ones without empty docks are moved to neighbors."""
+        station: Station = self._stations[to_station_idx]
 
         station_bikes = station.bikes
-        return_number = payload.number
 
         empty_docks = station.capacity - station_bikes
 
         max_accept_number = min(empty_docks, return_number)
 
         if max_accept_number < return_number:
-            src_station = self._stations[payload.from_station_idx]
+            src_station = self._stations[from_station_idx]
 
             additional_bikes = return_number - max_accept_number
 
@@ -486,6 +627,9 @@ class CitibikeBusinessEngine(AbsBusinessEngine):
 
                 self._event_buffer.insert_event(transfer_evt)
 
+                # Returns scheduled after this delivery should be processed after it, so start a new bucket.
+                self._return_ledger.pop(evt.tick + transfer_time, None)
+
     def _build_temp_data(self):
         """Build temporary data for predefined environment."""
         logger.warning_yellow(
@@ -1,8 +1,11 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import copy
 from enum import Enum
 
+import numpy as np
+
 
 class BikeTransferPayload:
     """Payload for bike transfer event.
@@ -38,6 +41,39 @@ class BikeReturnPayload:
         self.number = number
 
 
+class BikeReturnsPayload:
+    """Payload for all the bike returns at a tick, used when trips are processed in batch.
+
+    Returns are added in the order of trips, the i-th item of each array is for the i-th returned bike.
+    """
+
+    summary_key = ["from_station_indices", "to_station_indices"]
+
+    def __init__(self):
+        self._from_station_blocks = []
+        self._to_station_blocks = []
+
+    @property
+    def from_station_indices(self) -> np.ndarray:
+        """np.ndarray: Which stations (index) the bikes come from."""
+        return np.concatenate(self._from_station_blocks) if self._from_station_blocks else np.zeros(0, dtype=int)
+
+    @property
+    def to_station_indices(self) -> np.ndarray:
+        """np.ndarray: Which stations (index) the bikes return to."""
+        return np.concatenate(self._to_station_blocks) if self._to_station_blocks else np.zeros(0, dtype=int)
+
+    def add_returns(self, from_station_indices: np.ndarray, to_station_indices: np.ndarray):
+        """Add returns of bikes, one bike for each item.
+
+        Args:
+            from_station_indices (np.ndarray): Which stations (index) the bikes come from.
+            to_station_indices (np.ndarray): Which stations (index) the bikes return to.
+        """
+        self._from_station_blocks.append(from_station_indices)
+        self._to_station_blocks.append(to_station_indices)
+
+
 class DecisionType(Enum):
     """Station decision type."""
     # current cell has too more bikes, need transfer to others
@@ -79,6 +115,17 @@ class DecisionEvent:
 
         return self._action_scope
 
+    def __deepcopy__(self, memo: dict):
+        """Copy all the fields, as __getstate__ only returns the pickleable ones."""
+        decision_event = self.__class__.__new__(self.__class__)
+
+        memo[id(self)] = decision_event
+
+        for name, value in self.__dict__.items():
+            decision_event.__dict__[name] = copy.deepcopy(value, memo)
+
+        return decision_event
+
     def __getstate__(self):
         """Return pickleable dictionary."""
         return {
@@ -2,14 +2,17 @@
 # Licensed under the MIT license.
 
 from math import floor
-from typing import Dict
+from typing import Dict, Union
 
 import numpy as np
 
+from maro.backends.frame import FrameBase
 from maro.simulator.scenarios.matrix_accessor import MatrixAttributeAccessor
 
 from .common import DecisionType, ExtraCostMode
+from .neighbor_index import NeighborIndex
 from .station import Station
+from .trips_window import TripsWindow
 
 
 class DistanceFilter:
@@ -37,16 +40,9 @@ class DistanceFilter:
         """
         output_num = min(self._output_num, len(source))
 
-        neighbors = self._strategy._get_neighbors(station_idx)
+        neighbor_indices, _ = self._strategy.neighbor_index.get_neighbors(station_idx, output_num)
 
-        output_neighbors = neighbors[0:output_num]
-
-        result = {}
-
-        for neighbor_idx, _ in output_neighbors:
-            result[neighbor_idx] = source[neighbor_idx]
-
-        return result
+        return {neighbor_idx: source[neighbor_idx] for neighbor_idx in neighbor_indices.tolist()}
 
     def reset(self):
         """Reset internal states."""
@@ -90,19 +86,29 @@ class TripsWindowFilter:
     """Filter neighbors by trip requirement in latest N windows.
 
     NOTE:
-        This filter will cache its states, need to be reset before each episode.
+        Trip requirements are summed by its TripsWindow, which is fed by the business engine,
+        need to be reset before each episode.
 
     Args:
         conf (dict): Configuration of this fileter.
-        snapshot_list (SnapshotList): Snapshots used to quering states.
+        station_num (int): Number of stations.
+        max_snapshots (int): Max number of snapshots in snapshot list, None means no limitation.
     """
 
-    def __init__(self, conf: dict, snapshot_list):
+    def __init__(self, conf: dict, station_num: int, max_snapshots: int = None):
         self._output_num = conf["num"]
         self._windows = conf["windows"]
-        self._snapshot_list = snapshot_list
 
-        self._window_states_cache = {}
+        # Frames out of snapshot list are not counted.
+        if max_snapshots is not None:
+            self._windows = min(self._windows, max_snapshots)
+
+        self._trips_window = TripsWindow(station_num, self._windows)
+
+    @property
+    def trips_window(self) -> TripsWindow:
+        """TripsWindow: Trip requirements of stations in latest N windows."""
+        return self._trips_window
 
     def filter(self, station_idx: int, decision_type: DecisionType, source: Dict[int, int]) -> Dict[int, int]:
         """Filter neighbors by trip requirements in latest N windows.
@@ -117,62 +123,40 @@ class TripsWindowFilter:
         """
         output_num = min(self._output_num, len(source))
 
-        avaiable_frame_indices = self._snapshot_list.get_frame_index_list()
-
-        # max windows we can get
-        available_windows = min(self._windows, len(avaiable_frame_indices))
-
-        # get frame index list for latest N windows
-        avaiable_frame_indices = avaiable_frame_indices[-available_windows:]
-
-        source_trips = {}
-
-        for i, frame_index in enumerate(avaiable_frame_indices):
-            if i == available_windows - 1 or frame_index not in self._window_states_cache:
-                # overwrite latest one, since it may be changes, and cache not exist one
-                trip_state = self._snapshot_list["stations"][frame_index::"trip_requirement"]
-
-                self._window_states_cache[frame_index] = trip_state
-
-            trip_state = self._window_states_cache[frame_index]
-
-            for neighbor_idx, _ in source.items():
-                trip_num = trip_state[neighbor_idx]
-
-                if neighbor_idx not in source_trips:
-                    source_trips[neighbor_idx] = trip_num
-                else:
-                    source_trips[neighbor_idx] += trip_num
+        neighbor_indices = list(source.keys())
+        source_trips = zip(self._trips_window.get_trips(neighbor_indices).tolist(), neighbor_indices)
 
         is_sort_reverse = False
 
         if decision_type == DecisionType.Demand:
             is_sort_reverse = True
 
-        sorted_neighbors = sorted(source_trips.items(), key=lambda kv: (kv[1], kv[0]), reverse=is_sort_reverse)
+        sorted_neighbors = sorted(source_trips, reverse=is_sort_reverse)
 
         result = {}
 
-        for neighbor_idx, _ in sorted_neighbors[0: output_num]:
+        for _, neighbor_idx in sorted_neighbors[0: output_num]:
             result[neighbor_idx] = source[neighbor_idx]
 
         return result
 
     def reset(self):
-        self._window_states_cache.clear()
+        self._trips_window.reset()
 
 
 class BikeDecisionStrategy:
     """Helper to provide decision related logic.
 
     Args:
-        stations (list): List for current stations.
+        frame (FrameBase): Frame that contains current stations.
         distance_adj (list): Distance adj for sorting.
-        snapshots (SnapshotList): Snapshots used to query states.
         options (dict): Additional options from configuration file.
+        max_snapshots (int): Max number of snapshots in snapshot list, None means no limitation.
     """
 
-    def __init__(self, stations: list, distance_adj: MatrixAttributeAccessor, snapshots, options: dict):
+    def __init__(
+        self, frame: FrameBase, distance_adj: MatrixAttributeAccessor, options: dict, max_snapshots: int = None
+    ):
         self._filter_cls_mapping = {
             "distance": {
                 "cls": DistanceFilter,
@@ -183,17 +167,15 @@ class BikeDecisionStrategy:
             },
             "trip_window": {
                 "cls": TripsWindowFilter,
-                "options": [snapshots]
+                "options": [len(frame.stations), max_snapshots]
             }
         }
 
         self._filters = []
-        self._stations = stations
+        self._frame = frame
+        self._stations = frame.stations
         self._distance_adj = distance_adj
 
-        # used to cache the neighbors after queried from frame, as it will not be changed
-        self._neighbors_cache = {}
-
         self.resolution = options["resolution"]
         self.time_mean = options["effective_time_mean"]
         self.supply_water_mark_ratio = options["supply_water_mark_ratio"]
@@ -209,6 +191,28 @@ class BikeDecisionStrategy:
 
         self._construct_action_scope_filters(action_scope_options)
 
+        self._trips_windows = [
+            nb_filter.trips_window for nb_filter in self._filters if type(nb_filter) == TripsWindowFilter
+        ]
+
+        # Nearest neighbors used by filters are built once, as distances will not be changed.
+        distance_filter_nums = [conf["num"] for conf in action_scope_options["filters"] if conf["type"] == "distance"]
+
+        self._neighbor_index = NeighborIndex(
+            np.asarray(distance_adj), max(distance_filter_nums) if len(distance_filter_nums) > 0 else None
+        )
+
+        # Only the nearest neighbors can pass the distance filter, no need to calculate the scope of others.
+        self._scope_neighbor_num = None
+
+        if len(self._filters) > 0 and type(self._filters[0]) == DistanceFilter:
+            self._scope_neighbor_num = action_scope_options["filters"][0]["num"]
+
+    @property
+    def neighbor_index(self) -> NeighborIndex:
+        """NeighborIndex: Nearest neighbors of each station."""
+        return self._neighbor_index
+
     @property
     def transfer_time(self) -> int:
         """int: Transfer time from one station to another."""
@@ -238,17 +242,40 @@ class BikeDecisionStrategy:
         stations = []
 
         if (tick + 1) % self.resolution == 0:
-            for station in self._stations:
-                cur_ratio = station.bikes / station.capacity
+            # Ratios of all the stations are checked with one query.
+            # NOTE: Station without capacity gets an inf ratio if it has bikes, so it is a supply one,
+            # or a nan ratio that matches no water mark, same as dividing station by station with numpy values.
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cur_ratios = self._frame.get_node_attribute_values("stations", "bikes") \
+                    / self._frame.get_node_attribute_values("stations", "capacity")
+
+            # if cell has too many available bikes, then we ask an action
+            is_supply = cur_ratios >= self.supply_water_mark_ratio
+            is_demand = ~is_supply & (cur_ratios <= self.demand_water_mark_ratio)
 
-                # if cell has too many available bikes, then we ask an action
-                if cur_ratio >= self.supply_water_mark_ratio:
-                    stations.append((station.index, DecisionType.Supply))
-                elif cur_ratio <= self.demand_water_mark_ratio:
-                    stations.append((station.index, DecisionType.Demand))
+            station_indices = np.flatnonzero(is_supply | is_demand)
+
+            for station_idx, is_supply_station in zip(station_indices.tolist(), is_supply[station_indices].tolist()):
+                stations.append((station_idx, DecisionType.Supply if is_supply_station else DecisionType.Demand))
 
         return stations
 
+    def add_trip_requirement(self, station_idx: Union[int, np.ndarray], number: Union[int, np.ndarray] = 1):
+        """Add trip requirements of stations in current frame, for the filters by trips.
+
+        Args:
+            station_idx (Union[int, np.ndarray]): Index of the station that trip required,
+                or unique indices of several stations.
+            number (Union[int, np.ndarray]): Number of trip requirements of each station.
+        """
+        for trips_window in self._trips_windows:
+            trips_window.add_trip(station_idx, number)
+
+    def next_frame(self):
+        """Begin a new frame for the filters by trips, should be called when a snapshot is taken."""
+        for trips_window in self._trips_windows:
+            trips_window.next_frame()
+
     def action_scope(self, station_idx: int, decision_type: DecisionType):
         """Calculate action scopes for self and N neighbors.
 
@@ -261,11 +288,11 @@ class BikeDecisionStrategy:
         """
         station: Station = self._stations[station_idx]
 
-        neighbors = self._get_neighbors(station_idx)
+        neighbor_indices, _ = self._neighbor_index.get_neighbors(station_idx, self._scope_neighbor_num)
 
         neighbor_scope = {}
 
-        for neighbor_idx, _ in neighbors:
+        for neighbor_idx in neighbor_indices.tolist():
             if neighbor_idx >= 0:
                 neighbor_station: Station = self._stations[neighbor_idx]
 
@@ -306,10 +333,8 @@ class BikeDecisionStrategy:
         total_cost = 0
         cost = 0
 
-        neighbors = self._get_neighbors(cur_station.index)
-
         # move to 1-step neighbors
-        for order_index, neighbor in enumerate(neighbors):
+        for order_index, neighbor in enumerate(self._iter_neighbors(cur_station.index)):
             neighbor_idx, distance = neighbor
 
             # ignore source cell and padding cell
@@ -374,20 +399,15 @@ class BikeDecisionStrategy:
         else:
             neighbor.extra_cost += cost
 
-    def _get_neighbors(self, station_idx: int):
-        """get neighbors for station, from cache if exists"""
-        # check cache first
-        neighbors = self._neighbors_cache.get(station_idx, None)
-
-        if neighbors is None:
-            distances = self._distance_adj[station_idx]
+    def _iter_neighbors(self, station_idx: int):
+        """iterate neighbors of station from near to far, farther ones are queried only if the nearest ones used up"""
+        kept_num = self._neighbor_index.neighbor_num
 
-            # index is the station index
-            neighbors = [(index, dist) for index, dist in enumerate(distances) if dist != 0.0]
+        neighbor_indices, distances = self._neighbor_index.get_neighbors(station_idx, kept_num)
 
-            # sort by distance
-            neighbors = sorted(neighbors, key=lambda item: item[1])
+        yield from zip(neighbor_indices.tolist(), distances.tolist())
 
-            self._neighbors_cache[station_idx] = neighbors
+        if len(neighbor_indices) == kept_num:
+            neighbor_indices, distances = self._neighbor_index.get_neighbors(station_idx)
 
-        return neighbors
+            yield from zip(neighbor_indices[kept_num:].tolist(), distances[kept_num:].tolist())
@@ -0,0 +1,90 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from typing import Tuple
+
+import numpy as np
+
+# Number of rows to sort at once when building the index, to limit the memory of temporary arrays.
+BUILD_BLOCK_ROWS = 256
+
+
+class NeighborIndex:
+    """Nearest neighbors of each station, built from distance matrix once.
+
+    Neighbors of a station are the other stations with non-zero distance, sorted by distance (then index) from
+    near to far. Only the first N neighbors are kept in compressed sparse row (CSR) arrays, getting them is only
+    slicing the arrays, the farther ones are calculated from distance matrix when required.
+
+    Args:
+        distance_adj (np.ndarray): Distance matrix with shape (station number, station number).
+        neighbor_num (int): Number of the nearest neighbors to keep for each station, None means all.
+    """
+
+    def __init__(self, distance_adj: np.ndarray, neighbor_num: int = None):
+        self._distance_adj = distance_adj
+
+        station_num = len(distance_adj)
+
+        self._neighbor_num = station_num if neighbor_num is None else min(neighbor_num, station_num)
+
+        indices_blocks = []
+        distances_blocks = []
+        counts_blocks = []
+
+        for start in range(0, station_num, BUILD_BLOCK_ROWS):
+            rows = distance_adj[start: start + BUILD_BLOCK_ROWS]
+
+            # Stable sorting, so stations with same distance are ordered by index.
+            order = np.argsort(rows, axis=1, kind="stable")
+            sorted_distances = np.take_along_axis(rows, order, axis=1)
+
+            is_neighbor = sorted_distances != 0.0
+            is_neighbor &= np.cumsum(is_neighbor, axis=1) <= self._neighbor_num
+
+            indices_blocks.append(order[is_neighbor])
+            distances_blocks.append(sorted_distances[is_neighbor])
+            counts_blocks.append(is_neighbor.sum(axis=1))
+
+        self._indptr = np.zeros(station_num + 1, dtype=np.int64)
+        self._indptr[1:] = np.cumsum(np.concatenate(counts_blocks))
+
+        self._indices = np.concatenate(indices_blocks)
+        self._distances = np.concatenate(distances_blocks)
+
+    @property
+    def neighbor_num(self) -> int:
+        """int: Number of the nearest neighbors kept for each station."""
+        return self._neighbor_num
+
+    def get_neighbors(self, station_idx: int, number: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the nearest neighbors of a station.
+
+        Args:
+            station_idx (int): Index of the station.
+            number (int): Number of nearest neighbors to get, None means all.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Index of neighbors and their distance, from near to far.
+        """
+        start = self._indptr[station_idx]
+        end = self._indptr[station_idx + 1]
+
+        # Less than the kept number means all the neighbors are kept.
+        if end - start < self._neighbor_num or (number is not None and number <= end - start):
+            if number is not None:
+                end = min(end, start + number)
+
+            return self._indices[start: end], self._distances[start: end]
+
+        indices, distances = self._get_all_neighbors(station_idx)
+
+        return indices[:number], distances[:number]
+
+    def _get_all_neighbors(self, station_idx: int) -> Tuple[np.ndarray, np.ndarray]:
+        distances = self._distance_adj[station_idx]
+
+        order = np.argsort(distances, kind="stable")
+        order = order[distances[order] != 0.0]
+
+        return order, distances[order]
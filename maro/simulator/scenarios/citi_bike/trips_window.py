@@ -0,0 +1,67 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from typing import List, Union
+
+import numpy as np
+
+
+class TripsWindow:
+    """Rolling sum of trip requirements of each station in latest N frames.
+
+    Trip requirements of each frame are kept in a ring buffer, the sum of the window is updated when a trip is
+    added and when a new frame begins, so getting the trips of any stations is only an indexing of the sum.
+
+    Args:
+        station_num (int): Number of stations.
+        windows (int): Number of latest frames to sum, including current one.
+    """
+
+    def __init__(self, station_num: int, windows: int):
+        self._windows = windows
+
+        # Trip requirements of each frame in window, row of current frame is pointed by _cur_row.
+        self._frame_trips = np.zeros((windows, station_num), dtype=np.int64)
+        self._window_trips = np.zeros(station_num, dtype=np.int64)
+
+        self._cur_row = 0
+
+    @property
+    def windows(self) -> int:
+        """int: Number of latest frames to sum."""
+        return self._windows
+
+    def add_trip(self, station_idx: Union[int, np.ndarray], number: Union[int, np.ndarray] = 1):
+        """Add trip requirements to stations in current frame.
+
+        Args:
+            station_idx (Union[int, np.ndarray]): Index of the station, or unique indices of several stations.
+            number (Union[int, np.ndarray]): Number of trip requirements of each station.
+        """
+        self._frame_trips[self._cur_row, station_idx] += number
+        self._window_trips[station_idx] += number
+
+    def next_frame(self):
+        """Begin a new frame, the oldest frame is moved out of the window."""
+        self._cur_row = (self._cur_row + 1) % self._windows
+
+        self._window_trips -= self._frame_trips[self._cur_row]
+        self._frame_trips[self._cur_row] = 0
+
+    def get_trips(self, station_indices: Union[int, List[int]]) -> Union[int, np.ndarray]:
+        """Get trip requirements of stations in latest N frames.
+
+        Args:
+            station_indices (Union[int, List[int]]): Index of stations.
+
+        Returns:
+            Union[int, np.ndarray]: Trip requirements of the stations.
+        """
+        return self._window_trips[station_indices]
+
+    def reset(self):
+        """Reset internal states."""
+        self._frame_trips[:] = 0
+        self._window_trips[:] = 0
+
+        self._cur_row = 0
@@ -3,6 +3,8 @@
 
 from datetime import date
 
+import numpy as np
+
 from maro.data_lib.binary_reader import BinaryReader
 from maro.simulator.scenarios.helpers import utc_timestamp_to_timezone
 
@@ -19,26 +21,54 @@ class WeatherTable:
         # Get weather at specified datetime, usually day leve.
         weather = weather_lut[your_date]
 
+    NOTE:
+        Items are read from binary file as columns, and indexed by the date, there is no item object
+        created until queried.
+
     Args:
         file (str): Binary file that contains weather information.
         timezone (object): Target timezone, used to convert timestamp from binary.
     """
 
     def __init__(self, file: str, timezone):
-        self._setup_in_memory_table(file, timezone)
+        self._setup_table(file, timezone)
 
-    def _setup_in_memory_table(self, file: str, timezone):
+    def _setup_table(self, file: str, timezone):
         reader = BinaryReader(file_path=file)
 
-        self._weather_lut = {}
-
         # just get all the items without filters
-        for item in reader.items():
-            dt = utc_timestamp_to_timezone(item.timestamp, timezone)
+        self._columns = reader.items_block()
+
+        reader.close()
+
+        date_ordinals = np.array(
+            [
+                utc_timestamp_to_timezone(timestamp, timezone).date().toordinal()
+                for timestamp in self._columns.timestamp.tolist()
+            ],
+            dtype=np.int64
+        )
 
-            self._weather_lut[dt.date()] = item
+        # Row of item for each date from the first one, -1 means no item of that date.
+        self._first_date_ordinal = 0
+        self._date_rows = np.zeros(0, dtype=np.int64)
+
+        if len(date_ordinals) > 0:
+            self._first_date_ordinal = int(date_ordinals.min())
+            self._date_rows = np.full(int(date_ordinals.max()) - self._first_date_ordinal + 1, -1, dtype=np.int64)
+
+        # Later item takes place if there are several items of a date.
+        for row, date_ordinal in enumerate(date_ordinals.tolist()):
+            self._date_rows[date_ordinal - self._first_date_ordinal] = row
 
     def __getitem__(self, key: date):
         assert type(key) == date
 
-        return self._weather_lut.get(key, None)
+        index = key.toordinal() - self._first_date_ordinal
+
+        if index < 0 or index >= len(self._date_rows) or self._date_rows[index] < 0:
+            return None
+
+        row = int(self._date_rows[index])
+
+        return type(self._columns)._make(column[row].item() for column in self._columns)
@@ -1,6 +1,8 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+from typing import Iterable
+
 from maro.backends.frame import NodeBase
 
 
@@ -65,6 +67,35 @@ class MatrixAttributeAccessor:
             # slice will ignore all parameters, and set values for all slots
             self._attr[:] = value
 
+    def set_values(self, keys: Iterable[tuple], values: Iterable[int]):
+        """Set values of multiple cells with one call.
+
+        Args:
+            keys (Iterable[tuple]): (row index, column index) of cells to set.
+            values (Iterable[int]): Value of each cell.
+        """
+        self._ensure_attr()
+
+        slots = [self._col_num * row_idx + column_idx for row_idx, column_idx in keys]
+
+        if len(slots) > 0:
+            self._attr[slots] = list(values)
+
+    def get_values(self, keys: Iterable[tuple]) -> list:
+        """Get values of multiple cells with one call.
+
+        Args:
+            keys (Iterable[tuple]): (row index, column index) of cells to get.
+
+        Returns:
+            list: Value of each cell.
+        """
+        self._ensure_attr()
+
+        slots = [self._col_num * row_idx + column_idx for row_idx, column_idx in keys]
+
+        return self._attr[slots] if len(slots) > 0 else []
+
     def get_row(self, row_idx: int) -> list:
         """Get values of a row.
 
@@ -4,8 +4,10 @@
 import os
 import shutil
 import tarfile
+from collections import defaultdict
 from typing import Dict, List
 
+import numpy as np
 from yaml import safe_load
 
 from maro.backends.frame import FrameBase, SnapshotList
@@ -17,12 +19,14 @@ from maro.simulator.scenarios.helpers import DocableDict
 from maro.utils.logger import CliLogger
 from maro.utils.utils import convert_dottable
 
-from .common import AllocateAction, DecisionPayload, Latency, PostponeAction, VmRequestPayload
+from .capacity_index import PmCapacityIndex
+from .common import AllocateAction, BatchDecisionPayload, DecisionPayload, Latency, PostponeAction, VmRequestPayload
 from .cpu_reader import CpuReader
 from .enums import Events, PmState, PostponeType, VmCategory
 from .frame_builder import build_frame
 from .physical_machine import PhysicalMachine
 from .virtual_machine import VirtualMachine
+from .vm_workload import VmWorkload
 
 metrics_desc = """
 VM scheduling metrics used provide statistics information until now.
@@ -73,6 +77,10 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
         self._init_pms()
         # All living VMs.
         self._live_vms: Dict[int, VirtualMachine] = {}
+        # Id of living VMs bucketed by their deletion tick, in allocation order.
+        self._vm_expiry_buckets: Dict[int, List[int]] = defaultdict(list)
+        # Columnar workload of all living and pending VMs.
+        self._vm_workload = VmWorkload()
         # All request payload of the pending decision VMs.
         # NOTE: Need naming suggestestion.
         self._pending_vm_request_payload: Dict[int, VmRequestPayload] = {}
@@ -85,6 +93,12 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
         self._tick: int = 0
         self._pending_action_vm_id: int = 0
 
+        # In batch decision mode, all the VM requests of a tick are decided by one decision event.
+        self._is_batch_decision: bool = self._additional_options.get("batch-decision", False)
+        # Event that collects the VM requests of current tick, only used in batch decision mode.
+        self._batch_request_event: CascadeEvent = None
+        self._pending_action_vm_ids: List[int] = []
+
     @property
     def configs(self) -> dict:
         """dict: Current configuration."""
@@ -156,14 +170,26 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
         """Initialize the physical machines based on the config setting. The PM id starts from 0."""
         # TODO: Improve the scalability. Like the use of multiple PM sets.
         self._machines = self._frame.pms
+        # Capacity index used to find valid PMs quickly, it is kept in sync by the PMs.
+        self._capacity_index = PmCapacityIndex(
+            pm_amount=self._pm_amount,
+            max_cpu_oversubscription_rate=self._max_cpu_oversubscription_rate,
+            max_memory_oversubscription_rate=self._max_memory_oversubscription_rate,
+            max_utilization_rate=self._max_utilization_rate
+        )
         # PM type dictionary.
         self._pm_type_dict: dict = {}
+        # CPU cores capacity and power curve parameters of each PM, used to update PM workload of all PMs.
+        self._pm_cpu_cores_capacities = np.zeros(self._pm_amount, dtype=np.float64)
+        self._pm_power_curves = np.zeros((3, self._pm_amount), dtype=np.float64)
         pm_id = 0
         for pm_type in self._config.PM:
             amount = pm_type["amount"]
             self._pm_type_dict[pm_type["PM_type"]] = pm_type
+            power_curve = pm_type["power_curve"]
             while amount > 0:
                 pm = self._machines[pm_id]
+                pm.set_capacity_index(self._capacity_index)
                 pm.set_init_state(
                     id=pm_id,
                     cpu_cores_capacity=pm_type["CPU"],
@@ -171,6 +197,10 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
                     pm_type=pm_type["PM_type"],
                     oversubscribable=PmState.EMPTY
                 )
+                self._pm_cpu_cores_capacities[pm_id] = pm_type["CPU"]
+                self._pm_power_curves[:, pm_id] = (
+                    power_curve["calibration_parameter"], power_curve["busy_power"], power_curve["idle_power"]
+                )
                 amount -= 1
                 pm_id += 1
 
@@ -194,7 +224,11 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
             pm.reset()
 
         self._live_vms.clear()
+        self._vm_expiry_buckets.clear()
+        self._vm_workload.clear()
         self._pending_vm_request_payload.clear()
+        self._batch_request_event = None
+        self._pending_action_vm_ids = []
 
         self._vm_reader.reset()
         self._vm_item_picker = self._vm_reader.items_tick_picker(self._start_tick, self._max_tick, time_unit="s")
@@ -213,17 +247,23 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
         """
         self._tick = tick
         # All vm's cpu utilization at current tick.
-        cur_tick_cpu_utilization = self._cpu_reader.items(tick=tick)
+        vm_ids, cpu_utilizations = self._cpu_reader.items_block(tick=tick)
 
         # Process finished VMs.
         self._process_finished_vm()
         # Update all live VMs CPU utilization.
-        self._update_vm_workload(cur_tick_cpu_utilization=cur_tick_cpu_utilization)
+        self._update_vm_workload(vm_ids=vm_ids, cpu_utilizations=cpu_utilizations)
         # Update all PM CPU utilization.
         self._update_pm_workload()
 
-        for vm in self._vm_item_picker.items(tick):
-            # TODO: Batch request support.
+        requested_vms = list(self._vm_item_picker.items(tick))
+
+        # Find readings of the requested VMs at current tick.
+        reading_order = np.argsort(vm_ids, kind="stable")
+        requested_vm_ids = np.array([vm.vm_id for vm in requested_vms], dtype=np.int64)
+        reading_indices = np.searchsorted(vm_ids[reading_order], requested_vm_ids).clip(0, max(0, len(vm_ids) - 1))
+
+        for vm, reading_index in zip(requested_vms, reading_indices.tolist()):
             vm_info = VirtualMachine(
                 id=vm.vm_id,
                 cpu_cores_requirement=vm.vm_cpu_cores,
@@ -234,10 +274,15 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
                 category=VmCategory(vm.vm_category)
             )
 
-            if vm.vm_id not in cur_tick_cpu_utilization:
+            if len(vm_ids) == 0 or vm_ids[reading_order[reading_index]] != vm.vm_id:
                 raise Exception(f"The VM id: '{vm.vm_id}' does not exist at this tick.")
 
-            vm_info.add_utilization(cpu_utilization=cur_tick_cpu_utilization[vm.vm_id])
+            self._vm_workload.add_vm(
+                vm_id=vm.vm_id,
+                cpu_cores_requirement=vm.vm_cpu_cores,
+                cpu_utilization=float(cpu_utilizations[reading_order[reading_index]])
+            )
+            vm_info.set_workload(self._vm_workload)
             vm_req_payload: VmRequestPayload = VmRequestPayload(
                 vm_info=vm_info,
                 remaining_buffer_time=self._buffer_time_budget
@@ -251,16 +296,17 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
             self._total_vm_requests += 1
 
     def post_step(self, tick: int):
-        # Update energy to the environment metrices.
-        total_energy: float = 0.0
-        for pm in self._machines:
-            if pm.oversubscribable and pm.cpu_cores_allocated > pm.cpu_cores_capacity:
-                self._total_oversubscriptions += 1
-            total_energy += pm.energy_consumption
-            # Overload PMs.
-            if pm.cpu_utilization > 100:
-                self._overload(pm.id)
-        self._total_energy_consumption += total_energy
+        get_pm_values = self._frame.get_node_attribute_values
+
+        self._total_oversubscriptions += int(np.count_nonzero(
+            (get_pm_values("pms", "oversubscribable") != PmState.EMPTY)
+            & (get_pm_values("pms", "cpu_cores_allocated") > get_pm_values("pms", "cpu_cores_capacity"))
+        ))
+        # Update energy to the environment metrices, summed in PM order.
+        self._total_energy_consumption += sum(get_pm_values("pms", "energy_consumption").tolist())
+        # Overload PMs.
+        for pm_id in np.flatnonzero(get_pm_values("pms", "cpu_utilization") > 100).tolist():
+            self._overload(pm_id)
 
         if (tick + 1) % self._snapshot_resolution == 0:
             # NOTE: We should use frame_index method to get correct index in snapshot list.
@@ -269,11 +315,19 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
         # Stop current episode if we reach max tick.
         return tick + 1 >= self._max_tick
 
+    def close(self):
+        """Stop loading CPU readings in background, and release the files."""
+        self._cpu_reader.close()
+
+        super().close()
+
     def get_event_payload_detail(self) -> dict:
         """dict: Event payload details of current scenario."""
         return {
             Events.REQUEST.name: VmRequestPayload.summary_key,
-            MaroEvents.PENDING_DECISION.name: DecisionPayload.summary_key
+            MaroEvents.PENDING_DECISION.name: (
+                BatchDecisionPayload.summary_key if self._is_batch_decision else DecisionPayload.summary_key
+            )
         }
 
     def get_agent_idx_list(self) -> List[int]:
@@ -317,42 +371,38 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
     def _register_events(self):
         # Register our own events and their callback handlers.
         self._event_buffer.register_event_handler(event_type=Events.REQUEST, handler=self._on_vm_required)
+        self._event_buffer.register_event_handler(event_type=Events.BATCH_REQUEST, handler=self._on_batch_vm_required)
         # Generate decision event.
         self._event_buffer.register_event_handler(event_type=MaroEvents.TAKE_ACTION, handler=self._on_action_received)
 
-    def _update_vm_workload(self, cur_tick_cpu_utilization: dict):
+    def _update_vm_workload(self, vm_ids: np.ndarray, cpu_utilizations: np.ndarray):
         """Update all live VMs CPU utilization.
 
         The length of VMs utilization series could be difference among all VMs,
         because index 0 represents the VM's CPU utilization at the tick it starts.
+        Series of living and pending VMs are updated together in the workload.
         """
-        for live_vm in self._live_vms.values():
-            # NOTE: Some data could be lost. We use -1.0 to represent the missing data.
-            if live_vm.id not in cur_tick_cpu_utilization:
-                live_vm.add_utilization(cpu_utilization=-1.0)
-            else:
-                live_vm.add_utilization(cpu_utilization=cur_tick_cpu_utilization[live_vm.id])
-                live_vm.cpu_utilization = live_vm.get_utilization(cur_tick=self._tick)
-
-        for pending_vm_payload in self._pending_vm_request_payload.values():
-            pending_vm = pending_vm_payload.vm_info
-            if pending_vm.id not in cur_tick_cpu_utilization:
-                pending_vm.add_utilization(cpu_utilization=-1.0)
-            else:
-                pending_vm.add_utilization(cpu_utilization=cur_tick_cpu_utilization[pending_vm.id])
+        # NOTE: Some data could be lost, the missing data is filled with the last utilization by workload.
+        self._vm_workload.update_utilization(cur_tick=self._tick, vm_ids=vm_ids, cpu_utilizations=cpu_utilizations)
 
     def _update_pm_workload(self):
-        """Update CPU utilization occupied by total VMs on each PM."""
-        for pm in self._machines:
-            total_pm_cpu_cores_used: float = 0.0
-            for vm_id in pm.live_vms:
-                vm = self._live_vms[vm_id]
-                total_pm_cpu_cores_used += vm.cpu_utilization * vm.cpu_cores_requirement
-            pm.update_cpu_utilization(vm=None, cpu_utilization=total_pm_cpu_cores_used / pm.cpu_cores_capacity)
-            pm.energy_consumption = self._cpu_utilization_to_energy_consumption(
-                pm_type=self._pm_type_dict[pm.pm_type],
-                cpu_utilization=pm.cpu_utilization
-            )
+        """Update CPU utilization occupied by total VMs on each PM, and energy consumption, for all PMs at once."""
+        cpu_cores_used = self._vm_workload.get_pm_cpu_cores_used(self._pm_amount)
+
+        # Same as PhysicalMachine.update_cpu_utilization, python round is used to keep the same rounding result.
+        cpu_utilization = np.array(
+            [round(value, 2) for value in np.maximum(0, cpu_cores_used / self._pm_cpu_cores_capacities).tolist()]
+        )
+
+        calibration_parameter, busy_power, idle_power = self._pm_power_curves
+        cpu_utilization_rate = np.minimum(1, cpu_utilization / 100)
+
+        energy_consumption = idle_power + (busy_power - idle_power) * (
+            2 * cpu_utilization_rate - np.power(cpu_utilization_rate, calibration_parameter)
+        )
+
+        self._frame.set_node_attribute_values("pms", "cpu_utilization", cpu_utilization)
+        self._frame.set_node_attribute_values("pms", "energy_consumption", energy_consumption)
 
     def _overload(self, pm_id: int):
         """Overload logic.
@@ -368,6 +418,7 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
         if self._kill_all_vms_if_overload:
             for vm_id in vm_ids:
                 self._live_vms.pop(vm_id)
+                self._vm_workload.remove_vm(vm_id)
 
             pm.deallocate_vms(vm_ids=vm_ids)
             self._failed_completion += len(vm_ids)
@@ -408,6 +459,7 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
             # Fail
             # Pop out VM request payload.
             self._pending_vm_request_payload.pop(vm_id)
+            self._vm_workload.remove_vm(vm_id)
             # Add failed allocation.
             self._failed_allocation += 1
 
@@ -439,62 +491,134 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
         return valid_pm_list
 
     def _get_valid_non_oversubscribable_pms(self, vm_cpu_cores_requirement: int, vm_memory_requirement: int) -> list:
-        valid_pm_list = []
-        for pm in self._machines:
-            if pm.oversubscribable == PmState.EMPTY or pm.oversubscribable == PmState.NON_OVERSUBSCRIBABLE:
-                # In the condition of non-oversubscription, the valid PMs mean:
-                # PM allocated resource + VM allocated resource <= PM capacity.
-                if (pm.cpu_cores_allocated + vm_cpu_cores_requirement <= pm.cpu_cores_capacity
-                        and pm.memory_allocated + vm_memory_requirement <= pm.memory_capacity):
-                    valid_pm_list.append(pm.id)
-
-        return valid_pm_list
+        return self._capacity_index.get_valid_pms(
+            is_oversubscribable=False,
+            vm_cpu_cores_requirement=vm_cpu_cores_requirement,
+            vm_memory_requirement=vm_memory_requirement,
+            is_valid_pm=lambda pm_id: self._is_valid_non_oversubscribable_pm(
+                self._machines[pm_id], vm_cpu_cores_requirement, vm_memory_requirement
+            )
+        )
 
     def _get_valid_oversubscribable_pms(self, vm_cpu_cores_requirement: int, vm_memory_requirement: int) -> List[int]:
-        valid_pm_list = []
-        for pm in self._machines:
-            if pm.oversubscribable == PmState.EMPTY or pm.oversubscribable == PmState.OVERSUBSCRIBABLE:
-                # In the condition of oversubscription, the valid PMs mean:
-                # 1. PM allocated resource + VM allocated resource <= Max oversubscription rate * PM capacity.
-                # 2. PM CPU usage + VM requirements <= Max utilization rate * PM capacity.
-                if (
-                    (
-                        pm.cpu_cores_allocated + vm_cpu_cores_requirement
-                        <= self._max_cpu_oversubscription_rate * pm.cpu_cores_capacity
-                    ) and (
-                        pm.memory_allocated + vm_memory_requirement
-                        <= self._max_memory_oversubscription_rate * pm.memory_capacity
-                    ) and (
-                        pm.cpu_utilization / 100 * pm.cpu_cores_capacity + vm_cpu_cores_requirement
-                        <= self._max_utilization_rate * pm.cpu_cores_capacity
-                    )
-                ):
-                    valid_pm_list.append(pm.id)
+        return self._capacity_index.get_valid_pms(
+            is_oversubscribable=True,
+            vm_cpu_cores_requirement=vm_cpu_cores_requirement,
+            vm_memory_requirement=vm_memory_requirement,
+            is_valid_pm=lambda pm_id: self._is_valid_oversubscribable_pm(
+                self._machines[pm_id], vm_cpu_cores_requirement, vm_memory_requirement
+            )
+        )
 
-        return valid_pm_list
+    def _is_valid_non_oversubscribable_pm(
+        self, pm: PhysicalMachine, vm_cpu_cores_requirement: int, vm_memory_requirement: int
+    ) -> bool:
+        if pm.oversubscribable == PmState.EMPTY or pm.oversubscribable == PmState.NON_OVERSUBSCRIBABLE:
+            # In the condition of non-oversubscription, the valid PMs mean:
+            # PM allocated resource + VM allocated resource <= PM capacity.
+            return (
+                pm.cpu_cores_allocated + vm_cpu_cores_requirement <= pm.cpu_cores_capacity
+                and pm.memory_allocated + vm_memory_requirement <= pm.memory_capacity
+            )
+
+        return False
+
+    def _is_valid_oversubscribable_pm(
+        self, pm: PhysicalMachine, vm_cpu_cores_requirement: int, vm_memory_requirement: int
+    ) -> bool:
+        if pm.oversubscribable == PmState.EMPTY or pm.oversubscribable == PmState.OVERSUBSCRIBABLE:
+            # In the condition of oversubscription, the valid PMs mean:
+            # 1. PM allocated resource + VM allocated resource <= Max oversubscription rate * PM capacity.
+            # 2. PM CPU usage + VM requirements <= Max utilization rate * PM capacity.
+            return (
+                (
+                    pm.cpu_cores_allocated + vm_cpu_cores_requirement
+                    <= self._max_cpu_oversubscription_rate * pm.cpu_cores_capacity
+                ) and (
+                    pm.memory_allocated + vm_memory_requirement
+                    <= self._max_memory_oversubscription_rate * pm.memory_capacity
+                ) and (
+                    pm.cpu_utilization / 100 * pm.cpu_cores_capacity + vm_cpu_cores_requirement
+                    <= self._max_utilization_rate * pm.cpu_cores_capacity
+                )
+            )
+
+        return False
+
+    def _is_valid_pm(self, pm: PhysicalMachine, vm: VirtualMachine) -> bool:
+        """Check if the PM can hold the VM with current PM states."""
+        if vm.category == VmCategory.INTERACTIVE or vm.category == VmCategory.UNKNOWN:
+            return self._is_valid_non_oversubscribable_pm(pm, vm.cpu_cores_requirement, vm.memory_requirement)
+
+        return self._is_valid_oversubscribable_pm(pm, vm.cpu_cores_requirement, vm.memory_requirement)
+
+    def _get_valid_pm_mask(self, vms: List[VirtualMachine]) -> np.ndarray:
+        """Check all PMs for all the VMs at once, result is a bool matrix with shape (VM number, PM number)."""
+        get_pm_values = self._frame.get_node_attribute_values
+
+        state = get_pm_values("pms", "oversubscribable")
+        cpu_cores_capacity = get_pm_values("pms", "cpu_cores_capacity")
+        memory_capacity = get_pm_values("pms", "memory_capacity")
+        cpu_cores_allocated = get_pm_values("pms", "cpu_cores_allocated")
+        memory_allocated = get_pm_values("pms", "memory_allocated")
+        cpu_utilization = get_pm_values("pms", "cpu_utilization")
+
+        vm_cpu_cores_requirements = np.array([vm.cpu_cores_requirement for vm in vms]).reshape(-1, 1)
+        vm_memory_requirements = np.array([vm.memory_requirement for vm in vms]).reshape(-1, 1)
+        is_oversubscribable_vm = np.array([vm.category == VmCategory.DELAY_INSENSITIVE for vm in vms]).reshape(-1, 1)
+
+        # Same conditions as checking each PM for each VM.
+        non_oversubscribable_mask = (
+            ((state == PmState.EMPTY) | (state == PmState.NON_OVERSUBSCRIBABLE))
+            & (cpu_cores_allocated + vm_cpu_cores_requirements <= cpu_cores_capacity)
+            & (memory_allocated + vm_memory_requirements <= memory_capacity)
+        )
+        oversubscribable_mask = (
+            ((state == PmState.EMPTY) | (state == PmState.OVERSUBSCRIBABLE))
+            & (
+                cpu_cores_allocated + vm_cpu_cores_requirements
+                <= self._max_cpu_oversubscription_rate * cpu_cores_capacity
+            ) & (
+                memory_allocated + vm_memory_requirements
+                <= self._max_memory_oversubscription_rate * memory_capacity
+            ) & (
+                cpu_utilization / 100 * cpu_cores_capacity + vm_cpu_cores_requirements
+                <= self._max_utilization_rate * cpu_cores_capacity
+            )
+        )
+
+        return np.where(is_oversubscribable_vm, oversubscribable_mask, non_oversubscribable_mask)
 
     def _process_finished_vm(self):
         """Release PM resource from the finished VM."""
-        # Get the VM info.
-        vm_id_list = []
-        for vm in self._live_vms.values():
-            if vm.deletion_tick == self._tick:
-                # Release PM resources.
-                pm: PhysicalMachine = self._machines[vm.pm_id]
-                pm.cpu_cores_allocated -= vm.cpu_cores_requirement
-                pm.memory_allocated -= vm.memory_requirement
-                pm.deallocate_vms(vm_ids=[vm.id])
-                # If the VM list is empty, switch the state to empty.
-                if not pm.live_vms:
-                    pm.oversubscribable = PmState.EMPTY
-
-                vm_id_list.append(vm.id)
-                # VM completed task succeed.
-                self._successful_completion += 1
+        # Only VMs that expire at current tick, the ones killed by overload have been removed from live VMs.
+        finished_vms: List[VirtualMachine] = [
+            self._live_vms[vm_id] for vm_id in self._vm_expiry_buckets.pop(self._tick, []) if vm_id in self._live_vms
+        ]
+
+        # Group finished VMs by PM, to release PM resources in bulk.
+        pm_finished_vms: Dict[int, List[VirtualMachine]] = defaultdict(list)
+
+        for vm in finished_vms:
+            pm_finished_vms[vm.pm_id].append(vm)
+
+        for pm_id, vms in pm_finished_vms.items():
+            # Release PM resources.
+            pm: PhysicalMachine = self._machines[pm_id]
+            pm.cpu_cores_allocated -= sum(vm.cpu_cores_requirement for vm in vms)
+            pm.memory_allocated -= sum(vm.memory_requirement for vm in vms)
+            pm.deallocate_vms(vm_ids=[vm.id for vm in vms])
+            # If the VM list is empty, switch the state to empty.
+            if not pm.live_vms:
+                pm.oversubscribable = PmState.EMPTY
 
         # Remove dead VM.
-        for vm_id in vm_id_list:
-            self._live_vms.pop(vm_id)
+        for vm in finished_vms:
+            self._live_vms.pop(vm.id)
+            self._vm_workload.remove_vm(vm.id)
+
+        # VM completed task succeed.
+        self._successful_completion += len(finished_vms)
 
     def _on_vm_required(self, vm_request_event: CascadeEvent):
         """Callback when there is a VM request generated."""
@@ -505,6 +629,21 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
         remaining_buffer_time: int = payload.remaining_buffer_time
         # Store the payload inside business engine.
         self._pending_vm_request_payload[vm_info.id] = payload
+
+        if self._is_batch_decision:
+            # Collect the requests, they will be decided together after all the requests of current tick.
+            if self._batch_request_event is None:
+                self._batch_request_event = self._event_buffer.gen_cascade_event(
+                    tick=vm_request_event.tick,
+                    event_type=Events.BATCH_REQUEST,
+                    payload=[]
+                )
+                self._event_buffer.insert_event(event=self._batch_request_event)
+
+            self._batch_request_event.payload.append(vm_info.id)
+
+            return
+
         # Get valid pm list.
         valid_pm_list = self._get_valid_pms(
             vm_cpu_cores_requirement=vm_info.cpu_cores_requirement,
@@ -534,11 +673,55 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
                 remaining_buffer_time=remaining_buffer_time
             )
 
+    def _on_batch_vm_required(self, batch_request_event: CascadeEvent):
+        """Callback when all the VM requests of current tick are received, only used in batch decision mode."""
+        self._batch_request_event = None
+
+        payloads: List[VmRequestPayload] = [
+            self._pending_vm_request_payload[vm_id] for vm_id in batch_request_event.payload
+        ]
+        valid_pm_mask = self._get_valid_pm_mask([payload.vm_info for payload in payloads])
+        has_valid_pm = valid_pm_mask.any(axis=1)
+
+        for payload, is_valid in zip(payloads, has_valid_pm.tolist()):
+            if not is_valid:
+                # Either postpone the requirement event or failed.
+                self._postpone_vm_request(
+                    postpone_type=PostponeType.Resource,
+                    vm_id=payload.vm_info.id,
+                    remaining_buffer_time=payload.remaining_buffer_time
+                )
+
+        payloads = [payload for payload, is_valid in zip(payloads, has_valid_pm.tolist()) if is_valid]
+
+        if len(payloads) == 0:
+            return
+
+        # Generate pending decision with requests as columns.
+        decision_payload = BatchDecisionPayload(
+            frame_index=self.frame_index(tick=self._tick),
+            vm_ids=np.array([payload.vm_info.id for payload in payloads]),
+            vm_cpu_cores_requirements=np.array([payload.vm_info.cpu_cores_requirement for payload in payloads]),
+            vm_memory_requirements=np.array([payload.vm_info.memory_requirement for payload in payloads]),
+            remaining_buffer_times=np.array([payload.remaining_buffer_time for payload in payloads]),
+            valid_pm_mask=valid_pm_mask[has_valid_pm]
+        )
+        self._pending_action_vm_ids = [payload.vm_info.id for payload in payloads]
+        pending_decision_event = self._event_buffer.gen_decision_event(
+            tick=batch_request_event.tick, payload=decision_payload)
+        batch_request_event.add_immediate_event(event=pending_decision_event)
+
     def _on_action_received(self, event: CascadeEvent):
         """Callback wen we get an action from agent."""
+        if self._is_batch_decision:
+            self._on_batch_action_received(event)
+
+            return
+
         action = None
         if event is None or event.payload is None:
             self._pending_vm_request_payload.pop(self._pending_action_vm_id)
+            self._vm_workload.remove_vm(self._pending_action_vm_id)
             return
 
         cur_tick: int = event.tick
@@ -550,44 +733,9 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
                 raise Exception(f"The VM id: '{vm_id}' sent by agent is invalid.")
 
             if type(action) == AllocateAction:
-                pm_id = action.pm_id
-                vm: VirtualMachine = self._pending_vm_request_payload[vm_id].vm_info
-                lifetime = vm.lifetime
-
-                # Update VM information.
-                vm.pm_id = pm_id
-                vm.creation_tick = cur_tick
-                vm.deletion_tick = cur_tick + lifetime
-                vm.cpu_utilization = vm.get_utilization(cur_tick=cur_tick)
-
-                # Pop out the VM from pending requests and add to live VM dict.
-                self._pending_vm_request_payload.pop(vm_id)
-                self._live_vms[vm_id] = vm
-
-                # Update PM resources requested by VM.
-                pm = self._machines[pm_id]
-
-                # Empty pm (init state).
-                if pm.oversubscribable == PmState.EMPTY:
-                    # Delay-Insensitive: oversubscribable.
-                    if vm.category == VmCategory.DELAY_INSENSITIVE:
-                        pm.oversubscribable = PmState.OVERSUBSCRIBABLE
-                    # Interactive or Unknown: non-oversubscribable
-                    else:
-                        pm.oversubscribable = PmState.NON_OVERSUBSCRIBABLE
-
-                pm.allocate_vms(vm_ids=[vm.id])
-                pm.cpu_cores_allocated += vm.cpu_cores_requirement
-                pm.memory_allocated += vm.memory_requirement
-                pm.update_cpu_utilization(
-                    vm=vm,
-                    cpu_utilization=None
-                )
-                pm.energy_consumption = self._cpu_utilization_to_energy_consumption(
-                    pm_type=self._pm_type_dict[pm.pm_type],
-                    cpu_utilization=pm.cpu_utilization
+                self._allocate_vm(
+                    vm=self._pending_vm_request_payload[vm_id].vm_info, pm_id=action.pm_id, cur_tick=cur_tick
                 )
-                self._successful_allocation += 1
             elif type(action) == PostponeAction:
                 postpone_step = action.postpone_step
                 remaining_buffer_time = self._pending_vm_request_payload[vm_id].remaining_buffer_time
@@ -598,6 +746,101 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
                     remaining_buffer_time=remaining_buffer_time - postpone_step * self._delay_duration
                 )
 
+    def _on_batch_action_received(self, event: CascadeEvent):
+        """Apply the actions of a batch decision.
+
+        Valid PMs of the decision are checked before any allocation, so each allocation is checked again with
+        current PM states, the VM is postponed as resource exhaustion if the PM cannot hold it anymore.
+        VMs without action are dropped, same as no action in sequential mode.
+        All the actions are validated before applying any of them, so states are not changed by an invalid list.
+        """
+        actions = [] if event is None or event.payload is None else event.payload
+        cur_tick: int = self._tick if event is None else event.tick
+
+        pending_vm_ids = set(self._pending_action_vm_ids)
+
+        for action in actions:
+            vm_id: int = action.vm_id
+
+            # Each VM of the decision can only take one action.
+            if vm_id not in pending_vm_ids:
+                raise Exception(f"The VM id: '{vm_id}' sent by agent is invalid.")
+
+            if type(action) == AllocateAction and not 0 <= action.pm_id < self._pm_amount:
+                raise Exception(f"The PM id: '{action.pm_id}' sent by agent is invalid.")
+
+            pending_vm_ids.remove(vm_id)
+
+        for action in actions:
+            vm_id: int = action.vm_id
+            payload = self._pending_vm_request_payload[vm_id]
+
+            if type(action) == AllocateAction:
+                if self._is_valid_pm(self._machines[action.pm_id], payload.vm_info):
+                    self._allocate_vm(vm=payload.vm_info, pm_id=action.pm_id, cur_tick=cur_tick)
+                else:
+                    # Either postpone the requirement event or failed.
+                    self._postpone_vm_request(
+                        postpone_type=PostponeType.Resource,
+                        vm_id=vm_id,
+                        remaining_buffer_time=payload.remaining_buffer_time
+                    )
+            elif type(action) == PostponeAction:
+                # Either postpone the requirement event or failed.
+                self._postpone_vm_request(
+                    postpone_type=PostponeType.Agent,
+                    vm_id=vm_id,
+                    remaining_buffer_time=payload.remaining_buffer_time - action.postpone_step * self._delay_duration
+                )
+
+        for vm_id in self._pending_action_vm_ids:
+            if vm_id in pending_vm_ids:
+                self._pending_vm_request_payload.pop(vm_id)
+                self._vm_workload.remove_vm(vm_id)
+
+        self._pending_action_vm_ids = []
+
+    def _allocate_vm(self, vm: VirtualMachine, pm_id: int, cur_tick: int):
+        """Allocate a pending VM to the PM."""
+        vm_id = vm.id
+        lifetime = vm.lifetime
+
+        # Update VM information.
+        vm.pm_id = pm_id
+        vm.creation_tick = cur_tick
+        vm.deletion_tick = cur_tick + lifetime
+        self._vm_workload.allocate_vm(vm_id=vm_id, pm_id=pm_id, creation_tick=cur_tick)
+
+        # Pop out the VM from pending requests and add to live VM dict.
+        self._pending_vm_request_payload.pop(vm_id)
+        self._live_vms[vm_id] = vm
+        self._vm_expiry_buckets[vm.deletion_tick].append(vm_id)
+
+        # Update PM resources requested by VM.
+        pm = self._machines[pm_id]
+
+        # Empty pm (init state).
+        if pm.oversubscribable == PmState.EMPTY:
+            # Delay-Insensitive: oversubscribable.
+            if vm.category == VmCategory.DELAY_INSENSITIVE:
+                pm.oversubscribable = PmState.OVERSUBSCRIBABLE
+            # Interactive or Unknown: non-oversubscribable
+            else:
+                pm.oversubscribable = PmState.NON_OVERSUBSCRIBABLE
+
+        pm.allocate_vms(vm_ids=[vm.id])
+        pm.cpu_cores_allocated += vm.cpu_cores_requirement
+        pm.memory_allocated += vm.memory_requirement
+        pm.update_cpu_utilization(
+            vm=vm,
+            cpu_utilization=None
+        )
+        pm.energy_consumption = self._cpu_utilization_to_energy_consumption(
+            pm_type=self._pm_type_dict[pm.pm_type],
+            cpu_utilization=pm.cpu_utilization
+        )
+        self._successful_allocation += 1
+
     def _download_processed_data(self):
         """Build processed data."""
         data_root = StaticParameter.data_root
@@ -0,0 +1,244 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from typing import Callable, List, Set
+
+import numpy as np
+
+from .enums import PmState
+
+# Tolerance used to compare the float capacity keys, PMs inside the tolerance band will be checked
+# with the exact validation function, so the result is same as checking each PM.
+EPSILON = 1e-3
+
+# Capacity keys of non-oversubscribable PMs: free cores, free memory.
+NON_OVERSUBSCRIBABLE_KEYS = (0, 1)
+# Capacity keys of oversubscribable PMs: free cores, free memory, free cpu utilization (in cores).
+OVERSUBSCRIBABLE_KEYS = (2, 3, 4)
+
+# Capacity keys that need to be updated when a PM attribute changed.
+attribute_keys = {
+    "cpu_cores_capacity": (0, 2, 4),
+    "memory_capacity": (1, 3),
+    "cpu_cores_allocated": (0, 2),
+    "memory_allocated": (1, 3),
+    "cpu_utilization": (4,),
+    "oversubscribable": (0, 1, 2, 3, 4)
+}
+
+
+class PmCapacityIndex:
+    """Capacity index of PMs, used to find valid PMs for a VM request without checking all the PMs.
+
+    It keeps a min and max segment tree over PM id for each capacity key, a query will skip the sub-trees
+    that cannot fit the request, and take the sub-trees that all the PMs can fit the request as a whole.
+    PM attributes are recorded with update, capacity keys and segment trees are updated lazily on next query,
+    trees will be rebuilt in batch if too many PMs changed, like updating cpu utilization for all PMs per tick.
+
+    Args:
+        pm_amount (int): Number of PMs.
+        max_cpu_oversubscription_rate (float): Max CPU oversubscription rate.
+        max_memory_oversubscription_rate (float): Max memory oversubscription rate.
+        max_utilization_rate (float): Max CPU utilization rate.
+    """
+
+    def __init__(
+        self, pm_amount: int, max_cpu_oversubscription_rate: float,
+        max_memory_oversubscription_rate: float, max_utilization_rate: float
+    ):
+        self._pm_amount = pm_amount
+        self._max_cpu_oversubscription_rate = max_cpu_oversubscription_rate
+        self._max_memory_oversubscription_rate = max_memory_oversubscription_rate
+        self._max_utilization_rate = max_utilization_rate
+
+        # PM attributes used to calculate capacity keys.
+        self._attributes = {name: np.zeros(pm_amount, dtype=np.float64) for name in attribute_keys}
+
+        # Leaf number of segment tree, node 1 is the root, leaves start from this size.
+        self._size = 1 << max(0, (pm_amount - 1).bit_length())
+
+        # Rebuild whole tree if changed PMs more than this, as point update costs log(size) each.
+        self._rebuild_threshold = max(1, pm_amount // max(1, self._size.bit_length()))
+
+        key_number = len(NON_OVERSUBSCRIBABLE_KEYS) + len(OVERSUBSCRIBABLE_KEYS)
+
+        self._max_trees: List[list] = [[] for _ in range(key_number)]
+        self._min_trees: List[list] = [[] for _ in range(key_number)]
+
+        # PMs that capacity key changed, for each key.
+        self._dirty_pms: List[Set[int]] = [set() for _ in range(key_number)]
+
+        for key in range(key_number):
+            self._build_tree(key)
+
+    def update(self, pm_id: int, name: str, value: float):
+        """Record the changed attribute of a PM.
+
+        Args:
+            pm_id (int): Id of the PM.
+            name (str): Attribute name, should be one of cpu_cores_capacity, memory_capacity, cpu_cores_allocated,
+                memory_allocated, cpu_utilization and oversubscribable.
+            value (float): New attribute value.
+        """
+        self._attributes[name][pm_id] = value
+
+        for key in attribute_keys[name]:
+            self._dirty_pms[key].add(pm_id)
+
+    def get_valid_pms(
+        self, is_oversubscribable: bool, vm_cpu_cores_requirement: int, vm_memory_requirement: int,
+        is_valid_pm: Callable[[int], bool]
+    ) -> List[int]:
+        """Get the PMs that can hold the VM.
+
+        Args:
+            is_oversubscribable (bool): Is looking for oversubscribable PMs or non-oversubscribable PMs.
+            vm_cpu_cores_requirement (int): The CPU cores requested by the VM.
+            vm_memory_requirement (int): The memory requested by the VM.
+            is_valid_pm (Callable[[int], bool]): Function to check if a PM is valid exactly with PM id,
+                only used for the PMs that their capacity is too close to the requirement.
+
+        Returns:
+            List[int]: Valid PM id list, in ascending order.
+        """
+        if is_oversubscribable:
+            keys = OVERSUBSCRIBABLE_KEYS
+            requirements = (vm_cpu_cores_requirement, vm_memory_requirement, vm_cpu_cores_requirement)
+        else:
+            keys = NON_OVERSUBSCRIBABLE_KEYS
+            requirements = (vm_cpu_cores_requirement, vm_memory_requirement)
+
+        trees = []
+
+        for key, requirement in zip(keys, requirements):
+            self._sync_tree(key)
+
+            trees.append((self._max_trees[key], self._min_trees[key], requirement))
+
+        size = self._size
+        valid_pm_list = []
+
+        # Depth first from left to right, so the PM id will be ascending.
+        node_stack = [1]
+
+        while node_stack:
+            node = node_stack.pop()
+
+            is_all_valid = True
+            is_all_invalid = False
+
+            for max_tree, min_tree, requirement in trees:
+                if max_tree[node] < requirement - EPSILON:
+                    is_all_invalid = True
+                    break
+
+                if min_tree[node] < requirement + EPSILON:
+                    is_all_valid = False
+
+            if is_all_invalid:
+                continue
+
+            if is_all_valid:
+                level = node.bit_length() - 1
+                span = size >> level
+                start = (node - (1 << level)) * span
+
+                valid_pm_list.extend(range(start, min(start + span, self._pm_amount)))
+            elif node >= size:
+                if is_valid_pm(node - size):
+                    valid_pm_list.append(node - size)
+            else:
+                node_stack.append(2 * node + 1)
+                node_stack.append(2 * node)
+
+        return valid_pm_list
+
+    def _calc_keys(self, key: int, pm_ids: np.ndarray) -> np.ndarray:
+        """Calculate the capacity key values of specified PMs, -inf means the PM cannot hold this kind of VM."""
+        attributes = self._attributes
+        state = attributes["oversubscribable"][pm_ids]
+        cpu_cores_capacity = attributes["cpu_cores_capacity"][pm_ids]
+
+        if key in NON_OVERSUBSCRIBABLE_KEYS:
+            is_available = (state == PmState.EMPTY) | (state == PmState.NON_OVERSUBSCRIBABLE)
+
+            if key == 0:
+                values = cpu_cores_capacity - attributes["cpu_cores_allocated"][pm_ids]
+            else:
+                values = attributes["memory_capacity"][pm_ids] - attributes["memory_allocated"][pm_ids]
+        else:
+            is_available = (state == PmState.EMPTY) | (state == PmState.OVERSUBSCRIBABLE)
+
+            if key == 2:
+                values = (
+                    self._max_cpu_oversubscription_rate * cpu_cores_capacity
+                    - attributes["cpu_cores_allocated"][pm_ids]
+                )
+            elif key == 3:
+                values = (
+                    self._max_memory_oversubscription_rate * attributes["memory_capacity"][pm_ids]
+                    - attributes["memory_allocated"][pm_ids]
+                )
+            else:
+                values = (
+                    self._max_utilization_rate * cpu_cores_capacity
+                    - attributes["cpu_utilization"][pm_ids] / 100 * cpu_cores_capacity
+                )
+
+        return np.where(is_available, values, -np.inf)
+
+    def _build_tree(self, key: int):
+        """Build the min and max tree of a key from all the PMs."""
+        size = self._size
+        max_tree = np.full(2 * size, -np.inf)
+        min_tree = np.full(2 * size, -np.inf)
+
+        values = self._calc_keys(key, np.arange(self._pm_amount))
+
+        max_tree[size: size + self._pm_amount] = values
+        min_tree[size: size + self._pm_amount] = values
+
+        # Nodes [start, 2 * start) are the parents of nodes [2 * start, 4 * start).
+        start = size // 2
+
+        while start >= 1:
+            left = slice(2 * start, 4 * start, 2)
+            right = slice(2 * start + 1, 4 * start, 2)
+
+            max_tree[start: 2 * start] = np.maximum(max_tree[left], max_tree[right])
+            min_tree[start: 2 * start] = np.minimum(min_tree[left], min_tree[right])
+
+            start //= 2
+
+        # Python list is faster than numpy array for accessing items one by one.
+        self._max_trees[key] = max_tree.tolist()
+        self._min_trees[key] = min_tree.tolist()
+
+    def _sync_tree(self, key: int):
+        """Update the trees of a key with the changed PMs."""
+        dirty_pms = self._dirty_pms[key]
+
+        if len(dirty_pms) == 0:
+            return
+
+        if len(dirty_pms) > self._rebuild_threshold:
+            self._build_tree(key)
+        else:
+            pm_ids = sorted(dirty_pms)
+            max_tree = self._max_trees[key]
+            min_tree = self._min_trees[key]
+
+            for pm_id, value in zip(pm_ids, self._calc_keys(key, np.array(pm_ids)).tolist()):
+                node = self._size + pm_id
+                max_tree[node] = value
+                min_tree[node] = value
+
+                node //= 2
+
+                while node >= 1:
+                    max_tree[node] = max(max_tree[2 * node], max_tree[2 * node + 1])
+                    min_tree[node] = min(min_tree[2 * node], min_tree[2 * node + 1])
+
+                    node //= 2
+
+        dirty_pms.clear()
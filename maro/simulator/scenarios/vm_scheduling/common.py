@@ -3,6 +3,8 @@
 
 from typing import List
 
+import numpy as np
+
 from .virtual_machine import VirtualMachine
 
 
@@ -87,6 +89,47 @@ class DecisionPayload:
         self.remaining_buffer_time = remaining_buffer_time
 
 
+class BatchDecisionPayload:
+    """Decision event in batch decision mode, that contains all the VM requests of current tick.
+
+    Requests are stored as columns, the i-th item of each array belongs to the i-th VM.
+
+    Args:
+        frame_index (int): The current frame index (converted by tick).
+        vm_ids (np.ndarray): The id of the VMs.
+        vm_cpu_cores_requirements (np.ndarray): The CPU requested by VMs.
+        vm_memory_requirements (np.ndarray): The memory requested by VMs.
+        remaining_buffer_times (np.ndarray): The remaining buffer time of VMs.
+        valid_pm_mask (np.ndarray): A bool matrix with shape (VM number, PM number), True means the PM is valid
+            for the VM before any allocation of this decision.
+    """
+    summary_key = [
+        "frame_index", "vm_ids", "vm_cpu_cores_requirements", "vm_memory_requirements", "remaining_buffer_times",
+        "valid_pm_mask"
+    ]
+
+    def __init__(
+        self,
+        frame_index: int,
+        vm_ids: np.ndarray,
+        vm_cpu_cores_requirements: np.ndarray,
+        vm_memory_requirements: np.ndarray,
+        remaining_buffer_times: np.ndarray,
+        valid_pm_mask: np.ndarray
+    ):
+        self.frame_index = frame_index
+        self.vm_ids = vm_ids
+        self.vm_cpu_cores_requirements = vm_cpu_cores_requirements
+        self.vm_memory_requirements = vm_memory_requirements
+        self.remaining_buffer_times = remaining_buffer_times
+        self.valid_pm_mask = valid_pm_mask
+
+    @property
+    def valid_pms(self) -> List[List[int]]:
+        """List[List[int]]: Valid PM id list of each VM."""
+        return [np.flatnonzero(mask).tolist() for mask in self.valid_pm_mask]
+
+
 class Latency:
     """Accumulative latency.
 
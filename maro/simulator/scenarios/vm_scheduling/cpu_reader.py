@@ -1,76 +1,207 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import copy
 import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Tuple
 
-from maro.data_lib.binary_reader import BinaryReader
+import numpy as np
+
+from maro.data_lib.binary_reader import BinaryReader, ItemTickBlockPicker
 
 
 class CpuReader:
-    """A wrapper class for the BinaryReader."""
-    def __init__(self, data_path: str, start_tick: int):
-        # Use for re-initialization.
-        self._data_path = data_path
-        self._cpu_reader = BinaryReader(self._data_path)
-        self._cpu_item_picker = self._cpu_reader.items_tick_picker(
-            start_time_offset=self._cpu_reader.header.starttime,
-            end_time_offset=self._cpu_reader.header.endtime,
-            time_unit="s"
-        )
-        while start_tick > self._cpu_reader.header.endtime:
-            self._switch()
-
-        self._init_data_path = self._data_path
-
-    def _switch_to_next_file_name(self, data_path) -> str:
-        """Switch to next file name."""
-        file_name = data_path.split("-")
-        file_name[2] = str(int(file_name[2]) + 1)
-        new_data_path = "-".join(file_name)
-
-        return new_data_path
-
-    def _switch(self):
-        """Switch to a new binary reader."""
-        self._data_path = self._switch_to_next_file_name(self._data_path)
-        self._cpu_reader = BinaryReader(self._data_path)
-        self._cpu_item_picker = self._cpu_reader.items_tick_picker(
-            start_time_offset=0,
-            end_time_offset=self._cpu_reader.header.endtime - self._cpu_reader.header.starttime,
-            time_unit="s"
-        )
-
-    def _pick_up_items(self, cur_items: dict, tick: int):
-        end_time = 0
-        for cpu in self._cpu_item_picker.items(tick=tick - self._cpu_reader.header.starttime):
-            cur_items[cpu.vm_id] = cpu.cpu_utilization
-            end_time = cpu.timestamp
-
-        return cur_items, end_time
-
-    def items(self, tick: int):
-        cur_items = {}
-        cur_items, end_time = self._pick_up_items(cur_items, tick)
-        # The most end tick is 8638.
-        if end_time == 8638:
-            return cur_items
-        # If the current tick is the end tick of the file, then switch to next file.
-        while end_time == self._cpu_reader.header.endtime:
-            new_file = os.path.expanduser(self._switch_to_next_file_name(self._data_path))
-            if not os.path.exists(new_file):
-                break
-            self._switch()
-            # Check the start tick of the new file is same as the end tick of the last file.
-            if self._cpu_reader.header.starttime == end_time:
-                cur_items, _ = self._pick_up_items(cur_items, tick)
-
-        return cur_items
+    """A wrapper class for the BinaryReader, that reads CPU readings split into several binary files.
+
+    The binary files in the same folder with the same meta as the specified one are the files of readings,
+    they are ordered and stitched by the start and end time in their headers, starting from the specified one.
+    Readings of a tick are returned as column arrays, and the next file is opened and loaded in background.
+    The background thread is started when a file is to load, and stopped once the last file is loaded.
+
+    Args:
+        data_path (str): Path of the first binary file of readings.
+        start_tick (int): Tick to start reading.
+        prefetch (bool): If open and load the next file in a background thread.
+    """
+    def __init__(self, data_path: str, start_tick: int, prefetch: bool = True):
+        if data_path.startswith("~"):
+            data_path = os.path.expanduser(data_path)
+
+        self._start_tick = start_tick
+        self._file_ranges: List[Tuple[int, int, str]] = self._find_files(data_path)
+
+        self._prefetch = prefetch
+        self._executor: ThreadPoolExecutor = None
+        # Readers of the files that opened or being opened, key is the index of file.
+        self._readers: Dict[int, Future] = {}
+
+        self.reset()
+
+    def items(self, tick: int) -> dict:
+        """Get the CPU utilization of VMs at specified tick.
+
+        Args:
+            tick (int): Tick to read.
+
+        Returns:
+            dict: VM id to CPU utilization.
+        """
+        vm_ids, cpu_utilizations = self.items_block(tick)
+
+        return dict(zip(vm_ids.tolist(), cpu_utilizations.tolist()))
+
+    def items_block(self, tick: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the CPU utilization of VMs at specified tick as aligned arrays.
+
+        NOTE:
+            Ticks should be read in increasing order, the files before current tick are released.
+            If a VM has readings in several files at the tick, the one in the later file is used.
+
+        Args:
+            tick (int): Tick to read.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Id of VMs, and their CPU utilization.
+        """
+        # Release the files that end before current tick.
+        while self._file_index < len(self._file_ranges) and self._file_ranges[self._file_index][1] < tick:
+            self._release_reader(self._file_index)
+
+            self._file_index += 1
+
+        vm_id_blocks = []
+        cpu_utilization_blocks = []
+
+        index = self._file_index
+
+        while index < len(self._file_ranges) and self._file_ranges[index][0] <= tick:
+            reader, picker = self._get_reader(index)
+
+            if tick <= reader.header.endtime:
+                items = picker.items(tick - reader.header.starttime)
+
+                if len(items.vm_id) > 0:
+                    vm_id_blocks.append(items.vm_id)
+                    cpu_utilization_blocks.append(items.cpu_utilization)
+
+            index += 1
+
+        if self._prefetch and index < len(self._file_ranges):
+            # Load the next file while current one is being read.
+            self._get_reader(index, wait=False)
+
+        if len(vm_id_blocks) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        if len(vm_id_blocks) == 1:
+            return vm_id_blocks[0], cpu_utilization_blocks[0]
+
+        # Stitch the readings from files that overlap at current tick, later readings of a VM take place.
+        vm_ids = np.concatenate(vm_id_blocks)
+        cpu_utilizations = np.concatenate(cpu_utilization_blocks)
+
+        _, reversed_indices = np.unique(vm_ids[::-1], return_index=True)
+        indices = np.sort(len(vm_ids) - 1 - reversed_indices)
+
+        return vm_ids[indices], cpu_utilizations[indices]
 
     def reset(self):
-        self._data_path = self._init_data_path
-        self._cpu_reader = BinaryReader(self._data_path)
-        self._cpu_item_picker = self._cpu_reader.items_tick_picker(
-            start_time_offset=self._cpu_reader.header.starttime,
-            end_time_offset=self._cpu_reader.header.endtime,
-            time_unit="s"
-        )
+        for index in list(self._readers.keys()):
+            self._release_reader(index)
+
+        # Skip the files that end before start tick.
+        self._file_index = 0
+
+        while self._file_index < len(self._file_ranges) and self._file_ranges[self._file_index][1] < self._start_tick:
+            self._file_index += 1
+
+        if self._prefetch and self._file_index < len(self._file_ranges):
+            self._get_reader(self._file_index, wait=False)
+
+    def close(self):
+        """Release all the files, and stop the background thread."""
+        for index in list(self._readers.keys()):
+            self._release_reader(index)
+
+        self._shutdown_executor()
+
+    def __deepcopy__(self, memo: dict):
+        """Readers are read-only, so the copy shares the opened ones, and prefetches with its own executor."""
+        cpu_reader = copy.copy(self)
+
+        cpu_reader._executor = None
+        cpu_reader._readers = {index: self._to_future(future.result()) for index, future in self._readers.items()}
+
+        memo[id(self)] = cpu_reader
+
+        return cpu_reader
+
+    def _find_files(self, data_path: str) -> List[Tuple[int, int, str]]:
+        """Find the files of readings, result is a list of (start time, end time, path) in order."""
+        reader = BinaryReader(data_path)
+        items_meta = reader.meta.items()
+        start_time = reader.header.starttime
+        reader.close()
+
+        file_ranges = []
+        folder = os.path.dirname(data_path)
+
+        for file_name in os.listdir(folder if folder else "."):
+            if not file_name.endswith(".bin"):
+                continue
+
+            file_path = os.path.join(folder, file_name)
+            reader = BinaryReader(file_path)
+
+            if reader.meta.items() == items_meta and reader.header.starttime >= start_time:
+                file_ranges.append((reader.header.starttime, reader.header.endtime, file_path))
+
+            reader.close()
+
+        file_ranges.sort()
+
+        return file_ranges
+
+    def _get_reader(self, index: int, wait: bool = True) -> Tuple[BinaryReader, ItemTickBlockPicker]:
+        if index not in self._readers:
+            if not self._prefetch:
+                future = self._to_future(self._open_reader(self._file_ranges[index][2]))
+            else:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1)
+
+                future = self._executor.submit(self._open_reader, self._file_ranges[index][2])
+
+                # No more file to load, the thread exits after loading this one.
+                if index == len(self._file_ranges) - 1:
+                    self._shutdown_executor(wait=False)
+
+            self._readers[index] = future
+
+        if wait:
+            return self._readers[index].result()
+
+    def _shutdown_executor(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def _release_reader(self, index: int):
+        # NOTE: Reader is not closed here, as it may be shared by copies, it will be closed when not referenced.
+        self._readers.pop(index, None)
+
+    @staticmethod
+    def _to_future(result: Tuple[BinaryReader, ItemTickBlockPicker]) -> Future:
+        future = Future()
+        future.set_result(result)
+
+        return future
+
+    @staticmethod
+    def _open_reader(data_path: str) -> Tuple[BinaryReader, ItemTickBlockPicker]:
+        reader = BinaryReader(data_path)
+        # Block picker maps and loads the timestamps of all items, so this is the part to do in background.
+        picker = reader.items_tick_block_picker(0, None, time_unit="s")
+
+        return reader, picker
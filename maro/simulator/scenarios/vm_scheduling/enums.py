@@ -8,6 +8,8 @@ class Events(Enum):
     """VM-PM pairs related events."""
     # VM request events.
     REQUEST = "vm_required"
+    # All VM requests of a tick, used in batch decision mode.
+    BATCH_REQUEST = "vm_batch_required"
 
 
 class PostponeType(Enum):
@@ -5,6 +5,7 @@ from typing import List, Set
 
 from maro.backends.frame import NodeAttribute, NodeBase, node
 
+from .capacity_index import PmCapacityIndex
 from .enums import PmState
 from .virtual_machine import VirtualMachine
 
@@ -36,6 +37,8 @@ class PhysicalMachine(NodeBase):
         self._init_pm_state = 0
         # PM resource.
         self._live_vms: Set[int] = set()
+        # Capacity index to notify when resource changed.
+        self._capacity_index: PmCapacityIndex = None
 
     def update_cpu_utilization(self, vm: VirtualMachine = None, cpu_utilization: float = None):
         if vm is None and cpu_utilization is None:
@@ -89,6 +92,36 @@ class PhysicalMachine(NodeBase):
         self.cpu_utilization = 0.0
         self.energy_consumption = 0.0
 
+    def set_capacity_index(self, capacity_index: PmCapacityIndex):
+        """Set the capacity index that need to be kept in sync with the resource of this PM.
+
+        Args:
+            capacity_index (PmCapacityIndex): Capacity index of all PMs.
+        """
+        self._capacity_index = capacity_index
+
+    def _on_cpu_cores_capacity_changed(self, value: int):
+        self._update_capacity_index("cpu_cores_capacity", value)
+
+    def _on_memory_capacity_changed(self, value: int):
+        self._update_capacity_index("memory_capacity", value)
+
+    def _on_cpu_cores_allocated_changed(self, value: int):
+        self._update_capacity_index("cpu_cores_allocated", value)
+
+    def _on_memory_allocated_changed(self, value: int):
+        self._update_capacity_index("memory_allocated", value)
+
+    def _on_cpu_utilization_changed(self, value: float):
+        self._update_capacity_index("cpu_utilization", value)
+
+    def _on_oversubscribable_changed(self, value: int):
+        self._update_capacity_index("oversubscribable", value)
+
+    def _update_capacity_index(self, name: str, value: float):
+        if self._capacity_index is not None:
+            self._capacity_index.update(self._id, name, value)
+
     @property
     def live_vms(self) -> Set[int]:
         return self._live_vms
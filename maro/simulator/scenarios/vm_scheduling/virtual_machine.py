@@ -4,6 +4,7 @@
 from typing import List
 
 from .enums import VmCategory
+from .vm_workload import VmWorkload
 
 
 class VirtualMachine:
@@ -50,9 +51,25 @@ class VirtualMachine:
         self._cpu_utilization: float = 0.0
         self.creation_tick: int = -1
         self.deletion_tick: int = -1
+        # Workload that keeps the utilization of this VM while it is pending or running in the simulator.
+        self._workload: VmWorkload = None
+
+    def set_workload(self, workload: VmWorkload):
+        """Keep the utilization in workload instead of this object, the VM should be added to the workload already.
+
+        Args:
+            workload (VmWorkload): Workload of VMs in simulator.
+        """
+        self._workload = workload
+
+    def _is_in_workload(self) -> bool:
+        return self._workload is not None and self.id in self._workload
 
     @property
     def cpu_utilization(self) -> float:
+        if self._is_in_workload() and self.pm_id >= 0:
+            return self._workload.get_cpu_utilization(self.id)
+
         return self._cpu_utilization
 
     @cpu_utilization.setter
@@ -60,6 +77,9 @@ class VirtualMachine:
         self._cpu_utilization = min(max(0, cpu_utilization), 100)
 
     def get_utilization(self, cur_tick: int) -> float:
+        if self._is_in_workload():
+            return self._workload.get_utilization(self.id, cur_tick)
+
         if cur_tick - self.creation_tick > len(self._utilization_series):
             raise Exception(f"The tick {cur_tick} is invalid for the VM {self.id}.")
 
@@ -75,6 +95,9 @@ class VirtualMachine:
         """
         # If cpu_utilization is smaller than 0, it means the missing data in the cpu readings file.
         # TODO: We use the last utilization, it could be further refined to use average or others.
+        if self._is_in_workload():
+            raise Exception(f"The utilization of VM {self.id} is updated by the workload.")
+
         if cpu_utilization < 0.0:
             self._utilization_series.append(self._utilization_series[-1])
         else:
@@ -82,4 +105,7 @@ class VirtualMachine:
 
     def get_historical_utilization_series(self, cur_tick: int) -> List[float]:
         """"Only expose the CPU utilization series before the current tick."""
+        if self._is_in_workload():
+            return self._workload.get_historical_utilization_series(self.id, cur_tick)
+
         return self._utilization_series[:cur_tick - self.creation_tick + 1]
@@ -0,0 +1,257 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from typing import Dict, List
+
+import numpy as np
+
+# Initial number of slots of VMs, slot arrays are doubled when full.
+INITIAL_SLOT_NUMBER = 1024
+
+# Initial length of the utilization series segment of each VM, segment is moved and doubled when full.
+INITIAL_SERIES_LENGTH = 16
+
+
+class VmWorkload:
+    """Columnar workload of the VMs that are pending or running, used to update CPU utilization of all VMs per tick.
+
+    Each VM takes a slot of the arrays (CPU cores requirement, PM id, creation tick and current CPU utilization),
+    the CPU utilization series of all VMs are kept in segments of one float array, so appending the readings of
+    a tick is done with numpy for all the VMs, instead of appending to the list of each VM.
+
+    Segments of finished VMs are not released immediately, the series array is compacted when it is full.
+    """
+
+    def __init__(self):
+        self._slots: Dict[int, int] = {}
+        self._free_slots: List[int] = []
+
+        self._alloc_slots(INITIAL_SLOT_NUMBER)
+
+        self._series = np.zeros(INITIAL_SLOT_NUMBER * INITIAL_SERIES_LENGTH, dtype=np.float64)
+        self._series_end = 0
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, vm_id: int):
+        return vm_id in self._slots
+
+    def clear(self):
+        """Remove all the VMs."""
+        self._slots.clear()
+        self._free_slots = list(range(len(self._vm_ids) - 1, -1, -1))
+        self._vm_ids[:] = -1
+        self._series_end = 0
+
+    def add_vm(self, vm_id: int, cpu_cores_requirement: int, cpu_utilization: float):
+        """Add a requested VM with its CPU utilization at the requested tick.
+
+        Args:
+            vm_id (int): Id of the VM.
+            cpu_cores_requirement (int): The amount of virtual cores requested by VM.
+            cpu_utilization (float): CPU utilization at the requested tick.
+        """
+        if len(self._free_slots) == 0:
+            self._alloc_slots(len(self._vm_ids))
+
+        slot = self._free_slots.pop()
+
+        self._slots[vm_id] = slot
+        self._vm_ids[slot] = vm_id
+        self._cpu_cores[slot] = cpu_cores_requirement
+        self._pm_ids[slot] = -1
+        self._creation_ticks[slot] = -1
+        self._cpu_utilizations[slot] = 0.0
+
+        # Empty segment before allocating, as the series may be compacted.
+        self._series_capacities[slot] = 0
+        self._series_lengths[slot] = 0
+        self._series_starts[slot] = self._alloc_series(INITIAL_SERIES_LENGTH)
+        self._series_capacities[slot] = INITIAL_SERIES_LENGTH
+
+        self._append_series(np.array([slot]), np.array([cpu_utilization], dtype=np.float64))
+
+    def remove_vm(self, vm_id: int):
+        """Remove a finished or failed VM, its utilization series will be dropped.
+
+        Args:
+            vm_id (int): Id of the VM.
+        """
+        slot = self._slots.pop(vm_id)
+
+        self._vm_ids[slot] = -1
+        self._free_slots.append(slot)
+
+    def allocate_vm(self, vm_id: int, pm_id: int, creation_tick: int):
+        """Mark a VM as running on a PM.
+
+        Args:
+            vm_id (int): Id of the VM.
+            pm_id (int): Id of the PM that the VM allocated to.
+            creation_tick (int): Tick that the VM allocated.
+        """
+        slot = self._slots[vm_id]
+
+        self._pm_ids[slot] = pm_id
+        self._creation_ticks[slot] = creation_tick
+        self._cpu_utilizations[slot] = self._clip_utilization(self.get_utilization(vm_id, creation_tick))
+
+    def get_cpu_utilization(self, vm_id: int) -> float:
+        """Get current CPU utilization of a running VM."""
+        return float(self._cpu_utilizations[self._slots[vm_id]])
+
+    def get_utilization(self, vm_id: int, cur_tick: int) -> float:
+        """Get the CPU utilization in series of a running VM at specified tick.
+
+        NOTE:
+            Series starts from the tick that VM requested, not the tick that it allocated (creation tick).
+        """
+        slot = self._slots[vm_id]
+        index = cur_tick - self._creation_ticks[slot]
+
+        if index < 0 or index >= self._series_lengths[slot]:
+            raise Exception(f"The tick {cur_tick} is invalid for the VM {vm_id}.")
+
+        return float(self._series[self._series_starts[slot] + index])
+
+    def get_historical_utilization_series(self, vm_id: int, cur_tick: int) -> List[float]:
+        """Get CPU utilization series of a running VM, only the ones before current tick are exposed."""
+        slot = self._slots[vm_id]
+        start = self._series_starts[slot]
+        length = min(max(0, cur_tick - self._creation_ticks[slot] + 1), self._series_lengths[slot])
+
+        return self._series[start:start + length].tolist()
+
+    def update_utilization(self, cur_tick: int, vm_ids: np.ndarray, cpu_utilizations: np.ndarray):
+        """Append the CPU utilization readings of current tick to the series of all VMs.
+
+        Missing readings (no reading or negative reading) are filled with the last value of the series.
+        CPU utilization of the running VMs that have a reading is updated with their series at current tick.
+
+        Args:
+            cur_tick (int): Current tick.
+            vm_ids (np.ndarray): Id of VMs that have reading at current tick.
+            cpu_utilizations (np.ndarray): CPU utilization readings of the VMs.
+        """
+        slots = np.flatnonzero(self._vm_ids >= 0)
+
+        if len(slots) == 0:
+            return
+
+        # Find reading of each VM by searching its id in sorted ids of readings.
+        order = np.argsort(vm_ids, kind="stable")
+        sorted_ids = vm_ids[order]
+        positions = np.minimum(np.searchsorted(sorted_ids, self._vm_ids[slots]), max(0, len(sorted_ids) - 1))
+
+        if len(sorted_ids) > 0:
+            has_reading = sorted_ids[positions] == self._vm_ids[slots]
+            readings = np.asarray(cpu_utilizations, dtype=np.float64)[order][positions]
+        else:
+            has_reading = np.zeros(len(slots), dtype=bool)
+            readings = np.zeros(len(slots), dtype=np.float64)
+
+        last_values = self._series[self._series_starts[slots] + self._series_lengths[slots] - 1]
+        values = np.where(has_reading & (readings >= 0), readings, last_values)
+
+        self._append_series(slots, values)
+
+        # Running VMs with reading.
+        running_slots = slots[has_reading & (self._pm_ids[slots] >= 0)]
+
+        if len(running_slots) > 0:
+            self._cpu_utilizations[running_slots] = self._clip_utilization(
+                self._series[self._series_starts[running_slots] + cur_tick - self._creation_ticks[running_slots]]
+            )
+
+    def get_pm_cpu_cores_used(self, pm_amount: int) -> np.ndarray:
+        """Get the CPU cores used by running VMs on each PM.
+
+        Args:
+            pm_amount (int): Number of PMs.
+
+        Returns:
+            np.ndarray: Sum of CPU utilization * CPU cores requirement of the VMs on each PM.
+        """
+        slots = np.flatnonzero((self._vm_ids >= 0) & (self._pm_ids >= 0))
+
+        return np.bincount(
+            self._pm_ids[slots], weights=self._cpu_utilizations[slots] * self._cpu_cores[slots], minlength=pm_amount
+        )
+
+    @staticmethod
+    def _clip_utilization(cpu_utilization):
+        return np.minimum(np.maximum(0, cpu_utilization), 100)
+
+    def _alloc_slots(self, number: int):
+        """Add more slots, existing slots are kept."""
+        old_number = len(self._slots) + len(self._free_slots)
+        new_number = old_number + number
+
+        def extend(name: str, dtype: type, fill_value):
+            array = np.full(new_number, fill_value, dtype=dtype)
+
+            if old_number > 0:
+                array[:old_number] = getattr(self, name)
+
+            setattr(self, name, array)
+
+        extend("_vm_ids", np.int64, -1)
+        extend("_cpu_cores", np.float64, 0)
+        extend("_pm_ids", np.int64, -1)
+        extend("_creation_ticks", np.int64, -1)
+        extend("_cpu_utilizations", np.float64, 0)
+        extend("_series_starts", np.int64, 0)
+        extend("_series_capacities", np.int64, 0)
+        extend("_series_lengths", np.int64, 0)
+
+        # Pop from the end, so smaller slots are used first.
+        self._free_slots.extend(range(new_number - 1, old_number - 1, -1))
+
+    def _alloc_series(self, length: int) -> int:
+        """Allocate a segment at the end of series array, compact or enlarge the array if there is no space."""
+        if self._series_end + length > len(self._series):
+            self._compact_series(length)
+
+        start = self._series_end
+        self._series_end += length
+
+        return start
+
+    def _compact_series(self, extra_length: int):
+        """Move segments of current VMs to a new series array, that has space for extra length at least."""
+        slots = np.flatnonzero(self._vm_ids >= 0)
+        used_length = int(self._series_capacities[slots].sum())
+
+        series = np.zeros(max(len(self._series), 2 * (used_length + extra_length)), dtype=np.float64)
+        end = 0
+
+        for slot in slots.tolist():
+            start = self._series_starts[slot]
+            length = self._series_lengths[slot]
+
+            series[end:end + length] = self._series[start:start + length]
+
+            self._series_starts[slot] = end
+            end += self._series_capacities[slot]
+
+        self._series = series
+        self._series_end = end
+
+    def _append_series(self, slots: np.ndarray, values: np.ndarray):
+        """Append a value to the series of each slot."""
+        # Move the full segments to the end with doubled capacity.
+        for slot in slots[self._series_lengths[slots] == self._series_capacities[slots]].tolist():
+            capacity = self._series_capacities[slot] * 2
+            length = self._series_lengths[slot]
+
+            # NOTE: compacting may move the segment, so read the start after allocating.
+            new_start = self._alloc_series(capacity)
+            start = self._series_starts[slot]
+
+            self._series[new_start:new_start + length] = self._series[start:start + length]
+            self._series_starts[slot] = new_start
+            self._series_capacities[slot] = capacity
+
+        self._series[self._series_starts[slots] + self._series_lengths[slots]] = values
+        self._series_lengths[slots] += 1
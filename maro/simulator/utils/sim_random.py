@@ -88,6 +88,32 @@ class SimRandom:
 
         return self._seed
 
+    def get_state(self) -> dict:
+        """Get internal states of all the random objects, used to restore the random sequences later.
+
+        Returns:
+            dict: States of random objects and seeds.
+        """
+        return {
+            "seed": self._seed,
+            "index": self._index,
+            "seed_dict": dict(self._seed_dict),
+            "rand_states": {key: rand.getstate() for key, rand in self._rand_instances.items()}
+        }
+
+    def set_state(self, state: dict):
+        """Restore internal states of random objects from get_state result.
+
+        Args:
+            state (dict): States to restore.
+        """
+        for key, rand_state in state["rand_states"].items():
+            self[key].setstate(rand_state)
+
+        self._seed = state["seed"]
+        self._index = state["index"]
+        self._seed_dict = dict(state["seed_dict"])
+
 
 random = SimRandom()
 """Random utility for simulator, same with original random module."""
@@ -0,0 +1,93 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import unittest
+from collections import namedtuple
+from math import ceil
+
+from maro.data_lib.cim.entities import NoisedItem, PortSetting
+from maro.data_lib.cim.order_generator import OrderGenerator
+from maro.data_lib.cim.utils import order_num_rand
+
+MockDataCollection = namedtuple("MockDataCollection", ["ports_settings"])
+
+
+def build_data(noise: float):
+    source_proportions = [0.5, 0.3, 0.2]
+    target_proportions = {
+        0: [(1, 0.7), (2, 0.3)],
+        1: [(0, 1.0)],
+        2: [(0, 0.25), (1, 0.75)]
+    }
+
+    ports = []
+
+    for port_idx, source_proportion in enumerate(source_proportions):
+        ports.append(PortSetting(
+            port_idx, f"p{port_idx}", 100, 10,
+            NoisedItem(port_idx, source_proportion, noise),
+            [NoisedItem(target, proportion, noise) for target, proportion in target_proportions[port_idx]],
+            None, None
+        ))
+
+    return MockDataCollection(ports)
+
+
+class TestOrderGenerator(unittest.TestCase):
+
+    def test_orders_without_noise(self):
+        data = build_data(0)
+        generator = OrderGenerator(data, block_size=4)
+
+        orders_to_gen = 33
+
+        for tick in range(10):
+            orders = generator.gen_orders(tick, orders_to_gen)
+
+            # Same as distributing the order number to ports one by one.
+            expected = []
+            remaining = orders_to_gen
+
+            for port in data.ports_settings:
+                port_order_num = min(ceil(orders_to_gen * port.source_proportion.base), remaining)
+                remaining -= port_order_num
+                target_remaining = port_order_num
+
+                for target in port.target_proportions:
+                    num = min(ceil(port_order_num * target.base), target_remaining)
+                    target_remaining -= num
+
+                    if num > 0:
+                        expected.append((tick, port.index, target.index, num))
+
+            self.assertListEqual(
+                expected, [(o.tick, o.src_port_idx, o.dest_port_idx, o.quantity) for o in orders]
+            )
+
+        self.assertListEqual([], generator.gen_orders(10, 0))
+
+    def test_orders_with_noise(self):
+        data = build_data(0.1)
+
+        def gen_all_orders():
+            order_num_rand.seed(123)
+
+            generator = OrderGenerator(data, block_size=4)
+
+            return [
+                [(o.src_port_idx, o.dest_port_idx, o.quantity) for o in generator.gen_orders(tick, 20 + tick)]
+                for tick in range(10)
+            ]
+
+        orders_list = gen_all_orders()
+
+        # Total number should be same as required.
+        for tick, orders in enumerate(orders_list):
+            self.assertEqual(20 + tick, sum([o[2] for o in orders]))
+
+        # Should be reproducible with same seed.
+        self.assertListEqual(orders_list, gen_all_orders())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -45,13 +45,15 @@ def mock_cim_init_func(self, event_buffer, topology_path, max_tick):
     self._ports = []
     self._frame = None
     self._port_orders_exporter = PortOrderExporter(False)
+    self._total_operate_num = 0
+    self._is_totals_check_enabled = True
     self._init_frame()
 
     self._snapshots = self._frame.snapshots
 
     self._register_events()
 
-    self._load_departure_events()
+    self._reset_departure_events()
 
 
 class TestCimScenarios(unittest.TestCase):
@@ -472,6 +474,55 @@ class TestCimScenarios(unittest.TestCase):
             self.assertEqual(
                 100, p1.empty, "there should be 100 empty at tick 20 at port 1")
 
+    def test_totals(self):
+        for backend_name in backends_to_test:
+            os.environ["DEFAULT_BACKEND_NAME"] = backend_name
+
+            eb, be = setup_case("case_04")
+
+            # Totals are checked with nodes after each tick.
+            for tick in range(MAX_TICK):
+                next_step(eb, be, tick)
+
+            metrics = be.get_metrics()
+
+            self.assertEqual(sum([node.empty for node in be._ports + be._vessels]), metrics["total_empty"])
+            self.assertEqual(sum([node.full for node in be._ports + be._vessels]), metrics["total_full"])
+            self.assertEqual(sum([port.acc_booking for port in be._ports]), metrics["order_requirements"])
+            self.assertEqual(sum([port.acc_shortage for port in be._ports]), metrics["container_shortage"])
+
+            # Changing nodes without updating totals should be detected.
+            be._ports[0].empty += 1
+
+            with self.assertRaises(AssertionError):
+                next_step(eb, be, MAX_TICK)
+
+    def test_vessel_stops_update(self):
+        for backend_name in backends_to_test:
+            os.environ["DEFAULT_BACKEND_NAME"] = backend_name
+
+            eb, be = setup_case("case_01")
+
+            for tick in range(MAX_TICK):
+                next_step(eb, be, tick)
+
+                # Unchanged vessels are skipped when updating, stop lists should still be same as the ones from data.
+                for vessel in be._vessels:
+                    key = (vessel.idx, vessel.last_loc_idx, vessel.next_loc_idx)
+
+                    for stops, port_attr, tick_attr in (
+                        (be._data_cntr.vessel_past_stops[key], "past_stop_list", "past_stop_tick_list"),
+                        (be._data_cntr.vessel_future_stops[key], "future_stop_list", "future_stop_tick_list")
+                    ):
+                        self.assertListEqual(
+                            [stop.port_idx if stop is not None else -1 for stop in stops],
+                            list(getattr(vessel, port_attr)[:])
+                        )
+                        self.assertListEqual(
+                            [stop.arrive_tick if stop is not None else -1 for stop in stops],
+                            list(getattr(vessel, tick_attr)[:])
+                        )
+
     def test_order_export(self):
         """order.tick, order.src_port_idx, order.dest_port_idx, order.quantity"""
         Order = namedtuple("Order", ["tick", "src_port_idx", "dest_port_idx", "quantity"])
@@ -0,0 +1,39 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from maro.simulator.scenarios.citi_bike.adj_loader import convert_adj_csv_to_npy, load_adj_from_csv, load_adj_from_npy
+
+
+class TestAdjLoader(unittest.TestCase):
+    def test_convert_to_npy(self):
+        with tempfile.TemporaryDirectory() as folder:
+            csv_file = os.path.join(folder, "distance_adj.csv")
+            npy_file = os.path.join(folder, "distance_adj.npy")
+
+            np.random.seed(0)
+
+            distance_adj = np.round(np.random.rand(10, 10) * 10, 1)
+
+            np.savetxt(csv_file, distance_adj, delimiter=",", header=",".join(map(str, range(10))), comments="")
+
+            convert_adj_csv_to_npy(csv_file, npy_file, skiprows=1)
+
+            adj = load_adj_from_npy(npy_file)
+
+            self.assertEqual(np.float32, adj.dtype)
+            self.assertEqual((10, 10), adj.shape)
+
+            # Read-only mapped.
+            self.assertFalse(adj.flags.writeable)
+
+            self.assertTrue(np.array_equal(np.array(load_adj_from_csv(csv_file, skiprows=1), dtype=np.float32), adj))
+
+
+if __name__ == "__main__":
+    unittest.main()
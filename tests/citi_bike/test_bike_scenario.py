@@ -13,7 +13,7 @@ from maro.simulator.scenarios.citi_bike.events import CitiBikeEvents
 from tests.utils import backends_to_test, be_run_to_end, next_step
 
 
-def setup_case(case_name: str, max_tick: int):
+def setup_case(case_name: str, max_tick: int, additional_options: dict = {}):
     config_path = os.path.join("tests/data/citi_bike", case_name)
 
     # enable binary exist
@@ -40,7 +40,8 @@ def setup_case(case_name: str, max_tick: int):
 
     eb = EventBuffer()
     be = CitibikeBusinessEngine(event_buffer=eb, topology=config_path, start_tick=0,
-                                max_tick=max_tick, snapshot_resolution=1, max_snapshots=None, additional_options={})
+                                max_tick=max_tick, snapshot_resolution=1, max_snapshots=None,
+                                additional_options=additional_options)
 
     return eb, be
 
@@ -166,6 +167,55 @@ class TestCitibike(unittest.TestCase):
             self.assertEqual(0, states_at_tick_1[1])
             self.assertEqual(6, states_at_tick_1[2])
 
+    def test_batch_trips(self):
+        """Test if states are same when processing trips in batch"""
+        for backend_name in backends_to_test:
+            os.environ["DEFAULT_BACKEND_NAME"] = backend_name
+
+            for case_name in ("case_1", "case_2"):
+                states_list = []
+                metrics_list = []
+
+                for additional_options in ({}, {"batch-trips": True}):
+                    eb, be = setup_case(case_name, max_tick=20, additional_options=additional_options)
+
+                    be_run_to_end(eb, be)
+
+                    states_list.append(be.snapshots["stations"][::[
+                        "shortage", "bikes", "fulfillment", "trip_requirement", "failed_return"]].tolist())
+                    metrics_list.append(dict(be.get_metrics()))
+
+                self.assertListEqual(states_list[0], states_list[1])
+                self.assertDictEqual(metrics_list[0], metrics_list[1])
+
+    def test_batch_trips_without_bikes(self):
+        """Test if trips of stations without positive bikes are all shortages when processing trips in batch"""
+        for backend_name in backends_to_test:
+            os.environ["DEFAULT_BACKEND_NAME"] = backend_name
+
+            states_list = []
+
+            for additional_options in ({}, {"batch-trips": True}):
+                eb, be = setup_case("case_1", max_tick=1, additional_options=additional_options)
+
+                for station in be.frame.stations:
+                    station.bikes = -1
+
+                next_step(eb, be, 0)
+
+                states_list.append(
+                    [
+                        [getattr(station, attr_name) for attr_name in ("bikes", "fulfillment", "shortage")]
+                        for station in be.frame.stations
+                    ]
+                )
+
+                for station in be.frame.stations:
+                    self.assertEqual(0, station.fulfillment)
+                    self.assertEqual(station.trip_requirement, station.shortage)
+
+            self.assertListEqual(states_list[0], states_list[1])
+
 
 if __name__ == "__main__":
     unittest.main()
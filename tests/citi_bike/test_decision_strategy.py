@@ -0,0 +1,68 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import unittest
+import warnings
+
+import numpy as np
+
+from maro.simulator.scenarios.citi_bike.common import DecisionType
+from maro.simulator.scenarios.citi_bike.decision_strategy import BikeDecisionStrategy
+from maro.simulator.scenarios.citi_bike.frame_builder import build_frame
+
+OPTIONS = {
+    "extra_cost_mode": "source",
+    "resolution": 2,
+    "effective_time_mean": 20,
+    "effective_time_std": 5,
+    "supply_water_mark_ratio": 0.8,
+    "demand_water_mark_ratio": 0.2,
+    "action_scope": {"low": 0, "high": 1, "filters": []}
+}
+
+
+def setup_strategy(bikes: list, capacities: list):
+    station_num = len(bikes)
+    frame = build_frame(station_num, 1)
+
+    for station, bike_num, capacity in zip(frame.stations, bikes, capacities):
+        station.capacity = capacity
+        station.bikes = bike_num
+
+    return BikeDecisionStrategy(frame, np.zeros((station_num, station_num)), OPTIONS)
+
+
+class TestBikeDecisionStrategy(unittest.TestCase):
+    def test_stations_need_decision(self):
+        # On, above, between and below the water marks.
+        strategy = setup_strategy([8, 9, 7, 2, 1, 3, 10, 0], [10] * 8)
+
+        # Only checked at the end of resolution.
+        self.assertListEqual([], strategy.get_stations_need_decision(0))
+
+        self.assertListEqual(
+            [
+                (0, DecisionType.Supply),
+                (1, DecisionType.Supply),
+                (3, DecisionType.Demand),
+                (4, DecisionType.Demand),
+                (6, DecisionType.Supply),
+                (7, DecisionType.Demand)
+            ],
+            strategy.get_stations_need_decision(1)
+        )
+
+    def test_zero_capacity(self):
+        strategy = setup_strategy([5, 3, 0, 1], [10, 0, 0, 10])
+
+        # Station with bikes but no capacity supplies, the one without both needs no decision.
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+
+            self.assertListEqual(
+                [(1, DecisionType.Supply), (3, DecisionType.Demand)], strategy.get_stations_need_decision(1)
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
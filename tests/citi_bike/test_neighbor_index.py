@@ -0,0 +1,48 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import unittest
+
+import numpy as np
+
+from maro.simulator.scenarios.citi_bike.neighbor_index import NeighborIndex
+
+
+def sorted_neighbors(distance_adj: np.ndarray, station_idx: int) -> list:
+    """Neighbors with non-zero distance, sorted by distance then index."""
+    neighbors = [(index, dist) for index, dist in enumerate(distance_adj[station_idx]) if dist != 0.0]
+
+    return sorted(neighbors, key=lambda item: item[1])
+
+
+class TestNeighborIndex(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(0)
+
+        # Rounded distances to have stations with same distance.
+        self.distance_adj = np.round(np.random.rand(300, 300) * 10)
+        np.fill_diagonal(self.distance_adj, 0)
+
+    def test_same_as_sorting(self):
+        for neighbor_num in (None, 1, 7, 1000):
+            index = NeighborIndex(self.distance_adj, neighbor_num)
+
+            for station_idx in range(len(self.distance_adj)):
+                expected = sorted_neighbors(self.distance_adj, station_idx)
+
+                for number in (None, 1, 5, 7, 20, 1000):
+                    indices, distances = index.get_neighbors(station_idx, number)
+
+                    self.assertListEqual(expected[:number], list(zip(indices.tolist(), distances.tolist())))
+
+    def test_kept_neighbors(self):
+        index = NeighborIndex(self.distance_adj, 5)
+
+        self.assertEqual(5, index.neighbor_num)
+
+        # Only nearest neighbors are kept.
+        self.assertEqual(5 * len(self.distance_adj), len(index._indices))
+
+
+if __name__ == "__main__":
+    unittest.main()
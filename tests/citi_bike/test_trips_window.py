@@ -0,0 +1,44 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import unittest
+
+import numpy as np
+
+from maro.simulator.scenarios.citi_bike.trips_window import TripsWindow
+
+
+class TestTripsWindow(unittest.TestCase):
+    def test_same_as_summing_frames(self):
+        np.random.seed(0)
+
+        station_num = 20
+        windows = 3
+
+        trips_window = TripsWindow(station_num, windows)
+        frame_trips = []
+
+        for _ in range(10):
+            trips = np.zeros(station_num, dtype=np.int64)
+
+            for station_idx in np.random.randint(0, station_num, size=50).tolist():
+                trips_window.add_trip(station_idx)
+                trips[station_idx] += 1
+
+            frame_trips.append(trips)
+
+            # Latest N frames, including the one not ended.
+            expected = np.sum(frame_trips[-windows:], axis=0)
+
+            self.assertListEqual(expected.tolist(), trips_window.get_trips(list(range(station_num))).tolist())
+            self.assertEqual(expected[5], trips_window.get_trips(5))
+
+            trips_window.next_frame()
+
+        trips_window.reset()
+
+        self.assertEqual(0, trips_window.get_trips(list(range(station_num))).sum())
+
+
+if __name__ == "__main__":
+    unittest.main()
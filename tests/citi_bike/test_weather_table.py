@@ -0,0 +1,98 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+from dateutil.tz import gettz
+
+from maro.data_lib import BinaryConverter
+from maro.data_lib.binary_reader import BinaryReader
+from maro.simulator.scenarios.citi_bike.weather_table import WeatherTable
+from maro.simulator.scenarios.helpers import utc_timestamp_to_timezone
+
+DATA_ROOT = "tests/data/citi_bike"
+FIELDS = ("timestamp", "weather", "temp")
+
+
+def build_weather_bin(bin_file: str, csv_file: str):
+    converter = BinaryConverter(bin_file, os.path.join(DATA_ROOT, "weather.meta.yml"))
+    converter.add_csv(csv_file)
+    converter.flush()
+
+
+def load_weather_dict(file: str, timezone) -> dict:
+    """Weather look-up by date with items from reader, later item takes place for same date."""
+    reader = BinaryReader(file_path=file)
+
+    weather_lut = {utc_timestamp_to_timezone(item.timestamp, timezone).date(): item for item in reader.items()}
+
+    reader.close()
+
+    return weather_lut
+
+
+class TestWeatherTable(unittest.TestCase):
+    def assert_same_as_dict(self, file: str, start_date: date, end_date: date):
+        timezone = gettz("America/New_York")
+
+        weather_table = WeatherTable(file, timezone)
+        weather_lut = load_weather_dict(file, timezone)
+
+        cur_date = start_date
+
+        while cur_date <= end_date:
+            weather = weather_table[cur_date]
+            expected = weather_lut.get(cur_date, None)
+
+            if expected is None:
+                self.assertIsNone(weather, cur_date)
+            else:
+                for field in FIELDS:
+                    self.assertEqual(getattr(expected, field), getattr(weather, field), cur_date)
+
+            cur_date += timedelta(days=1)
+
+    def test_same_as_dict(self):
+        weathers_bin = os.path.join(DATA_ROOT, "weathers.bin")
+
+        if not os.path.exists(weathers_bin):
+            build_weather_bin(weathers_bin, os.path.join(DATA_ROOT, "weather.csv"))
+
+        # Including dates out of the range of file.
+        self.assert_same_as_dict(weathers_bin, date(2018, 12, 25), date(2019, 1, 15))
+
+    def test_missing_and_duplicated_dates(self):
+        with tempfile.TemporaryDirectory() as folder:
+            csv_file = os.path.join(folder, "weather.csv")
+            bin_file = os.path.join(folder, "weathers.bin")
+
+            # No weather at 1/4 and 1/5, 2 weathers at 1/2.
+            with open(csv_file, "w") as fp:
+                fp.write(
+                    "date,weather,temp\n"
+                    "1/1/2019 12:00:00,0,30.5\n"
+                    "1/2/2019 6:00:00,3,32.0\n"
+                    "1/2/2019 12:00:00,1,34.5\n"
+                    "1/3/2019 12:00:00,1,30.0\n"
+                    "1/6/2019 12:00:00,2,32.5\n"
+                )
+
+            build_weather_bin(bin_file, csv_file)
+
+            self.assert_same_as_dict(bin_file, date(2018, 12, 25), date(2019, 1, 15))
+
+            weather_table = WeatherTable(bin_file, gettz("America/New_York"))
+
+            self.assertEqual((1, 34.5), (weather_table[date(2019, 1, 2)].weather, weather_table[date(2019, 1, 2)].temp))
+            self.assertIsNone(weather_table[date(2019, 1, 4)])
+            self.assertIsNone(weather_table[date(2019, 1, 5)])
+            self.assertIsNone(weather_table[date(2018, 12, 31)])
+            self.assertIsNone(weather_table[date(2019, 1, 7)])
+            self.assertEqual(2, weather_table[date(2019, 1, 6)].weather)
+
+
+if __name__ == "__main__":
+    unittest.main()
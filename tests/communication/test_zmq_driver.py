@@ -3,9 +3,14 @@
 
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
+import pickle
 import unittest
 
+import numpy as np
+import torch
+
 from maro.communication import SessionMessage, ZmqDriver
+from maro.communication.driver.serialization import deserialize_message, serialize_message
 
 
 def message_receive(driver):
@@ -68,6 +73,66 @@ class TestDriver(unittest.TestCase):
             res = task.result()
             self.assertEqual(res, message.payload)
 
+    def test_send_with_zero_copy(self):
+        sender = ZmqDriver(component_type="sender", zero_copy=True, min_zero_copy_bytes=0)
+        sender.connect({peer: TestDriver.receivers[peer].address for peer in TestDriver.peer_list})
+
+        for peer in TestDriver.peer_list:
+            payload = {"weights": np.arange(12, dtype=np.float32).reshape(3, 4), "tag": peer}
+            sender.send(SessionMessage(tag="unit_test", source="sender", destination=peer, payload=payload))
+
+            # Payload can be modified once sending returned.
+            payload["weights"][:] = -1
+
+            for received_message in TestDriver.receivers[peer].receive(is_continuous=False):
+                received_weights = received_message.payload["weights"]
+
+                self.assertEqual(received_message.payload["tag"], peer)
+                self.assertTrue(np.array_equal(received_weights, np.arange(12, dtype=np.float32).reshape(3, 4)))
+                self.assertFalse(received_weights.flags.writeable)
+
+        sender.close()
+
+
+class TestSerialization(unittest.TestCase):
+    def test_zero_copy_round_trip(self):
+        payload = {
+            "array": np.arange(24, dtype=np.float64).reshape(2, 3, 4),
+            "fortran_array": np.asfortranarray(np.arange(12, dtype=np.int16).reshape(3, 4)),
+            "small_array": np.zeros(2, dtype=np.int32),
+            "object_array": np.array([None, "a"], dtype=object),
+            "tensor": torch.arange(8, dtype=torch.float32).reshape(2, 4),
+            "others": [1, "a", None]
+        }
+        message = SessionMessage(tag="unit_test", source="sender", destination="receiver", payload=payload)
+
+        frames = serialize_message(message, min_zero_copy_bytes=16)
+
+        # Marker, pickled message, then array, fortran array and tensor data.
+        self.assertEqual(len(frames), 5)
+
+        received = deserialize_message([bytes(frame) for frame in frames]).payload
+
+        self.assertEqual(received["others"], payload["others"])
+        self.assertEqual(received["object_array"].tolist(), payload["object_array"].tolist())
+
+        for key in ("array", "fortran_array", "small_array"):
+            self.assertEqual(received[key].dtype, payload[key].dtype)
+            self.assertTrue(np.array_equal(received[key], payload[key]))
+
+        self.assertFalse(received["array"].flags.writeable)
+        self.assertTrue(received["small_array"].flags.writeable)
+
+        self.assertIsInstance(received["tensor"], torch.Tensor)
+        self.assertTrue(torch.equal(received["tensor"], payload["tensor"]))
+
+    def test_pickled_message(self):
+        message = SessionMessage(tag="unit_test", source="sender", destination="receiver", payload="hello_world")
+
+        received = deserialize_message([pickle.dumps(message)])
+
+        self.assertEqual(received.payload, message.payload)
+
 
 if __name__ == "__main__":
     unittest.main()
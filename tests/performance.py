@@ -1,24 +1,68 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
-import os
-from time import time
+"""Benchmark suite of the simulator hot paths.
+
+It covers node attribute accessing, snapshot taking and querying with each backend, event buffer throughput,
+full episodes of built-in scenarios with several topology sizes and binary data converting and reading.
+
+Results are saved as JSON with environment metadata, and can be compared with a result saved before (baseline),
+the exit code will be 1 if any benchmark is slower than the baseline more than the threshold.
+
+Example:
+
+    .. code-block:: sh
+
+        # Run all benchmarks and save the result as baseline.
+        python tests/performance.py --output baseline.json
+
+        # Run frame benchmarks only, with less iterations, and compare with baseline.
+        python tests/performance.py --filter "^frame" --scale 0.1 --baseline baseline.json
 
-from termgraph import termgraph as tg
+NOTE:
+    Episodes of vm_scheduling are skipped if the topology data is not downloaded, as downloading data should not
+    be a part of benchmark, run the topology once (or with maro data pipeline) to prepare the data.
+"""
 
-from maro.backends.frame import (FrameBase, FrameNode, NodeAttribute, NodeBase,
-                                 node)
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from statistics import median
+from time import perf_counter
+
+import numpy as np
+import yaml
+
+from maro import __version__ as maro_version
+from maro.backends.frame import FrameBase, FrameNode, NodeAttribute, NodeBase, node
+from maro.data_lib import BinaryConverter, BinaryReader
+from maro.event_buffer import EventBuffer
+from maro.simulator import Env
 
 NODE1_NUMBER = 100
 NODE2_NUMBER = 100
-MAX_TICK = 10000
 
+# Default iterations of each kind of benchmark, scaled by --scale argument.
+ATTRIBUTE_ACCESSING_NUMBER = 100000
+TAKE_SNAPSHOT_NUMBER = 1000
+STATES_QUERYING_NUMBER = 1000
+EVENT_NUMBER = 100000
+EPISODE_DURATIONS = 1000
+BINARY_ITEM_NUMBER = 200000
+
+BACKENDS = ["static", "dynamic"]
 
-READ_WRITE_NUMBER = 10000000
-STATES_QURING_TIME = 10000
-TAKE_SNAPSHOT_TIME = 10000
+CIM_TOPOLOGIES = ["toy.4p_ssdd_l0.0", "toy.6p_sssbdd_l0.0", "global_trade.22p_l0.0"]
+CITI_BIKE_TOPOLOGIES = ["toy.3s_4t", "toy.5s_6t"]
+VM_SCHEDULING_TOPOLOGIES = ["azure.2019.10k", "azure.2019.336k"]
 
-AVG_TIME = 4
+BINARY_META_FILE = os.path.join(os.path.dirname(__file__), "data", "data_lib", "case_2", "meta.yml")
 
 
 @node("node1")
@@ -39,82 +83,403 @@ class TestFrame(FrameBase):
     node1 = FrameNode(TestNode1, NODE1_NUMBER)
     node2 = FrameNode(TestNode2, NODE2_NUMBER)
 
-    def __init__(self, backend_name):
-        super().__init__(enable_snapshot=True,
-                         total_snapshot=TAKE_SNAPSHOT_TIME, backend_name=backend_name)
+    def __init__(self, backend_name: str, total_snapshot: int):
+        super().__init__(enable_snapshot=True, total_snapshot=total_snapshot, backend_name=backend_name)
+
+
+class BenchmarkSkipped(Exception):
+    """Raised by benchmark function if it cannot run in current environment."""
+    pass
+
+
+# Benchmark name -> (function, keyword arguments).
+benchmarks = {}
+
 
+def register(name: str, func, **kwargs):
+    """Register a benchmark function.
 
-def build_frame(backend_name: str):
-    return TestFrame(backend_name)
+    The function accepts a scale factor (and registered keyword arguments), and returns a tuple of
+    (time cost in seconds, operation number), time cost should not include preparing.
+    """
+    benchmarks[name] = (func, kwargs)
 
 
-def attribute_access(frame, times: int):
-    """Return time cost (in seconds) for attribute acceesing test"""
-    start_time = time()
+def scaled(number: int, scale: float) -> int:
+    return max(1, int(number * scale))
 
-    n1 = frame.node1[0]
+
+def attribute_get(scale: float, backend_name: str):
+    times = scaled(ATTRIBUTE_ACCESSING_NUMBER, scale)
+    n1 = TestFrame(backend_name, 1).node1[0]
+
+    start_time = perf_counter()
 
     for _ in range(times):
-        a = n1.a
-        n1.a = 12
+        n1.a
 
-    return time() - start_time
+    return perf_counter() - start_time, times
 
 
-def take_snapshot(frame, times: int):
-    """Return times cost (in seconds) for take_snapshot operation"""
+def attribute_set(scale: float, backend_name: str):
+    times = scaled(ATTRIBUTE_ACCESSING_NUMBER, scale)
+    n1 = TestFrame(backend_name, 1).node1[0]
 
-    start_time = time()
+    start_time = perf_counter()
 
     for i in range(times):
-        frame.take_snapshot(i)
+        n1.a = i
 
-    return time() - start_time
+    return perf_counter() - start_time, times
 
 
-def snapshot_query(frame, times: int):
-    """Return time cost (in seconds) for snapshot querying"""
+def slot_slice_get(scale: float, backend_name: str):
+    times = scaled(ATTRIBUTE_ACCESSING_NUMBER, scale)
+    n1 = TestFrame(backend_name, 1).node1[0]
 
-    start_time = time()
+    start_time = perf_counter()
 
-    for i in range(times):
-        states = frame.snapshots["node1"][i::"a"]
+    for _ in range(times):
+        n1.e[:]
 
-    return time() - start_time
+    return perf_counter() - start_time, times
 
 
-if __name__ == "__main__":
-    chart_colors = [91, 94]
+def slot_slice_set(scale: float, backend_name: str):
+    times = scaled(ATTRIBUTE_ACCESSING_NUMBER, scale)
+    n1 = TestFrame(backend_name, 1).node1[0]
+    values = list(range(16))
+
+    start_time = perf_counter()
+
+    for _ in range(times):
+        n1.e[:] = values
+
+    return perf_counter() - start_time, times
+
+
+def take_snapshot(scale: float, backend_name: str):
+    times = scaled(TAKE_SNAPSHOT_NUMBER, scale)
+    frame = TestFrame(backend_name, times)
+
+    start_time = perf_counter()
+
+    for tick in range(times):
+        frame.take_snapshot(tick)
+
+    return perf_counter() - start_time, times
+
+
+def snapshot_query(scale: float, backend_name: str, query):
+    times = scaled(STATES_QUERYING_NUMBER, scale)
+    frame = TestFrame(backend_name, times)
+
+    for tick in range(times):
+        frame.take_snapshot(tick)
+
+    node1_snapshots = frame.snapshots["node1"]
+
+    start_time = perf_counter()
+
+    for tick in range(times):
+        query(node1_snapshots, tick)
+
+    return perf_counter() - start_time, times
+
+
+# Query shapes: name -> query function with snapshot list of node1 and tick.
+snapshot_queries = {
+    "one_node_one_attribute": lambda ss, tick: ss[tick:0:"a"],
+    "all_nodes_one_attribute": lambda ss, tick: ss[tick::"a"],
+    "all_nodes_multi_attributes": lambda ss, tick: ss[tick::["a", "b", "c", "d"]],
+    "all_nodes_slot_attribute": lambda ss, tick: ss[tick::"e"],
+    "recent_ticks_all_nodes": lambda ss, tick: ss[[max(0, tick - i) for i in range(8)]::["a", "b"]],
+}
+
+
+def event_buffer_execute(scale: float, event_store: str, disable_finished_events: bool):
+    """Insert atom events and cascade events (with immediate events) into ticks, then execute all ticks."""
+    event_number = max(4, scaled(EVENT_NUMBER, scale))
+    tick_number = max(1, event_number // 100)
+
+    eb = EventBuffer(disable_finished_events=disable_finished_events, event_store=event_store)
+
+    def on_event(evt):
+        pass
+
+    eb.register_event_handler(0, on_event)
+    eb.register_event_handler(1, on_event)
+
+    start_time = perf_counter()
+
+    # Each 4 events: 2 atom events, 1 cascade event with 1 immediate event.
+    for i in range(event_number // 4):
+        tick = i % tick_number
+
+        eb.insert_event(eb.gen_atom_event(tick, 0, i))
+        eb.insert_event(eb.gen_atom_event(tick, 0, i))
+
+        cascade_event = eb.gen_cascade_event(tick, 1, i)
+        cascade_event.add_immediate_event(eb.gen_atom_event(tick, 0, i))
+        eb.insert_event(cascade_event)
+
+    for tick in range(tick_number):
+        eb.execute(tick)
+
+    return perf_counter() - start_time, event_number // 4 * 4
+
+
+def episode(scale: float, scenario: str, topology: str):
+    """Run an episode without actions, time cost of each tick, environment creating is not included."""
+    if scenario == "vm_scheduling":
+        check_vm_scheduling_data(topology)
+
+    durations = scaled(EPISODE_DURATIONS, scale)
+    env = Env(scenario=scenario, topology=topology, durations=durations)
+
+    start_time = perf_counter()
+
+    is_done = False
+
+    while not is_done:
+        _, _, is_done = env.step(None)
+
+    return perf_counter() - start_time, durations
+
 
-    chart_args = {'filename': '-', 'title': "Performance comparison between cpp and np backends", 'width': 40,
-                  'format': '{:<5.2f}', 'suffix': '', 'no_labels': False,
-                  'color': None, 'vertical': False, 'stacked': False,
-                  'different_scale': False, 'calendar': False,
-                  'start_dt': None, 'custom_tick': '', 'delim': '',
-                  'verbose': False, 'version': False,
-                  'histogram': False, 'no_values': False}
+def check_vm_scheduling_data(topology: str):
+    config_path = os.path.join(
+        os.path.dirname(sys.modules[Env.__module__].__file__),
+        "scenarios", "vm_scheduling", "topologies", topology, "config.yml"
+    )
+
+    with open(config_path) as fp:
+        config = yaml.safe_load(fp)
+
+    for key in ("VM_TABLE", "CPU_READINGS"):
+        if not os.path.exists(os.path.expanduser(config[key])):
+            raise BenchmarkSkipped(f"data of topology {topology} is not downloaded")
+
+
+def write_trips_csv(path: str, item_number: int):
+    start_time = np.datetime64("2019-01-01 00:00:00")
+    minutes = np.sort(np.random.randint(0, 60 * 24 * 30, item_number))
+
+    with open(path, "w") as fp:
+        fp.write("start_time,duration,start_station_index,end_station_index\n")
+
+        for minute, duration, src, dest in zip(
+            minutes, np.random.randint(1, 60, item_number),
+            np.random.randint(0, 500, item_number), np.random.randint(0, 500, item_number)
+        ):
+            fp.write(f"{str(start_time + minute).replace('T', ' ')},{duration},{src},{dest}\n")
+
+
+def binary_convert(scale: float):
+    item_number = scaled(BINARY_ITEM_NUMBER, scale)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_file = os.path.join(tmp_dir, "trips.csv")
+        write_trips_csv(csv_file, item_number)
+
+        start_time = perf_counter()
+
+        converter = BinaryConverter(os.path.join(tmp_dir, "trips.bin"), BINARY_META_FILE)
+        converter.add_csv(csv_file)
+        converter.flush()
+
+        return perf_counter() - start_time, item_number
+
+
+def binary_read(scale: float, mode: str):
+    item_number = scaled(BINARY_ITEM_NUMBER, scale)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_file = os.path.join(tmp_dir, "trips.csv")
+        bin_file = os.path.join(tmp_dir, "trips.bin")
+        write_trips_csv(csv_file, item_number)
+
+        converter = BinaryConverter(bin_file, BINARY_META_FILE)
+        converter.add_csv(csv_file)
+        converter.flush()
+
+        reader = BinaryReader(bin_file)
+
+        start_time = perf_counter()
+
+        if mode == "items":
+            for _ in reader.items():
+                pass
+        elif mode == "items_block":
+            reader.items_block()
+        else:
+            # Pick items tick by tick, 1 tick is 1 minute.
+            picker = reader.items_tick_picker(0, 60 * 24 * 30, time_unit="m")
+
+            for tick in range(60 * 24 * 30):
+                for _ in picker.items(tick):
+                    pass
+
+        cost = perf_counter() - start_time
+
+        reader.close()
+
+        return cost, item_number
+
+
+for backend_name in BACKENDS:
+    register(f"frame.{backend_name}.attribute_get", attribute_get, backend_name=backend_name)
+    register(f"frame.{backend_name}.attribute_set", attribute_set, backend_name=backend_name)
+    register(f"frame.{backend_name}.slot_slice_get", slot_slice_get, backend_name=backend_name)
+    register(f"frame.{backend_name}.slot_slice_set", slot_slice_set, backend_name=backend_name)
+    register(f"snapshot.{backend_name}.take_snapshot", take_snapshot, backend_name=backend_name)
+
+    for query_name, query in snapshot_queries.items():
+        register(f"snapshot.{backend_name}.query.{query_name}", snapshot_query, backend_name=backend_name, query=query)
+
+for event_store in ("dict", "heap"):
+    register(
+        f"event_buffer.{event_store}.execute", event_buffer_execute,
+        event_store=event_store, disable_finished_events=False
+    )
+    register(
+        f"event_buffer.{event_store}.execute_with_event_pool", event_buffer_execute,
+        event_store=event_store, disable_finished_events=True
+    )
+
+for scenario, topologies in (
+    ("cim", CIM_TOPOLOGIES), ("citi_bike", CITI_BIKE_TOPOLOGIES), ("vm_scheduling", VM_SCHEDULING_TOPOLOGIES)
+):
+    for topology in topologies:
+        register(f"episode.{scenario}.{topology}", episode, scenario=scenario, topology=topology)
+
+register("binary.convert", binary_convert)
+
+for mode in ("items", "items_block", "items_tick_picker"):
+    register(f"binary.read.{mode}", binary_read, mode=mode)
+
+
+def get_metadata(args) -> dict:
+    """Environment metadata, results are comparable only if they are from same environment."""
+    try:
+        git_commit = subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        git_commit = None
+
+    return {
+        "time": datetime.utcnow().isoformat(),
+        "maro_version": maro_version,
+        "git_commit": git_commit,
+        "python_version": platform.python_version(),
+        "python_implementation": platform.python_implementation(),
+        "numpy_version": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "scale": args.scale,
+        "repeat": args.repeat
+    }
+
+
+def run(args) -> dict:
+    results = {}
+    name_pattern = re.compile(args.filter) if args.filter else None
+
+    for name, (func, kwargs) in benchmarks.items():
+        if name_pattern is not None and name_pattern.search(name) is None:
+            continue
+
+        # Seed for the benchmarks that generate data.
+        np.random.seed(0)
+
+        try:
+            time_per_op_list = []
+
+            for _ in range(args.repeat):
+                cost, op_number = func(args.scale, **kwargs)
+
+                time_per_op_list.append(cost / op_number)
+        except BenchmarkSkipped as ex:
+            print(f"{name:<60} skipped: {ex}")
+
+            continue
+
+        results[name] = {
+            "op_number": op_number,
+            "min_time_per_op": min(time_per_op_list),
+            "median_time_per_op": median(time_per_op_list)
+        }
+
+        print(f"{name:<60} {min(time_per_op_list) * 1e6:>14.3f} us/op  ({op_number} ops)")
+
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Compare results with baseline by min time per operation, return the names of regressed benchmarks."""
+    regressions = []
+
+    metadata = baseline["metadata"]
+
+    print(f"\nComparing with baseline from {metadata['time']} (commit {metadata['git_commit']})")
+
+    for name, result in results.items():
+        if name not in baseline["results"]:
+            continue
+
+        ratio = result["min_time_per_op"] / baseline["results"][name]["min_time_per_op"]
+
+        if ratio > 1 + threshold:
+            status = "REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            status = "improved"
+        else:
+            status = ""
+
+        print(f"{name:<60} {ratio:>8.2f}x  {status}")
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark suite of the simulator.")
+    parser.add_argument("--filter", type=str, default=None, help="Regex to select benchmarks by name.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Scale factor of iterations and durations.")
+    parser.add_argument("--repeat", type=int, default=3, help="Times to run each benchmark, min time is used.")
+    parser.add_argument("--output", type=str, default=None, help="Path to save result JSON.")
+    parser.add_argument("--baseline", type=str, default=None, help="Path of baseline result JSON to compare.")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="Allowed slowdown ratio before reporting regression."
+    )
+    parser.add_argument("--list", action="store_true", help="List benchmark names only.")
 
-    chart_labels = [f'attribute accessing ({READ_WRITE_NUMBER})',
-                    f'take snapshot ({STATES_QURING_TIME})', f'states querying ({STATES_QURING_TIME})']
+    args = parser.parse_args()
 
-    chart_data = [[0.0, 0.0], [0.0, 0.0], [0.0, 0.0]]
+    if args.list:
+        print("\n".join(benchmarks.keys()))
 
-    i = 0
-    j = 0
+        sys.exit(0)
 
-    for backend_name in ["static", "dynamic"]:
-        frame = build_frame(backend_name)
+    report = {"metadata": get_metadata(args), "results": run(args)}
 
-        j = 0
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(report, fp, indent=2)
 
-        for func, args in [(attribute_access, READ_WRITE_NUMBER), (take_snapshot, TAKE_SNAPSHOT_TIME), (snapshot_query, STATES_QURING_TIME)]:
-            t = func(frame, args)
+    if args.baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
 
-            chart_data[j][i] = t
+        if baseline["metadata"]["scale"] != args.scale:
+            print(f"WARNING: baseline is run with scale {baseline['metadata']['scale']}, results may not comparable.")
 
-            j += 1
+        regressions = compare(report["results"], baseline, args.threshold)
 
-        i += 1
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed more than {args.threshold:.0%}.")
 
-    tg.print_categories(['static', 'dynamic'], chart_colors)
-    tg.chart(chart_colors, chart_data, chart_args, chart_labels)
+            sys.exit(1)
@@ -1,10 +1,14 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT licence
 
+import copy
 import os
+import random
 import tempfile
 import unittest
 
+from yaml import safe_dump, safe_load
+
 from maro.data_lib import BinaryConverter, BinaryReader
 from maro.data_lib.item_meta import BinaryMeta
 
@@ -149,6 +153,155 @@ class TestBinaryConverter(unittest.TestCase):
         self.assertEqual(1, l)
 
 
+    def test_read_block(self):
+        out_dir = tempfile.mkdtemp()
+
+        out_bin = os.path.join(out_dir, "trips.bin")
+
+        meta_file = os.path.join("tests", "data", "data_lib", "case_2", "meta.yml")
+        csv_file = os.path.join("tests", "data", "data_lib", "trips.csv")
+
+        bct = BinaryConverter(out_bin, meta_file)
+
+        bct.add_csv(csv_file)
+
+        bct.flush()
+
+        reader = BinaryReader(out_bin)
+
+        # block should contains all items with same fields
+        items = reader.items_block()
+
+        self.assertTupleEqual(('timestamp', 'durations', 'src_station', 'dest_station'), items._fields)
+        self.assertListEqual([0, 0, 1, 0], list(items.src_station))
+        self.assertListEqual([item.timestamp for item in reader.items()], list(items.timestamp))
+
+        # time range filter
+        items = reader.items_block(start_time_offset=1, end_time_offset=1, time_unit="m")
+
+        self.assertListEqual([0, 1], list(items.src_station))
+
+        # pick by tick, should be same as item picker
+        item_picker = reader.items_tick_picker(0, 10, time_unit="m")
+        block_picker = reader.items_tick_block_picker(0, 10, time_unit="m")
+
+        for tick in range(10):
+            expected = [tuple(item) for item in item_picker.items(tick)]
+            items = block_picker.items(tick)
+
+            self.assertListEqual(expected, list(zip(*items)))
+
+        # ticks can be picked in any order
+        self.assertEqual(1, len(block_picker.items(5).timestamp))
+        self.assertEqual(2, len(block_picker.items(1).timestamp))
+        self.assertEqual(0, len(block_picker.items(20).timestamp))
+
+        reader.close()
+
+    def test_copy_tick_picker(self):
+        out_dir = tempfile.mkdtemp()
+
+        out_bin = os.path.join(out_dir, "trips.bin")
+
+        meta_file = os.path.join("tests", "data", "data_lib", "case_2", "meta.yml")
+        csv_file = os.path.join("tests", "data", "data_lib", "trips.csv")
+
+        bct = BinaryConverter(out_bin, meta_file)
+
+        bct.add_csv(csv_file)
+
+        bct.flush()
+
+        reader = BinaryReader(out_bin)
+
+        item_picker = reader.items_tick_picker(0, 10, time_unit="m")
+
+        expected = [[tuple(item) for item in item_picker.items(tick)] for tick in range(10)]
+
+        item_picker = reader.items_tick_picker(0, 10, time_unit="m")
+
+        self.assertListEqual(expected[0], [tuple(item) for item in item_picker.items(0)])
+
+        # copied picker should continue from same position, and not affect the original one
+        picker_copy = copy.deepcopy(item_picker)
+
+        for tick in range(1, 10):
+            self.assertListEqual(expected[tick], [tuple(item) for item in picker_copy.items(tick)])
+
+        for tick in range(1, 10):
+            self.assertListEqual(expected[tick], [tuple(item) for item in item_picker.items(tick)])
+
+        reader.close()
+
+    def test_convert_with_workers(self):
+        out_dir = tempfile.mkdtemp()
+
+        meta_file = os.path.join("tests", "data", "data_lib", "case_1", "meta.yml")
+        csv_file = os.path.join("tests", "data", "data_lib", "trips.csv")
+
+        out_bins = []
+
+        # small chunk size to make sure each worker get few lines
+        for workers, chunk_size in [(1, 16 * 1024 * 1024), (2, 1), (3, 30)]:
+            out_bin = os.path.join(out_dir, f"trips_{workers}.bin")
+
+            bct = BinaryConverter(out_bin, meta_file, workers=workers, chunk_size=chunk_size)
+
+            bct.add_csv(csv_file)
+            bct.add_csv(csv_file)
+
+            self.assertFalse(bct.is_sorted)
+
+            bct.flush()
+
+            del bct
+
+            out_bins.append(out_bin)
+
+        contents = []
+
+        for out_bin in out_bins:
+            with open(out_bin, "rb") as fp:
+                contents.append(fp.read())
+
+        # output should be same as single process
+        self.assertEqual(contents[0], contents[1])
+        self.assertEqual(contents[0], contents[2])
+
+    def test_convert_with_sorting(self):
+        out_dir = tempfile.mkdtemp()
+
+        out_bin = os.path.join(out_dir, "trips.bin")
+
+        meta_file = os.path.join("tests", "data", "data_lib", "case_1", "meta.yml")
+        csv_file = os.path.join("tests", "data", "data_lib", "trips.csv")
+
+        bct = BinaryConverter(out_bin, meta_file, sort_by_timestamp=True)
+
+        bct.add_csv(csv_file)
+
+        self.assertTrue(bct.is_sorted)
+
+        bct.add_csv(csv_file)
+
+        self.assertFalse(bct.is_sorted)
+
+        bct.flush()
+
+        self.assertTrue(bct.is_sorted)
+
+        reader = BinaryReader(out_bin)
+
+        self.assertEqual(8, reader.header.item_count)
+
+        items = list(reader.items())
+
+        # stable sorted by timestamp
+        self.assertListEqual([0, 0, 60, 60, 60, 60, 300, 300], [item.timestamp - items[0].timestamp for item in items])
+        self.assertListEqual([0, 0, 0, 1, 0, 1, 0, 0], [item.src_station for item in items])
+
+        reader.close()
+
     def test_convert_without_meta_timestamp(self):
         out_dir = tempfile.mkdtemp()
 
@@ -161,6 +314,42 @@ class TestBinaryConverter(unittest.TestCase):
         with self.assertRaises(Exception) as ctx:
             bct = BinaryConverter(out_bin, meta_file)
 
+    def test_read_block_with_value_adjust(self):
+        out_dir = tempfile.mkdtemp()
+
+        out_bin = os.path.join(out_dir, "trips.bin")
+        meta_file = os.path.join(out_dir, "meta.yml")
+
+        csv_file = os.path.join("tests", "data", "data_lib", "trips.csv")
+
+        with open(os.path.join("tests", "data", "data_lib", "case_2", "meta.yml")) as fp:
+            meta = safe_load(fp)
+
+        meta["entity"]["durations"]["adjust_ratio"] = [0, 50]
+        meta["entity"]["dest_station"]["adjust_ratio"] = [-20, 20]
+
+        with open(meta_file, "w") as fp:
+            safe_dump(meta, fp)
+
+        bct = BinaryConverter(out_bin, meta_file)
+
+        bct.add_csv(csv_file)
+
+        bct.flush()
+
+        reader = BinaryReader(out_bin, enable_value_adjust=True)
+
+        # same values are adjusted by item and by block with same seed
+        random.seed(10)
+        expected = [tuple(item) for item in reader.items()]
+
+        random.seed(10)
+        items = reader.items_block()
+
+        self.assertListEqual(expected, list(zip(*[column.tolist() for column in items])))
+
+        reader.close()
+
 
 if __name__ == "__main__":
     unittest.main()
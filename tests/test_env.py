@@ -2,14 +2,19 @@
 # Licensed under the MIT license.
 
 import os
+import random
+import tempfile
 import unittest
+from unittest.mock import patch
 
 import numpy as np
 from dummy.dummy_business_engine import DummyEngine
 
+from maro.backends.np_backend import NPHistoryReader
 from maro.simulator.utils import get_available_envs, get_scenarios, get_topologies
 from maro.simulator.utils.common import frame_index_to_ticks
 from maro.simulator.core import BusinessEngineNotFoundError, Env
+from maro.simulator.scenarios.cim.common import Action
 from tests.utils import backends_to_test
 
 
@@ -21,6 +26,35 @@ def run_to_end(env: Env):
         _, _, is_done = env.step(None)
 
 
+def run_with_actions(env: Env, rng: random.Random, decision_event=None, max_steps: int = None):
+    """Run env with random actions, until the end or the specified steps."""
+    steps = 0
+
+    while True:
+        action = None
+
+        if decision_event is not None:
+            scope = decision_event.action_scope
+            action = Action(
+                decision_event.vessel_idx, decision_event.port_idx, rng.randint(-scope.load, scope.discharge)
+            )
+
+        metrics, decision_event, is_done = env.step(action)
+        steps += 1
+
+        if is_done or (max_steps is not None and steps >= max_steps):
+            return metrics, decision_event, is_done
+
+
+def make_cim_env() -> Env:
+    env = Env(scenario="cim", topology="toy.5p_ssddd_l0.0", durations=100)
+
+    env.set_seed(3)
+    env.reset()
+
+    return env
+
+
 class TestEnv(unittest.TestCase):
     """
     this test will use dummy scenario
@@ -44,6 +78,113 @@ class TestEnv(unittest.TestCase):
             self.assertEqual(
                 ports_number, 5, msg=f"5pssddd topology should contains 5 ports, got {ports_number}")
 
+    def test_builtin_scenario_with_heap_event_store(self):
+        """Test if heap event store get same result as default one"""
+        max_tick = 50
+        metrics_list = []
+        states_list = []
+
+        for event_store in ("dict", "heap"):
+            env = Env(scenario="cim", topology="toy.5p_ssddd_l0.0",
+                      durations=max_tick, options={"event-store": event_store})
+
+            env.set_seed(1)
+            env.reset()
+            run_to_end(env)
+
+            metrics_list.append(dict(env.metrics))
+            states_list.append(env.snapshot_list["ports"][::["empty", "full", "shortage"]])
+
+        self.assertDictEqual(metrics_list[0], metrics_list[1])
+        self.assertTrue((states_list[0] == states_list[1]).all())
+
+    @patch.dict(os.environ, {"DEFAULT_BACKEND_NAME": "static"})
+    def test_fork(self):
+        """Test if forked env get same result as the original one, and they do not affect each other"""
+        # Only static backend supports copying.
+        env = make_cim_env()
+        expected_metrics, _, _ = run_with_actions(env, random.Random(1))
+        expected_states = env.snapshot_list["ports"][::["empty", "full", "shortage"]]
+
+        env = make_cim_env()
+        rng = random.Random(1)
+        _, decision_event, _ = run_with_actions(env, rng, max_steps=20)
+
+        # Forked env with same actions should get same result.
+        forked_env = env.fork()
+        forked_rng = random.Random()
+        forked_rng.setstate(rng.getstate())
+
+        metrics, _, _ = run_with_actions(forked_env, forked_rng, decision_event)
+
+        self.assertDictEqual(dict(expected_metrics), dict(metrics))
+
+        # Forked env with different actions should not affect the original one.
+        forked_env = env.fork()
+        run_with_actions(forked_env, random.Random(99), decision_event)
+
+        metrics, _, _ = run_with_actions(env, rng, decision_event)
+
+        self.assertDictEqual(dict(expected_metrics), dict(metrics))
+        self.assertTrue((expected_states == env.snapshot_list["ports"][::["empty", "full", "shortage"]]).all())
+
+        # Fork a finished env.
+        self.assertTupleEqual((None, None, True), env.fork().step(None))
+
+    @patch.dict(os.environ, {"DEFAULT_BACKEND_NAME": "dynamic"})
+    def test_fork_with_dynamic_backend(self):
+        """Test if forking env fails as copying is not supported by dynamic backend"""
+        env = make_cim_env()
+        run_with_actions(env, random.Random(1), max_steps=20)
+
+        with self.assertRaises(NotImplementedError):
+            env.fork()
+
+        with self.assertRaises(NotImplementedError):
+            env.dump()
+
+    @patch.dict(os.environ, {"DEFAULT_BACKEND_NAME": "static"})
+    def test_close_with_history(self):
+        """Test if history files are flushed and closed when closing env"""
+        with tempfile.TemporaryDirectory() as history_folder:
+            env = make_cim_env()
+            env.current_frame.enable_history(history_folder, capacity=2)
+
+            run_with_actions(env, random.Random(1))
+
+            env.close()
+
+            reader = NPHistoryReader(os.path.join(history_folder, "ports.bin"))
+
+            # History keeps all the snapshots, including the ones at same tick.
+            self.assertLessEqual(len(env.snapshot_list), len(reader))
+            self.assertEqual(env.frame_index, reader.ticks[-1])
+
+            del reader
+
+    @patch.dict(os.environ, {"DEFAULT_BACKEND_NAME": "static"})
+    def test_dump_and_restore(self):
+        """Test if env can be restored from checkpoint repeatedly"""
+        env = make_cim_env()
+        rng = random.Random(1)
+        _, decision_event, _ = run_with_actions(env, rng, max_steps=20)
+
+        checkpoint = env.dump()
+        rng_state = rng.getstate()
+
+        expected_metrics, _, _ = run_with_actions(env, rng, decision_event)
+        expected_metrics = dict(expected_metrics)
+        expected_states = env.snapshot_list["ports"][::["empty", "full", "shortage"]]
+
+        for _ in range(2):
+            env.restore(checkpoint)
+            rng.setstate(rng_state)
+
+            metrics, _, _ = run_with_actions(env, rng, decision_event)
+
+            self.assertDictEqual(expected_metrics, dict(metrics))
+            self.assertTrue((expected_states == env.snapshot_list["ports"][::["empty", "full", "shortage"]]).all())
+
     def test_env_interfaces_with_specified_business_engine_cls(self):
         """Test if env interfaces works as expect"""
         for backend_name in backends_to_test:
@@ -152,6 +152,78 @@ class TestEventBuffer(unittest.TestCase):
         self.assertEqual(sub1, decision_events[0])
         self.assertEqual(sub2, decision_events[1])
 
+    def test_insert_event_to_head(self):
+        """Test events inserted to head executed before the ones already inserted"""
+        executed = []
+
+        def cb(evt):
+            executed.append((evt.tick, evt.payload))
+
+            # insert to head of executing tick, it will be the next one to execute
+            if evt.payload == "b":
+                self.eb.insert_event_to_head(self.eb.gen_atom_event(evt.tick, 1, "e"))
+
+        self.eb.register_event_handler(1, cb)
+
+        self.eb.insert_event_to_head(self.eb.gen_atom_event(2, 1, "a"))
+        self.eb.insert_event(self.eb.gen_atom_event(2, 1, "c"))
+        self.eb.insert_event(self.eb.gen_atom_event(2, 1, "d"))
+        self.eb.insert_event_to_head(self.eb.gen_atom_event(2, 1, "b"))
+        self.eb.insert_event(self.eb.gen_atom_event(3, 1, "f"))
+
+        self.assertListEqual(["b", "a", "c", "d"], [evt.payload for evt in self.eb.get_pending_events(2)])
+
+        for tick in range(4):
+            self.eb.execute(tick)
+
+        self.assertListEqual([(2, "b"), (2, "e"), (2, "a"), (2, "c"), (2, "d"), (3, "f")], executed)
+
+
+class TestHeapEventBuffer(TestEventBuffer):
+    """Run the same cases with heap event store"""
+    def setUp(self):
+        self.eb = EventBuffer(event_store="heap")
+
+    def test_reset(self):
+        """Test reset, all pending events should be cleared"""
+        evt = self.eb.gen_atom_event(1, 1, 1)
+
+        self.eb.insert_event(evt)
+
+        self.eb.reset()
+
+        self.assertEqual(len(self.eb._pending_events), 0)
+        self.assertEqual(0, len(self.eb.get_pending_events(1)))
+        self.assertEqual(len(self.eb._finished_events), 0)
+
+    def test_execute_order(self):
+        """Test if events executed by tick, then insert order"""
+        executed = []
+
+        def cb(evt):
+            executed.append((evt.tick, evt.payload))
+
+            # event for current tick inserted by handler will be executed at the end of this tick
+            if evt.payload == "a":
+                self.eb.insert_event(self.eb.gen_atom_event(evt.tick, 1, "c"))
+
+        self.eb.register_event_handler(1, cb)
+
+        for tick, payload in [(5, "x"), (3, "a"), (10, "y"), (3, "b"), (5, "z")]:
+            self.eb.insert_event(self.eb.gen_atom_event(tick, 1, payload))
+
+        self.assertListEqual(["x", "z"], [evt.payload for evt in self.eb.get_pending_events(5)])
+
+        for tick in range(11):
+            self.eb.execute(tick)
+
+        self.assertListEqual([(3, "a"), (3, "b"), (3, "c"), (5, "x"), (5, "z"), (10, "y")], executed)
+        self.assertEqual(len(self.eb._pending_events), 1)
+
+    def test_invalid_event_store(self):
+        with self.assertRaises(ValueError):
+            EventBuffer(event_store="not_exist")
+
 
 if __name__ == "__main__":
     unittest.main()
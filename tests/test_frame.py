@@ -1,6 +1,7 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import copy
 import os
 import math
 import unittest
@@ -14,6 +15,7 @@ from maro.backends.frame import (FrameBase, FrameNode, NodeAttribute, NodeBase,
                                  node)
 from maro.utils.exception.backends_exception import (
     BackendsArrayAttributeAccessException, BackendsGetItemInvalidException,
+    BackendsInvalidAttributeException, BackendsInvalidNodeException,
     BackendsSetItemInvalidException)
 from tests.utils import backends_to_test
 
@@ -188,6 +190,102 @@ class TestFrame(unittest.TestCase):
             self.assertListEqual([0, 0], list(
                 frame.static_nodes[0].a1[:]), msg="static node's a1 should be [0, 0] after reset")
 
+    def test_copy(self):
+        """Test if copied frame has same values and snapshots, and independent with the original one"""
+        # NOTE: this case only support numpy backend
+        frame = build_frame(enable_snapshot=True, backend_name="static")
+
+        frame.static_nodes[0].a1[:] = (1, 234)
+        frame.dynamic_nodes[1].b2 = 12.34
+        frame.take_snapshot(0)
+
+        frame_copy = copy.deepcopy(frame)
+
+        self.assertListEqual([1, 234], list(frame_copy.static_nodes[0].a1[:]))
+        self.assertEqual(12.34, frame_copy.dynamic_nodes[1].b2)
+        self.assertEqual(1, len(frame_copy.snapshots))
+        self.assertListEqual(
+            [1, 234], list(frame_copy.snapshots["static"][0:0:"a1"].flatten()[:2])
+        )
+
+        # changes of copy should not affect the original one
+        frame_copy.static_nodes[0].a1[0] = 100
+        frame_copy.take_snapshot(1)
+
+        self.assertEqual(1, frame.static_nodes[0].a1[0])
+        self.assertEqual(1, len(frame.snapshots))
+        self.assertEqual(2, len(frame_copy.snapshots))
+
+        # raw backend does not support copying
+        with self.assertRaises(NotImplementedError):
+            copy.deepcopy(build_frame(backend_name="dynamic"))
+
+    def test_bulk_attribute_access(self):
+        for backend_name in backends_to_test:
+            frame = build_frame(backend_name=backend_name)
+
+            # attribute with 1 slot
+            frame.set_node_attribute_values("dynamic", "b2", np.arange(DYNAMIC_NODE_NUM) * 1.5)
+
+            b2 = frame.get_node_attribute_values("dynamic", "b2")
+
+            self.assertEqual(np.float64, b2.dtype)
+            self.assertListEqual([i * 1.5 for i in range(DYNAMIC_NODE_NUM)], list(b2))
+            self.assertListEqual(list(b2), [n.b2 for n in frame.dynamic_nodes])
+
+            # specified nodes
+            frame.set_node_attribute_values("static", "a2", [3, 4], [1, 3])
+
+            self.assertListEqual([0, 3, 0, 4, 0], list(frame.get_node_attribute_values("static", "a2")))
+            self.assertListEqual([4, 3], list(frame.get_node_attribute_values("static", "a2", np.array([3, 1]))))
+
+            # attribute with 2 slots, and broadcasting
+            frame.set_node_attribute_values("static", "a1", [1, 2])
+            frame.set_node_attribute_values("static", "a1", [[5, 6]], [4])
+
+            a1 = frame.get_node_attribute_values("static", "a1")
+
+            self.assertTupleEqual((STATIC_NODE_NUM, 2), a1.shape)
+            self.assertListEqual([[1, 2]] * (STATIC_NODE_NUM - 1) + [[5, 6]], a1.tolist())
+            self.assertListEqual([5, 6], frame.static_nodes[4].a1[:])
+
+            # result is a copy
+            a1[:] = 0
+
+            self.assertListEqual([1, 2], frame.static_nodes[0].a1[:])
+
+            with self.assertRaises(BackendsInvalidAttributeException):
+                frame.get_node_attribute_values("static", "b1")
+
+            with self.assertRaises(BackendsInvalidNodeException):
+                frame.get_node_attribute_values("none", "b1")
+
+    def test_bulk_attribute_access_callback(self):
+        changed_values = []
+
+        @node("callback")
+        class CallbackNode(NodeBase):
+            a = NodeAttribute("i")
+
+            def _on_a_changed(self, value):
+                changed_values.append((self.index, value, self.a))
+
+        class CallbackFrame(FrameBase):
+            callback_nodes = FrameNode(CallbackNode, 3)
+
+            def __init__(self, backend_name):
+                super().__init__(backend_name=backend_name)
+
+        for backend_name in backends_to_test:
+            changed_values.clear()
+
+            frame = CallbackFrame(backend_name)
+
+            frame.set_node_attribute_values("callback", "a", [7, 8], [2, 0])
+
+            # callbacks are invoked after all the values are set
+            self.assertListEqual([(2, 7, 7), (0, 8, 8)], changed_values)
+
     def test_append_nodes(self):
         # NOTE: this case only support raw backend
         frame = build_frame(enable_snapshot=True,
@@ -1,11 +1,16 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import os
 import sys
+import tempfile
 import unittest
 
 import numpy as np
-from test_frame import DYNAMIC_NODE_NUM, STATIC_NODE_NUM, build_frame
+from test_frame import DYNAMIC_NODE_NUM, STATIC_NODE_NUM, StaticNode, build_frame
+
+from maro.backends.frame import FrameBase, FrameNode
+from maro.backends.np_backend import NPHistoryReader
 
 from tests.utils import backends_to_test
 
@@ -227,6 +232,72 @@ class TestFrame(unittest.TestCase):
                 self.assertListEqual(list(states[1].astype("i")), [
                                      0]*STATIC_NODE_NUM)
 
+    def test_quering_multiple_attributes_with_slots(self):
+        """Test if result layout is tick -> node -> attribute -> slot"""
+        # NOTE: raw backend will padding slots with nan to get a 4 dim result, so only test numpy backend here
+        frm = build_frame(True, total_snapshot=3, backend_name="static")
+
+        for tick in range(4):
+            for node in frm.static_nodes:
+                node.a1[:] = [tick * 10 + node.index, -tick]
+                node.a2 = tick + node.index
+                node.a3 = tick * 1000
+
+            frm.take_snapshot(tick)
+
+        # tick 0 is over-wrote, tick 5 not exist
+        states = frm.snapshots["static"][(0, 2, 3, 5):(4, 1):["a2", "a1", "a3"]]
+
+        self.assertEqual(np.float32, states.dtype)
+
+        states = states.reshape(4, 2, -1)
+
+        self.assertListEqual(list(states[1, 0].astype("i")), [6, 24, -2, 2000])
+        self.assertListEqual(list(states[2, 1].astype("i")), [4, 31, -3, 3000])
+        self.assertTrue((states[0] == 0).all())
+        self.assertTrue((states[3] == 0).all())
+
+    def test_quering_with_native_dtype(self):
+        """Test if numpy backend keep attribute data type with query_native_dtype option"""
+        class MyFrame(FrameBase):
+            static_nodes = FrameNode(StaticNode, STATIC_NODE_NUM)
+
+            def __init__(self):
+                super().__init__(enable_snapshot=True, total_snapshot=2,
+                                 options={"query_native_dtype": True}, backend_name="static")
+
+        frm = MyFrame()
+
+        for node in frm.static_nodes:
+            node.a2 = node.index
+            node.a3 = node.index * 10
+
+        frm.take_snapshot(0)
+
+        # 1 tick, 1 attribute with continuous nodes, should be a read-only view
+        states = frm.snapshots["static"][0:[1, 2, 3]:"a2"]
+
+        self.assertEqual(np.int16, states.dtype)
+        self.assertFalse(states.flags.writeable)
+        self.assertListEqual(list(states), [1, 2, 3])
+
+        # mixed attributes will be promoted
+        states = frm.snapshots["static"][(0, 1)::["a2", "a3"]]
+
+        self.assertEqual(np.result_type(np.int16, states.dtype), states.dtype)
+        self.assertTrue(np.issubdtype(states.dtype, np.integer))
+
+        states = states.reshape(2, STATIC_NODE_NUM, 2)
+
+        self.assertListEqual(list(states[0, :, 1]), [i * 10 for i in range(STATIC_NODE_NUM)])
+        self.assertTrue((states[1] == 0).all())
+
+        # without the option, result should be float as before
+        frm = build_frame(True, backend_name="static")
+        frm.take_snapshot(0)
+
+        self.assertEqual(np.float32, frm.snapshots["static"][0::"a2"].dtype)
+
     def test_get_attribute_with_undefined_attribute(self):
         for backend_name in backends_to_test:
             frm = build_frame(True, backend_name=backend_name)
@@ -239,6 +310,102 @@ class TestFrame(unittest.TestCase):
             # not exist node name
             self.assertIsNone(frm.snapshots["hehe"])
 
+    def test_snapshot_with_partial_changes(self):
+        """Test if snapshots are correct when only part of nodes changed between them"""
+        for backend_name in backends_to_test:
+            # Large enough to have multiple blocks in raw backend.
+            node_number = 200
+
+            class MyFrame(FrameBase):
+                static_nodes = FrameNode(StaticNode, node_number)
+
+                def __init__(self):
+                    super().__init__(enable_snapshot=True, total_snapshot=3, backend_name=backend_name)
+
+            frame = MyFrame()
+            expected_states = {}
+            cur_states = np.zeros((node_number, 2), dtype=np.int32)
+
+            for tick in range(5):
+                for node_index in range(tick, node_number, 50):
+                    frame.static_nodes[node_index].a1[1] = tick + 1
+                    cur_states[node_index, 1] = tick + 1
+
+                frame.take_snapshot(tick)
+
+                expected_states[tick] = cur_states.copy()
+
+            # Take snapshot again at same tick after changing.
+            frame.static_nodes[0].a1[0] = 100
+            cur_states[0, 0] = 100
+
+            frame.take_snapshot(4)
+
+            expected_states[4] = cur_states.copy()
+
+            self.assertListEqual([2, 3, 4], list(frame.snapshots.get_frame_index_list()))
+
+            for tick in (2, 3, 4):
+                states = frame.snapshots["static"][tick::"a1"].reshape(node_number, 2)
+
+                self.assertTrue((expected_states[tick] == states).all(), msg=f"{backend_name}, tick {tick}")
+
+            if backend_name == "dynamic":
+                # New nodes after snapshot should be padding in old snapshots.
+                frame.append_node("static", 10)
+                frame.static_nodes[node_number].a1[0] = 1
+
+                frame.take_snapshot(5)
+
+                states = frame.snapshots["static"][::"a1"].reshape(3, node_number + 10, 2)
+
+                self.assertTrue(np.isnan(states[:2, node_number:]).all())
+                self.assertEqual(1, states[2, node_number, 0])
+                self.assertTrue((expected_states[4] == states[2, :node_number]).all())
+                self.assertTrue((expected_states[4] == states[1, :node_number]).all())
+
+    def test_history(self):
+        """Test if history keeps all snapshots, and can be read after running"""
+        for background_flush in (False, True):
+            with tempfile.TemporaryDirectory() as history_folder:
+                frame = build_frame(True, total_snapshot=2, backend_name="static")
+
+                # Small capacity to make sure file will be extended.
+                frame.enable_history(history_folder, capacity=2, flush_interval=3, background_flush=background_flush)
+
+                for tick in range(5):
+                    for node in frame.static_nodes:
+                        node.a1[:] = [tick, node.index]
+                        node.a2 = tick * 10
+
+                    frame.take_snapshot(tick)
+
+                # Same tick again, history will keep both.
+                frame.static_nodes[0].a2 = 100
+                frame.take_snapshot(4)
+
+                # History continues after reset.
+                frame.reset()
+                frame.snapshots.reset()
+                frame.take_snapshot(0)
+
+                # Files must be closed before removing the folder.
+                frame.close_history()
+
+                reader = NPHistoryReader(os.path.join(history_folder, "static.bin"))
+
+                self.assertEqual(7, len(reader))
+                self.assertEqual(STATIC_NODE_NUM, reader.node_number)
+                self.assertListEqual([0, 1, 2, 3, 4, 4, 0], list(reader.ticks))
+
+                self.assertListEqual([[2, i] for i in range(STATIC_NODE_NUM)], reader[2]["a1"].tolist())
+                self.assertListEqual([100] + [40] * (STATIC_NODE_NUM - 1), reader[4]["a2"].tolist())
+                self.assertListEqual([0] * STATIC_NODE_NUM, reader[0]["a2"].tolist())
+
+                self.assertListEqual([0, 10, 20, 30, 40, 40, 0], list(reader.get_attribute("a2")[:, 1]))
+
+                del reader
+
 
 if __name__ == "__main__":
     unittest.main()
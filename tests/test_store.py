@@ -3,7 +3,9 @@
 
 import unittest
 
-from maro.rl import ColumnBasedStore, OverwriteType
+import numpy as np
+
+from maro.rl import ArrayBasedStore, ColumnBasedStore, OverwriteType
 
 
 class TestUnboundedStore(unittest.TestCase):
@@ -66,5 +68,86 @@ class TestFixedSizeStore(unittest.TestCase):
             self.assertIn(i, indexes, msg=f"expected overwrite index in {indexes}, got {i}")
 
 
+class TestArrayBasedStore(unittest.TestCase):
+    def test_put_and_get(self):
+        store = ArrayBasedStore(initial_size=2)
+        indexes = store.put({"state": [np.ones(3), np.zeros(3)], "action": [1, 2], "event": ["e1", "e2"]})
+        self.assertEqual(indexes, [0, 1])
+        indexes = store.put({"state": np.full(3, 2.0), "action": 3, "event": None})
+        self.assertEqual(indexes, [2])
+        self.assertEqual(len(store), 3)
+        actual = store.get([2, 0])
+        self.assertEqual(actual["state"].shape, (2, 3))
+        self.assertTrue(np.array_equal(actual["state"], [[2.0, 2.0, 2.0], [1.0, 1.0, 1.0]]))
+        self.assertEqual(actual["action"].tolist(), [3, 1])
+        self.assertEqual(actual["event"].tolist(), [None, "e1"])
+        self.assertEqual([item["action"] for item in store], [1, 2, 3])
+
+    def test_update(self):
+        store = ArrayBasedStore(capacity=5, overwrite_type=OverwriteType.ROLLING)
+        store.put({"a": [1, 2, 3, 4, 5], "b": [6, 7, 8, 9, 10], "c": [11, 12, 13, 14, 15]})
+        store.update(np.array([0, 3]), {"a": [-1, -4], "c": [-11, -14]})
+        actual = {k: v.tolist() for k, v in store.dumps().items()}
+        expected = {"a": [-1, 2, 3, -4, 5], "b": [6, 7, 8, 9, 10], "c": [-11, 12, 13, -14, 15]}
+        self.assertEqual(actual, expected, msg=f"expected store content = {expected}, got {actual}")
+
+    def test_put_with_rolling_overwrite(self):
+        store = ArrayBasedStore(capacity=5, overwrite_type=OverwriteType.ROLLING)
+        store.put({"a": [1, 2, 3], "b": [4, 5, 6]})
+        indexes = store.put({"a": [10, 11, 12, 13], "b": [14, 15, 16, 17]})
+        expected = [3, 4, 0, 1]
+        self.assertEqual(indexes, expected, msg=f"expected indexes = {expected}, got {indexes}")
+        indexes = store.put({"a": [20, 21], "b": [22, 23]})
+        expected = [2, 3]
+        self.assertEqual(indexes, expected, msg=f"expected indexes = {expected}, got {indexes}")
+        self.assertEqual(store.get_by_key("a").tolist(), [12, 13, 20, 21, 11])
+
+    def test_put_with_random_overwrite(self):
+        store = ArrayBasedStore(capacity=5, overwrite_type=OverwriteType.RANDOM)
+        indexes = store.put({"a": [1, 2, 3], "b": [4, 5, 6]})
+        indexes_2 = store.put({"a": [10, 11, 12, 13], "b": [14, 15, 16, 17]})
+        self.assertEqual(indexes_2[:2], [3, 4])
+        for i in indexes_2[2:]:
+            self.assertIn(i, indexes, msg=f"expected overwrite index in {indexes}, got {i}")
+        self.assertEqual(len(store), 5)
+
+    def test_sample(self):
+        store = ArrayBasedStore(capacity=5, overwrite_type=OverwriteType.ROLLING)
+        store.put({"a": [1, 2, 3, 4], "w": [0.0, 1.0, 0.0, 3.0]})
+        indexes, sample = store.sample_by_key("w", 10)
+        self.assertTrue(set(indexes.tolist()) <= {1, 3})
+        self.assertTrue(set(sample["a"].tolist()) <= {2, 4})
+        indexes, sample = store.sample_by_keys(["w", "a"], [10, 5])
+        self.assertTrue(set(indexes.tolist()) <= {1, 3})
+        indexes, sample = store.apply_multi_samplers([(lambda d: d["w"] * (d["a"] > 2), 4)])
+        self.assertEqual(indexes.tolist(), [3, 3, 3, 3])
+        indexes, sample = store.sample(3, weights=[1, 0, 0, 0])
+        self.assertEqual(sample["a"].tolist(), [1, 1, 1])
+
+    def test_invalid_initial_size(self):
+        with self.assertRaises(ValueError):
+            ArrayBasedStore(initial_size=0)
+
+    def test_dtype_promotion(self):
+        store = ArrayBasedStore(initial_size=1)
+        store.put({"reward": [1, 2], "event": [1, 2]})
+        store.put({"reward": [0.5], "event": ["e"]})
+        self.assertEqual(store.get_by_key("reward").tolist(), [1.0, 2.0, 0.5])
+        self.assertEqual(store.get_by_key("event").tolist(), [1, 2, "e"])
+        store.update([0], {"reward": [1.5], "event": [None]})
+        self.assertEqual(store.get_by_key("reward").tolist(), [1.5, 2.0, 0.5])
+        self.assertEqual(store.get_by_key("event").tolist(), [None, 2, "e"])
+
+    def test_index_out_of_range(self):
+        store = ArrayBasedStore(capacity=5, overwrite_type=OverwriteType.ROLLING)
+        store.put({"a": [1, 2, 3]})
+        self.assertEqual(store[-1]["a"], 3)
+        self.assertEqual(store.get([-1, 0])["a"].tolist(), [3, 1])
+        with self.assertRaises(IndexError):
+            store[3]
+        with self.assertRaises(IndexError):
+            store.get([0, 4])
+
+
 if __name__ == "__main__":
     unittest.main()
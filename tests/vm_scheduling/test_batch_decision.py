@@ -0,0 +1,138 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import os
+import tempfile
+import unittest
+
+import yaml
+
+from maro.data_lib import BinaryConverter
+from maro.simulator import Env
+from maro.simulator.scenarios.vm_scheduling import AllocateAction, BatchDecisionPayload, PostponeAction
+
+META_ROOT = "maro/simulator/scenarios/vm_scheduling/meta"
+
+# 3 interactive VMs with 4 cores requested at tick 0, and 1 at tick 1.
+VM_TABLE = """vmid,subscriptionid,deploymentid,vmcreated,lifetime,vmdeleted,vmcategory,vmcorecountbucket,vmmemorybucket
+1,1,1,0,10,10,1,4,2
+2,1,1,0,10,10,1,4,2
+3,1,1,0,10,10,1,4,2
+4,1,1,1,10,10,1,4,2
+"""
+
+
+def build_topology(folder: str):
+    with open(os.path.join(folder, "vmtable.csv"), "w") as fp:
+        fp.write(VM_TABLE)
+
+    with open(os.path.join(folder, "cpu_readings.csv"), "w") as fp:
+        fp.write("timestamp,vmid,maxcpu\n")
+
+        for tick in range(10):
+            for vm_id in range(1, 5):
+                fp.write(f"{tick},{vm_id},10\n")
+
+    for bin_name, csv_name, meta_name in (
+        ("vmtable.bin", "vmtable.csv", "vmtable.yml"),
+        ("vm_cpu_readings-file-1-of-1.bin", "cpu_readings.csv", "cpu_readings.yml")
+    ):
+        converter = BinaryConverter(os.path.join(folder, bin_name), os.path.join(META_ROOT, meta_name))
+        converter.add_csv(os.path.join(folder, csv_name))
+        converter.flush()
+
+    config = {
+        "BUFFER_TIME_BUDGET": 1,
+        "DELAY_DURATION": 1,
+        "VM_TABLE": os.path.join(folder, "vmtable.bin"),
+        "CPU_READINGS": os.path.join(folder, "vm_cpu_readings-file-1-of-1.bin"),
+        "PROCESSED_DATA_URL": "",
+        "KILL_ALL_VMS_IF_OVERLOAD": True,
+        "MAX_CPU_OVERSUBSCRIPTION_RATE": 1.15,
+        "MAX_MEM_OVERSUBSCRIPTION_RATE": 1,
+        "MAX_UTILIZATION_RATE": 1,
+        "PM": [
+            {
+                "PM_type": 0, "amount": 2, "CPU": 8, "memory": 16,
+                "power_curve": {"calibration_parameter": 1.4, "busy_power": 10, "idle_power": 1}
+            }
+        ]
+    }
+
+    with open(os.path.join(folder, "config.yml"), "w") as fp:
+        yaml.safe_dump(config, fp)
+
+
+class BatchDecisionTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+
+        build_topology(self.folder.name)
+
+        self.env = Env(
+            "vm_scheduling", topology=self.folder.name, durations=5, options={"batch-decision": True}
+        )
+
+    def tearDown(self):
+        self.env = None
+        self.folder.cleanup()
+
+    def test_batch_decision(self):
+        metrics, decision, is_done = self.env.step(None)
+
+        # All requests of tick 0 in one decision.
+        self.assertIsInstance(decision, BatchDecisionPayload)
+        self.assertListEqual([1, 2, 3], decision.vm_ids.tolist())
+        self.assertListEqual([4, 4, 4], decision.vm_cpu_cores_requirements.tolist())
+        self.assertEqual((3, 2), decision.valid_pm_mask.shape)
+        self.assertTrue(decision.valid_pm_mask.all())
+
+        # PM 0 can only hold 2 of them, the 3rd one will be postponed as resource exhaustion.
+        metrics, decision, is_done = self.env.step([AllocateAction(vm_id, 0) for vm_id in (1, 2, 3)])
+
+        self.assertEqual(2, metrics["successful_allocation"])
+        self.assertEqual(1, metrics["total_latency"].due_to_resource)
+
+        # Postponed request is decided with the new ones of tick 1.
+        self.assertEqual(1, self.env.tick)
+        self.assertListEqual([3, 4], decision.vm_ids.tolist())
+        self.assertListEqual([[False, True], [False, True]], decision.valid_pm_mask.tolist())
+        self.assertListEqual([[1], [1]], decision.valid_pms)
+
+        # VM without action is dropped.
+        metrics, decision, is_done = self.env.step([AllocateAction(4, 1)])
+
+        self.assertEqual(3, metrics["successful_allocation"])
+        self.assertIsNone(decision)
+        self.assertTrue(is_done)
+
+    def test_invalid_action(self):
+        metrics, decision, is_done = self.env.step(None)
+
+        # Each VM can only take one action.
+        with self.assertRaises(Exception):
+            self.env.step([PostponeAction(1, 1), AllocateAction(1, 0)])
+
+    def test_invalid_action_not_applied(self):
+        # Duplicated and unknown VMs, or unknown PM after valid actions.
+        for actions in (
+            [AllocateAction(1, 0), AllocateAction(2, 0), AllocateAction(2, 1)],
+            [AllocateAction(1, 0), AllocateAction(4, 0)],
+            [AllocateAction(1, 0), AllocateAction(2, 2)]
+        ):
+            env = Env("vm_scheduling", topology=self.folder.name, durations=5, options={"batch-decision": True})
+            env.step(None)
+
+            with self.assertRaises(Exception):
+                env.step(actions)
+
+            # No action of the list is applied.
+            for pm in env.current_frame.pms:
+                self.assertEqual(0, pm.cpu_cores_allocated)
+                self.assertEqual(0, pm.memory_allocated)
+
+            self.assertEqual(0, env.metrics["successful_allocation"])
+
+
+if __name__ == "__main__":
+    unittest.main()
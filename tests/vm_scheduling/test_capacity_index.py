@@ -0,0 +1,114 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import random
+import unittest
+
+from maro.simulator.scenarios.vm_scheduling import PmState
+from maro.simulator.scenarios.vm_scheduling.capacity_index import PmCapacityIndex
+from maro.simulator.scenarios.vm_scheduling.frame_builder import build_frame
+
+MAX_CPU_OVERSUBSCRIPTION_RATE = 1.15
+MAX_MEMORY_OVERSUBSCRIPTION_RATE = 1
+MAX_UTILIZATION_RATE = 1
+
+
+def is_valid_pm(pm, is_oversubscribable: bool, cpu_cores: int, memory: int):
+    if is_oversubscribable:
+        return (
+            pm.oversubscribable in (PmState.EMPTY, PmState.OVERSUBSCRIBABLE)
+            and pm.cpu_cores_allocated + cpu_cores <= MAX_CPU_OVERSUBSCRIPTION_RATE * pm.cpu_cores_capacity
+            and pm.memory_allocated + memory <= MAX_MEMORY_OVERSUBSCRIPTION_RATE * pm.memory_capacity
+            and pm.cpu_utilization / 100 * pm.cpu_cores_capacity + cpu_cores
+            <= MAX_UTILIZATION_RATE * pm.cpu_cores_capacity
+        )
+
+    return (
+        pm.oversubscribable in (PmState.EMPTY, PmState.NON_OVERSUBSCRIBABLE)
+        and pm.cpu_cores_allocated + cpu_cores <= pm.cpu_cores_capacity
+        and pm.memory_allocated + memory <= pm.memory_capacity
+    )
+
+
+class PmCapacityIndexTest(unittest.TestCase):
+    def setup_pms(self, pm_amount: int):
+        frame = build_frame(pm_amount, 1)
+        index = PmCapacityIndex(
+            pm_amount=pm_amount,
+            max_cpu_oversubscription_rate=MAX_CPU_OVERSUBSCRIPTION_RATE,
+            max_memory_oversubscription_rate=MAX_MEMORY_OVERSUBSCRIPTION_RATE,
+            max_utilization_rate=MAX_UTILIZATION_RATE
+        )
+
+        for pm_id, pm in enumerate(frame.pms):
+            pm.set_capacity_index(index)
+            pm.set_init_state(
+                id=pm_id,
+                cpu_cores_capacity=random.choice([16, 20, 32]),
+                memory_capacity=random.choice([64, 128]),
+                pm_type=0,
+                oversubscribable=PmState.EMPTY
+            )
+
+        return frame, index
+
+    def assert_valid_pms(self, frame, index):
+        for is_oversubscribable in (False, True):
+            for cpu_cores in (1, 2, 4, 8, 16, 24):
+                for memory in (2, 16, 64):
+                    expected = [
+                        pm.id for pm in frame.pms if is_valid_pm(pm, is_oversubscribable, cpu_cores, memory)
+                    ]
+
+                    valid_pms = index.get_valid_pms(
+                        is_oversubscribable, cpu_cores, memory,
+                        lambda pm_id: is_valid_pm(frame.pms[pm_id], is_oversubscribable, cpu_cores, memory)
+                    )
+
+                    self.assertListEqual(expected, valid_pms)
+
+    def test_valid_pms(self):
+        random.seed(0)
+
+        for pm_amount in (1, 7, 64, 100):
+            frame, index = self.setup_pms(pm_amount)
+
+            # All PMs are empty at beginning.
+            self.assert_valid_pms(frame, index)
+
+            for _ in range(20):
+                # Allocate and deallocate some PMs.
+                for pm in random.sample(list(frame.pms), max(1, pm_amount // 5)):
+                    if pm.oversubscribable == PmState.EMPTY:
+                        pm.oversubscribable = random.choice([PmState.OVERSUBSCRIBABLE, PmState.NON_OVERSUBSCRIBABLE])
+
+                    pm.cpu_cores_allocated = random.randint(0, pm.cpu_cores_capacity + 4)
+                    pm.memory_allocated = random.randint(0, pm.memory_capacity)
+                    pm.update_cpu_utilization(cpu_utilization=random.random() * 100)
+
+                    if pm.cpu_cores_allocated == 0:
+                        pm.oversubscribable = PmState.EMPTY
+
+                # Boundary utilization that exactly fit a request.
+                frame.pms[0].update_cpu_utilization(cpu_utilization=50)
+
+                self.assert_valid_pms(frame, index)
+
+                # Update utilization of all PMs like a new tick.
+                for pm in frame.pms:
+                    pm.update_cpu_utilization(cpu_utilization=random.random() * 100)
+
+                self.assert_valid_pms(frame, index)
+
+            # Reset will clear allocation.
+            frame.reset()
+
+            for pm in frame.pms:
+                pm.reset()
+
+            self.assert_valid_pms(frame, index)
+            self.assertEqual(pm_amount, len(index.get_valid_pms(False, 1, 1, lambda pm_id: False)))
+
+
+if __name__ == "__main__":
+    unittest.main()
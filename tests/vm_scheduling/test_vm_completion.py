@@ -0,0 +1,124 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import os
+import tempfile
+import unittest
+
+import yaml
+
+from maro.data_lib import BinaryConverter
+from maro.simulator import Env
+from maro.simulator.scenarios.vm_scheduling import AllocateAction
+from maro.simulator.scenarios.vm_scheduling.enums import PmState
+
+META_ROOT = "maro/simulator/scenarios/vm_scheduling/meta"
+
+# All requested at tick 0.
+# VM 1, 2 and 3 are interactive ones for PM 0, VM 1 expires at tick 2, VM 2 and 3 expire together at tick 3.
+# VM 4 and 5 are delay-insensitive ones for PM 1, they oversubscribe it and are killed at tick 1 before expiry.
+VM_TABLE = """vmid,subscriptionid,deploymentid,vmcreated,lifetime,vmdeleted,vmcategory,vmcorecountbucket,vmmemorybucket
+1,1,1,0,2,2,1,2,2
+2,1,1,0,3,3,1,2,2
+3,1,1,0,3,3,1,1,2
+4,1,1,0,4,4,0,5,2
+5,1,1,0,2,2,0,4,2
+"""
+
+VM_PMS = {1: 0, 2: 0, 3: 0, 4: 1, 5: 1}
+
+
+def build_topology(folder: str):
+    with open(os.path.join(folder, "vmtable.csv"), "w") as fp:
+        fp.write(VM_TABLE)
+
+    with open(os.path.join(folder, "cpu_readings.csv"), "w") as fp:
+        fp.write("timestamp,vmid,maxcpu\n")
+
+        for tick in range(6):
+            for vm_id, pm_id in VM_PMS.items():
+                # PM 1 is overloaded from tick 1.
+                fp.write(f"{tick},{vm_id},{50 if pm_id == 1 and tick == 0 else 100}\n")
+
+    for bin_name, csv_name, meta_name in (
+        ("vmtable.bin", "vmtable.csv", "vmtable.yml"),
+        ("vm_cpu_readings-file-1-of-1.bin", "cpu_readings.csv", "cpu_readings.yml")
+    ):
+        converter = BinaryConverter(os.path.join(folder, bin_name), os.path.join(META_ROOT, meta_name))
+        converter.add_csv(os.path.join(folder, csv_name))
+        converter.flush()
+
+    config = {
+        "BUFFER_TIME_BUDGET": 1,
+        "DELAY_DURATION": 1,
+        "VM_TABLE": os.path.join(folder, "vmtable.bin"),
+        "CPU_READINGS": os.path.join(folder, "vm_cpu_readings-file-1-of-1.bin"),
+        "PROCESSED_DATA_URL": "",
+        "KILL_ALL_VMS_IF_OVERLOAD": True,
+        "MAX_CPU_OVERSUBSCRIPTION_RATE": 1.15,
+        "MAX_MEM_OVERSUBSCRIPTION_RATE": 1,
+        "MAX_UTILIZATION_RATE": 1,
+        "PM": [
+            {
+                "PM_type": 0, "amount": 2, "CPU": 8, "memory": 16,
+                "power_curve": {"calibration_parameter": 1.4, "busy_power": 10, "idle_power": 1}
+            }
+        ]
+    }
+
+    with open(os.path.join(folder, "config.yml"), "w") as fp:
+        yaml.safe_dump(config, fp)
+
+
+class VmCompletionTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+
+        build_topology(self.folder.name)
+
+        self.env = Env("vm_scheduling", topology=self.folder.name, durations=6)
+
+    def tearDown(self):
+        self.env = None
+        self.folder.cleanup()
+
+    def get_pm_states(self, tick: int, attribute: str) -> list:
+        return self.env.snapshot_list["pms"][tick::attribute].flatten().astype(int).tolist()
+
+    def test_vm_completion(self):
+        metrics, decision, is_done = self.env.step(None)
+
+        while not is_done:
+            metrics, decision, is_done = self.env.step([AllocateAction(decision.vm_id, VM_PMS[decision.vm_id])])
+
+        # All VMs are allocated at tick 0.
+        self.assertEqual(5, metrics["successful_allocation"])
+        self.assertListEqual([5, 9], self.get_pm_states(0, "cpu_cores_allocated"))
+        self.assertListEqual([6, 4], self.get_pm_states(0, "memory_allocated"))
+        self.assertListEqual(
+            [PmState.NON_OVERSUBSCRIBABLE, PmState.OVERSUBSCRIBABLE], self.get_pm_states(0, "oversubscribable")
+        )
+
+        # VM 1 expired, PM 0 is still used by VM 2 and 3.
+        self.assertListEqual([3, 9], self.get_pm_states(2, "cpu_cores_allocated"))
+        self.assertListEqual([4, 4], self.get_pm_states(2, "memory_allocated"))
+        self.assertEqual(PmState.NON_OVERSUBSCRIBABLE, self.get_pm_states(2, "oversubscribable")[0])
+
+        # VM 2 and 3 expired at the same tick, PM 0 is empty.
+        self.assertListEqual([0, 9], self.get_pm_states(3, "cpu_cores_allocated"))
+        self.assertListEqual([0, 4], self.get_pm_states(3, "memory_allocated"))
+        self.assertEqual(PmState.EMPTY, self.get_pm_states(3, "oversubscribable")[0])
+
+        # VMs on the overload PM are killed, they are not completed when their lifetimes end,
+        # and the PM resources are not released by expiry.
+        self.assertEqual(3, metrics["successful_completion"])
+        self.assertEqual(2, metrics["failed_completion"])
+
+        for tick in range(1, 6):
+            self.assertEqual(9, self.get_pm_states(tick, "cpu_cores_allocated")[1])
+            self.assertEqual(4, self.get_pm_states(tick, "memory_allocated")[1])
+            self.assertEqual(PmState.OVERSUBSCRIBABLE, self.get_pm_states(tick, "oversubscribable")[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
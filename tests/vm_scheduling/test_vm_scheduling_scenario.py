@@ -1,6 +1,7 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import copy
 import unittest
 
 from maro.data_lib import BinaryConverter
@@ -24,7 +25,7 @@ class CpuReaderTest(unittest.TestCase):
         self.cpu_reader = CpuReader(self.data_path, 0)
 
     def tearDown(self):
-        self.cpu_reader.reset()
+        self.cpu_reader.close()
 
     def test_first_file_first_tick(self):
         cpu_utilization_dict = self.cpu_reader.items(tick=0)
@@ -85,6 +86,58 @@ class CpuReaderTest(unittest.TestCase):
         expected = 7
         self.assertEqual(expected, len(cpu_utilization_dict))
 
+    def test_items_block(self):
+        self.cpu_reader.items_block(tick=0)
+
+        # Readings of tick 1 are from first and second file.
+        vm_ids, cpu_utilizations = self.cpu_reader.items_block(tick=1)
+
+        self.assertEqual(13, len(vm_ids))
+        self.assertEqual(len(vm_ids), len(cpu_utilizations))
+        self.assertListEqual([41377, 29846, 32362, 30747, 17112, 17995, 81557], vm_ids[:7].tolist())
+        self.assertAlmostEqual(4.9944663, float(cpu_utilizations[6]), places=6)
+
+    def test_without_prefetch(self):
+        self.cpu_reader = CpuReader(self.data_path, 0, prefetch=False)
+
+        for tick, expected in enumerate([4, 13, 8, 7]):
+            self.assertEqual(expected, len(self.cpu_reader.items(tick=tick)))
+
+        # No more readings after the last file.
+        self.assertEqual(0, len(self.cpu_reader.items(tick=4)))
+
+    def test_copy(self):
+        self.cpu_reader.items(tick=0)
+
+        cpu_reader = copy.deepcopy(self.cpu_reader)
+
+        # Copy continues from same position, and does not affect the original one.
+        for tick, expected in [(1, 13), (2, 8), (3, 7)]:
+            self.assertEqual(expected, len(cpu_reader.items(tick=tick)))
+
+        for tick, expected in [(1, 13), (2, 8), (3, 7)]:
+            self.assertEqual(expected, len(self.cpu_reader.items(tick=tick)))
+
+        cpu_reader.close()
+
+    def test_stop_prefetch(self):
+        for tick in range(4):
+            self.cpu_reader.items(tick=tick)
+
+        # Background thread is stopped once the last file is being loaded.
+        self.assertIsNone(self.cpu_reader._executor)
+
+        # And started again to load the first file after reset.
+        self.cpu_reader.reset()
+        self.assertIsNotNone(self.cpu_reader._executor)
+
+        self.cpu_reader.close()
+        self.assertIsNone(self.cpu_reader._executor)
+
+        # Files can be read again after closing.
+        self.cpu_reader.reset()
+        self.assertEqual(4, len(self.cpu_reader.items(tick=0)))
+
 
 if __name__ == "__main__":
     unittest.main()
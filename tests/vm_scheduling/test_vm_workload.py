@@ -0,0 +1,150 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import random
+import unittest
+
+import numpy as np
+
+from maro.simulator.scenarios.vm_scheduling import VirtualMachine, VmCategory
+from maro.simulator.scenarios.vm_scheduling.vm_workload import VmWorkload
+
+PM_AMOUNT = 8
+
+
+def gen_vm(vm_id: int) -> VirtualMachine:
+    return VirtualMachine(
+        id=vm_id,
+        cpu_cores_requirement=random.choice([1, 2, 4, 8]),
+        memory_requirement=4,
+        lifetime=random.randint(1, 40),
+        sub_id=0,
+        deployment_id=0,
+        category=VmCategory.DELAY_INSENSITIVE
+    )
+
+
+def gen_reading() -> float:
+    # Negative reading means missing data.
+    return -1.0 if random.random() < 0.1 else random.uniform(0, 120)
+
+
+class VmWorkloadTest(unittest.TestCase):
+    def test_same_as_vm_series(self):
+        """Workload should be same as updating the utilization series of each VM"""
+        random.seed(0)
+
+        workload = VmWorkload()
+
+        # Expected states, kept with the utilization series of VM objects.
+        pending_vms = {}
+        running_vms = {}
+        next_vm_id = 0
+
+        for tick in range(300):
+            readings = {
+                vm_id: gen_reading() for vm_id in list(pending_vms) + list(running_vms) if random.random() > 0.1
+            }
+
+            # Update series.
+            workload.update_utilization(
+                tick, np.array(list(readings.keys()), dtype=np.int64), np.array(list(readings.values()))
+            )
+
+            for vm in running_vms.values():
+                if vm.id not in readings:
+                    vm.add_utilization(-1.0)
+                else:
+                    vm.add_utilization(readings[vm.id])
+                    vm.cpu_utilization = vm.get_utilization(tick)
+
+            for vm in pending_vms.values():
+                vm.add_utilization(readings.get(vm.id, -1.0))
+
+            # Finish VMs.
+            for vm in list(running_vms.values()):
+                if vm.deletion_tick == tick:
+                    running_vms.pop(vm.id)
+                    workload.remove_vm(vm.id)
+
+            # Request new VMs.
+            for _ in range(random.randint(0, 30)):
+                vm = gen_vm(next_vm_id)
+                next_vm_id += 1
+
+                utilization = random.uniform(0, 100)
+
+                vm.add_utilization(utilization)
+                workload.add_vm(vm.id, vm.cpu_cores_requirement, utilization)
+
+                pending_vms[vm.id] = vm
+
+            # Allocate, drop or keep pending VMs.
+            for vm in list(pending_vms.values()):
+                choice = random.random()
+
+                if choice < 0.5:
+                    pending_vms.pop(vm.id)
+                    running_vms[vm.id] = vm
+
+                    vm.pm_id = random.randint(0, PM_AMOUNT - 1)
+                    vm.creation_tick = tick
+                    vm.deletion_tick = tick + vm.lifetime
+                    vm.cpu_utilization = vm.get_utilization(tick)
+
+                    workload.allocate_vm(vm.id, vm.pm_id, tick)
+                elif choice < 0.6:
+                    pending_vms.pop(vm.id)
+                    workload.remove_vm(vm.id)
+
+            self.assertEqual(len(pending_vms) + len(running_vms), len(workload))
+
+            expected_cores_used = np.zeros(PM_AMOUNT)
+
+            for vm in running_vms.values():
+                self.assertAlmostEqual(vm.cpu_utilization, workload.get_cpu_utilization(vm.id))
+                self.assertListEqual(
+                    vm.get_historical_utilization_series(tick),
+                    workload.get_historical_utilization_series(vm.id, tick)
+                )
+
+                expected_cores_used[vm.pm_id] += vm.cpu_utilization * vm.cpu_cores_requirement
+
+            self.assertTrue(np.allclose(expected_cores_used, workload.get_pm_cpu_cores_used(PM_AMOUNT)))
+
+    def test_vm_in_workload(self):
+        workload = VmWorkload()
+
+        vm = gen_vm(1)
+        workload.add_vm(vm.id, vm.cpu_cores_requirement, 10.0)
+        vm.set_workload(workload)
+
+        workload.update_utilization(0, np.array([1]), np.array([20.0]))
+        workload.update_utilization(1, np.array([2]), np.array([30.0]))
+
+        # Utilization of VM is kept by workload.
+        with self.assertRaises(Exception):
+            vm.add_utilization(40.0)
+
+        vm.pm_id = 0
+        vm.creation_tick = 1
+        workload.allocate_vm(vm.id, vm.pm_id, 1)
+
+        # Series starts from the tick that requested.
+        self.assertEqual(10.0, vm.get_utilization(1))
+        self.assertEqual(10.0, vm.cpu_utilization)
+        self.assertListEqual([10.0], vm.get_historical_utilization_series(1))
+
+        workload.update_utilization(2, np.array([1]), np.array([150.0]))
+
+        self.assertEqual(20.0, vm.cpu_utilization)
+        self.assertListEqual([10.0, 20.0], vm.get_historical_utilization_series(2))
+
+        workload.clear()
+
+        self.assertEqual(0, len(workload))
+        self.assertNotIn(vm.id, workload)
+
+
+if __name__ == "__main__":
+    unittest.main()